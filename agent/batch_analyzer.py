@@ -0,0 +1,168 @@
+"""
+Batch validation engine for the Startup Validator Agent
+Streams ideas from a JSONL/CSV file through a bounded worker pool and appends results to a JSONL file
+"""
+
+import csv
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from agent.cache import idea_hash
+from agent.incremental import step_fingerprints
+from agent.pipeline import run_pipeline, split_skipped
+from agent.report_store import get_store
+from agent.scheduler import BATCH, get_scheduler
+from config import BATCH_CONCURRENCY, BATCH_TERSE_PROMPTS, BATCH_TRIAGE
+
+
+def read_ideas(path):
+    """
+    Stream (id, idea) pairs from a JSONL or CSV file
+
+    JSONL rows may be plain strings or objects with an "idea" field and optional "id".
+    CSV files need an "idea" column and may have an "id" column.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+
+        for row in rows:
+            if isinstance(row, str):
+                row = {"idea": row}
+            idea = (row.get("idea") or "").strip()
+            if idea:
+                yield str(row.get("id") or idea_hash(idea)), idea
+
+
+def completed_ids(output_path, retry_failed=False):
+    """Ids already present in an output file (only error-free ones when retry_failed)"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partial last line from an interrupted run
+            if retry_failed and record.get("errors"):
+                done.discard(record["id"])
+            else:
+                done.add(record["id"])
+    return done
+
+
+def run_batch(input_path, output_path, concurrency=BATCH_CONCURRENCY,
+              requests_per_minute=None, tokens_per_minute=None, retry_failed=False,
+              one_shot=None, use_cache=True, save_reports=True, dedupe=False, terse=None, triage=None):
+    """
+    Analyze every idea in input_path and append one JSON line per idea to output_path
+
+    Ideas already in output_path are skipped, so an interrupted run can simply be restarted.
+    Calls go through the shared scheduler at batch priority; requests_per_minute and
+    tokens_per_minute replace its quota (config.RATE_LIMIT_*) when given. one_shot sends one
+    combined request per idea instead of six (defaults to config.ONE_SHOT), terse sends the
+    shorter step prompts (defaults to config.BATCH_TERSE_PROMPTS).
+    triage runs feasibility first and skips the other steps of ideas it judges not feasible
+    (defaults to config.BATCH_TRIAGE); their records get "triaged" and the skipped steps.
+    use_cache=False bypasses the response cache. With save_reports every result is also saved
+    to the report store, so `cli.py reanalyze --all` can keep the portfolio up to date.
+    With dedupe, an idea that is a near-duplicate of a saved one (config.SIMILARITY_THRESHOLD)
+    reuses that report instead of being analyzed; its record gets "duplicate_of".
+
+    Returns:
+        dict: Counts of analyzed, failed, triaged, reused and skipped ideas
+    """
+    if terse is None:
+        terse = BATCH_TERSE_PROMPTS
+    if triage is None:
+        triage = BATCH_TRIAGE
+    done = completed_ids(output_path, retry_failed)
+    counts = {"analyzed": 0, "failed": 0, "triaged": 0, "reused": 0, "skipped": 0}
+    write_lock = threading.Lock()
+    # Keep only a couple of ideas per worker in memory at once
+    slots = threading.BoundedSemaphore(concurrency * 2)
+
+    def write(record, outcome):
+        with write_lock:
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            counts[outcome] += 1
+            return counts["analyzed"] + counts["failed"] + counts["triaged"]
+
+    def reuse(key, idea, score, report):
+        record = {
+            "id": key,
+            "timestamp": datetime.now().isoformat(),
+            "idea": idea,
+            "analysis": report["analysis"],
+            "errors": {},
+            "duplicate_of": report["id"],
+            "similarity": round(score, 3),
+        }
+        write(record, "reused")
+        print(f"🔁 {key} reuses {report['id']} ({score:.0%} similar)")
+
+    def analyze(key, idea):
+        try:
+            matches = get_store().similar(idea, limit=1) if dedupe else []
+            if matches:
+                reuse(key, idea, *matches[0])
+                return
+            results, errors = run_pipeline(idea, concurrent=False, one_shot=one_shot, priority=BATCH,
+                                           use_cache=use_cache, terse=terse, gate="first" if triage else False)
+            errors, skipped = split_skipped(errors)
+            record = {
+                "id": key,
+                "timestamp": datetime.now().isoformat(),
+                "idea": idea,
+                "analysis": results,
+                "errors": {step: str(error) for step, error in errors.items()},
+            }
+            if skipped:
+                record.update(triaged=True, skipped=skipped)
+            if save_reports and results:
+                fingerprints = step_fingerprints(idea, terse=terse)
+                meta = {"batch_id": key, "fingerprints": {step: fingerprints[step] for step in results}}
+                get_store().save(idea, results, meta={**meta, "triaged": True} if skipped else meta)
+            total = write(record, "failed" if errors else "triaged" if skipped else "analyzed")
+            print(f"{'⚠️ ' if errors else '🚫' if skipped else '✅'} [{total}] {key}")
+        except Exception as e:
+            # E.g. the report store failing: still record the idea, so --retry-failed picks it up
+            record = {
+                "id": key,
+                "timestamp": datetime.now().isoformat(),
+                "idea": idea,
+                "analysis": {},
+                "errors": {"batch": f"{type(e).__name__}: {e}"},
+            }
+            total = write(record, "failed")
+            print(f"❌ [{total}] {key}: {type(e).__name__}: {e}")
+        finally:
+            slots.release()
+
+    if requests_per_minute or tokens_per_minute:
+        scheduler = get_scheduler()
+        scheduler.set_limits(
+            requests_per_minute or scheduler.limiter.requests.capacity,
+            tokens_per_minute or scheduler.limiter.tokens.capacity,
+        )
+
+    with open(output_path, "a", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as pool:
+        for key, idea in read_ideas(input_path):
+            if key in done:
+                counts["skipped"] += 1
+                continue
+            done.add(key)  # Also drops duplicate ideas within the input
+            slots.acquire()
+            pool.submit(analyze, key, idea)
+
+    print(f"\n✅ Batch complete: {counts['analyzed']} analyzed, {counts['failed']} with errors, "
+          f"{counts['triaged']} triaged as not feasible, {counts['reused']} reused, {counts['skipped']} skipped")
+    return counts
@@ -0,0 +1,179 @@
+"""
+Response cache for analyzer calls
+Two tiers: an in-memory LRU in front of a persistent sqlite store with TTL and size eviction
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config import (
+    CACHE_ENABLED,
+    CACHE_MAX_BYTES,
+    CACHE_MEMORY_ENTRIES,
+    CACHE_PATH,
+    CACHE_TTL,
+)
+
+
+def idea_hash(idea):
+    """Stable short id for an idea text (surrounding whitespace ignored)"""
+    return hashlib.sha256(idea.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def template_hash(template):
+    """Short hash of a prompt template, stored so template edits can be detected"""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_key(model, template, idea, params=None):
+    """Content address of one analyzer call"""
+    payload = json.dumps(
+        {"model": model, "template": template, "idea": idea, "params": params or {}},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Thread-safe two-tier cache of completion text keyed by cache_key()"""
+
+    def __init__(self, path=CACHE_PATH, memory_entries=CACHE_MEMORY_ENTRIES,
+                 ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+        self._memory = OrderedDict()
+        self._checked_templates = set()
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _conn(self):
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    step TEXT NOT NULL,
+                    template_hash TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_responses_step ON responses (step, template_hash)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        return self._db
+
+    def _remember(self, key, content):
+        self._memory[key] = content
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def invalidate_step(self, step, current_template_hash):
+        """Drop a step's on-disk entries that were produced by an older version of its template"""
+        with self._lock:
+            db = self._conn()
+            with db:
+                db.execute(
+                    "DELETE FROM responses WHERE step = ? AND template_hash != ?",
+                    (step, current_template_hash),
+                )
+            self._checked_templates.add((step, current_template_hash))
+
+    def get(self, key, step=None, current_template_hash=None):
+        """Return cached content for key, or None on a miss"""
+        if step is not None and (step, current_template_hash) not in self._checked_templates:
+            self.invalidate_step(step, current_template_hash)
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return self._memory[key]
+
+            db = self._conn()
+            row = db.execute("SELECT content, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            now = time.time()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    with db:
+                        db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.stats["misses"] += 1
+                return None
+
+            with db:
+                db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._remember(key, row[0])
+            self.stats["disk_hits"] += 1
+            return row[0]
+
+    def set(self, key, content, step, current_template_hash):
+        """Store content in both tiers, evicting the least recently used disk entries past max_bytes"""
+        now = time.time()
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            self._remember(key, content)
+            db = self._conn()
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, step, current_template_hash, content, size, now, now),
+                )
+                db.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+                total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                if total > self.max_bytes:
+                    self._evict(db, total - self.max_bytes)
+            self.stats["writes"] += 1
+
+    def _evict(self, db, excess):
+        freed = 0
+        rows = db.execute("SELECT key, size FROM responses ORDER BY accessed_at")
+        doomed = []
+        for key, size in rows:
+            if freed >= excess:
+                break
+            doomed.append((key,))
+            freed += size
+        db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def clear(self):
+        """Empty both tiers"""
+        with self._lock:
+            self._memory.clear()
+            db = self._conn()
+            with db:
+                db.execute("DELETE FROM responses")
+
+    def hit_rate(self):
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the shared response cache, or None when caching is disabled"""
+    global _cache
+    if not CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
@@ -0,0 +1,183 @@
+"""
+Streaming export of saved reports
+Reports are read from the store one row at a time and written out as they arrive, so an
+export of 100k reports holds one report (or one batch of config.EXPORT_BATCH_SIZE rows
+for the columnar formats) in memory, never the whole portfolio:
+- jsonl: one compact JSON object per report, with its numeric metrics
+- parquet / arrow: one column per analysis section plus one per METRIC_COLUMNS entry
+- timeline-csv: one row per timeline task and milestone, for project management tools
+
+Parquet and Arrow need pyarrow (optional dependency): pip install pyarrow
+"""
+
+import csv
+import json
+import sys
+from array import array
+from datetime import datetime
+
+from agent.report_store import SECTIONS, get_store
+from agent.structured import METRIC_COLUMNS, numeric_metrics, parse_timeline
+from config import EXPORT_BATCH_SIZE
+
+TIMELINE_COLUMNS = ["Week", "Phase", "Task", "Owner", "Dependencies", "Status"]
+
+
+def iter_reports(store=None, start=None, end=None, include_archived=False):
+    """
+    Yield saved reports created in [start, end), oldest first, each with a "metrics" dict
+
+    Metrics come from the store's packed metrics where the report is its idea's latest
+    one; older reports are parsed.
+    """
+    store = store or get_store()
+    for report, packed in store.range_with_metrics(start, end, include_archived):
+        if packed is None:
+            # As floats, like the packed values
+            metrics = numeric_metrics(report["analysis"])
+            report["metrics"] = {c: None if metrics[c] is None else float(metrics[c]) for c in METRIC_COLUMNS}
+        else:
+            values = array("d")
+            values.frombytes(packed)
+            # NaN marks a metric the report didn't give
+            report["metrics"] = {c: None if v != v else v for c, v in zip(METRIC_COLUMNS, values)}
+        yield report
+
+
+def timeline_rows(timeline):
+    """CSV rows (TIMELINE_COLUMNS) of a timeline: one per task and one per milestone"""
+    timeline = parse_timeline(timeline) if isinstance(timeline, str) else timeline
+    # Each block's tasks depend on the previous block's milestone
+    previous_milestone = ""
+    for block in timeline.weeks:
+        weeks = f"{block.start_week}-{block.end_week}" if block.end_week != block.start_week else str(block.start_week)
+        for task in block.tasks:
+            yield [weeks, block.title, task.name, task.owner, previous_milestone, "Not started"]
+        if block.milestone:
+            previous_milestone = f"Milestone: {block.milestone}"
+            yield [weeks, block.title, previous_milestone, "", "", "Not started"]
+
+
+def write_jsonl(reports, out):
+    """Write one compact JSON line per report; returns the number written"""
+    count = 0
+    for report in reports:
+        out.write(json.dumps(report, separators=(",", ":"), ensure_ascii=False))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def write_timeline_csv(reports, out):
+    """Write every report's timeline rows, prefixed with the report id and idea; returns reports read"""
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(["Report", "Idea", *TIMELINE_COLUMNS])
+    count = 0
+    for report in reports:
+        timeline = report["analysis"].get("timeline")
+        if timeline:
+            for row in timeline_rows(timeline):
+                writer.writerow([report["id"], report["idea"], *row])
+        count += 1
+    return count
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Parquet and Arrow exports need pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def _schema(pa):
+    return pa.schema(
+        [("id", pa.string()), ("created_at", pa.timestamp("us")), ("idea", pa.string()),
+         ("archived", pa.bool_())]
+        + [(section, pa.string()) for section in SECTIONS]
+        + [(column, pa.float64()) for column in METRIC_COLUMNS]
+    )
+
+
+def _record_batches(pa, schema, reports, batch_size):
+    """Group reports into Arrow record batches of up to batch_size rows"""
+    columns = {name: [] for name in schema.names}
+    for report in reports:
+        columns["id"].append(report["id"])
+        columns["created_at"].append(datetime.fromisoformat(report["timestamp"]))
+        columns["idea"].append(report["idea"])
+        columns["archived"].append(report["archived"])
+        for section in SECTIONS:
+            columns[section].append(report["analysis"].get(section))
+        for column in METRIC_COLUMNS:
+            columns[column].append(report["metrics"][column])
+        if len(columns["id"]) >= batch_size:
+            yield pa.RecordBatch.from_pydict(columns, schema=schema)
+            columns = {name: [] for name in schema.names}
+    if columns["id"]:
+        yield pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+def write_parquet(reports, path, batch_size=EXPORT_BATCH_SIZE):
+    """Write reports as a Parquet file, one row group per batch"""
+    pa = _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    schema = _schema(pa)
+    count = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for batch in _record_batches(pa, schema, reports, batch_size):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+
+def write_arrow(reports, path, batch_size=EXPORT_BATCH_SIZE):
+    """Write reports as an Arrow IPC file"""
+    pa = _require_pyarrow()
+
+    schema = _schema(pa)
+    count = 0
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for batch in _record_batches(pa, schema, reports, batch_size):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+
+# format -> (writer, writes text to a file object rather than to a path)
+FORMATS = {
+    "jsonl": (write_jsonl, True),
+    "parquet": (write_parquet, False),
+    "arrow": (write_arrow, False),
+    "timeline-csv": (write_timeline_csv, True),
+}
+
+
+def export_reports(path, fmt="jsonl", store=None, start=None, end=None, include_archived=False,
+                   batch_size=EXPORT_BATCH_SIZE):
+    """
+    Stream saved reports to a file
+
+    Args:
+        path (str): Output file; "-" writes jsonl / timeline-csv to stdout
+        fmt (str): One of FORMATS
+        start, end: Only reports created in [start, end) (datetime, ISO string or unix time)
+        include_archived (bool): Also export archived reports
+        batch_size (int): Rows per Parquet row group / Arrow record batch
+
+    Returns:
+        int: Reports exported
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; choose from {', '.join(FORMATS)}")
+    writer, text = FORMATS[fmt]
+    reports = iter_reports(store, start, end, include_archived)
+    if not text:
+        if path == "-":
+            raise ValueError(f"{fmt} exports need an output file")
+        return writer(reports, path, batch_size)
+    if path == "-":
+        return writer(reports, sys.stdout)
+    with open(path, "w", encoding="utf-8", newline="") as out:
+        return writer(reports, out)
@@ -0,0 +1,146 @@
+"""
+Incremental re-analysis of saved reports
+Every saved step carries a fingerprint of what produced it (prompt template, model, idea
+and the fingerprints of the steps it builds on); re-analysis re-runs only the steps whose
+fingerprint no longer matches and saves the merged result as a new report version
+"""
+
+import hashlib
+import json
+import threading
+
+from agent.cache import idea_hash, template_hash
+from agent.report_store import get_store
+from config import BATCH_CONCURRENCY, MODEL_NAME, STEP_CONTEXT_CHARS, STEP_INPUTS, STEP_MODELS
+from prompts.prompts import STEP_PROMPTS, TERSE_STEP_PROMPTS
+
+
+def _route(step):
+    """A step's models as fingerprinted; a one-model route is just its name, as before routing"""
+    models = STEP_MODELS.get(step) or [MODEL_NAME]
+    return models[0] if len(models) == 1 else models
+
+
+def step_fingerprints(idea, model=None, terse=False):
+    """Fingerprint of every step for an idea under the current templates (or terse ones) and model routes"""
+    fingerprints = {}
+    templates = TERSE_STEP_PROMPTS if terse else STEP_PROMPTS
+    for key, template in templates.items():  # Inputs always come earlier in this order
+        inputs = {name: fingerprints[name] for name in STEP_INPUTS.get(key, ())}
+        payload = {
+            "template": template_hash(template),
+            "model": model or _route(key),
+            "idea": idea_hash(idea),
+            "inputs": inputs,
+            "context_chars": STEP_CONTEXT_CHARS if inputs else None,
+        }
+        fingerprints[key] = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return fingerprints
+
+
+def stale_steps(report, fingerprints=None):
+    """
+    Steps of a saved report that are missing or were produced by an older prompt/model/idea
+
+    The steps a triaged report skipped (feasibility verdict NO) only count as missing once
+    its feasibility step is stale, and are then gated on the new verdict (see reanalyze).
+    """
+    fingerprints = fingerprints or step_fingerprints(report["idea"])
+    saved = report.get("meta", {}).get("fingerprints", {})
+    stale = [key for key, fingerprint in fingerprints.items()
+             if key not in report["analysis"] or saved.get(key) != fingerprint]
+    if report.get("meta", {}).get("triaged") and "feasibility" not in stale:
+        stale = [key for key in stale if key in report["analysis"]]
+    return stale
+
+
+def reanalyze(report, idea=None, **options):
+    """
+    Re-run the stale steps of a saved report and save the merged result as a new version
+
+    Args:
+        report (dict): Report from utils.load_analysis_report() / the report store
+        idea (str): Edited idea text (defaults to the report's idea)
+        **options: Passed to the pipeline (use_cache, priority, concurrent, ...)
+
+    Returns:
+        tuple: (new report id or None if nothing was stale, re-run step keys, errors dict)
+    """
+    from agent.pipeline import run_pipeline, split_skipped
+
+    idea = report["idea"] if idea is None else idea
+    fingerprints = step_fingerprints(idea)
+    stale = stale_steps({**report, "idea": idea}, fingerprints)
+    if not stale:
+        return None, [], {}
+
+    known = {key: text for key, text in report["analysis"].items() if key not in stale}
+    if report.get("meta", {}).get("triaged"):
+        options.setdefault("gate", "first")
+    results, errors = run_pipeline(idea, steps=stale, known=known, **options)
+    errors, skipped = split_skipped(errors)
+
+    # A step that failed again keeps its old text but no fingerprint, so it stays stale. A step
+    # the gate skipped loses both: its old text was written for the previous verdict, and
+    # missing, it is re-run once feasibility is stale again (see stale_steps)
+    analysis = {key: results.get(key, report["analysis"].get(key))
+                for key in STEP_PROMPTS
+                if key not in skipped and (key in results or key in report["analysis"])}
+    meta = {
+        "fingerprints": {key: fingerprints[key] for key in analysis if key not in errors},
+        "parent": report.get("id"),
+        "rerun": stale,
+    }
+    if skipped or (report.get("meta", {}).get("triaged") and "feasibility" not in stale):
+        meta["triaged"] = True
+    return get_store().save(idea, analysis, meta=meta), stale, errors
+
+
+def reanalyze_all(concurrency=BATCH_CONCURRENCY, dry_run=False, **options):
+    """
+    Bring the latest report of every saved idea up to date
+
+    Returns:
+        dict: Counts of updated, unchanged and failed reports, and re-run vs. total steps
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from agent.scheduler import BATCH
+
+    counts = {"updated": 0, "unchanged": 0, "failed": 0, "steps_rerun": 0, "steps_total": 0}
+    lock = threading.Lock()
+    # Keep only a couple of reports per worker in memory at once
+    slots = threading.BoundedSemaphore(concurrency * 2)
+
+    def refresh(report):
+        try:
+            report_id, stale, errors = reanalyze(report, concurrent=False, priority=BATCH, **options)
+            with lock:
+                counts["failed" if errors else "updated"] += 1
+                counts["steps_rerun"] += len(stale)
+            print(f"{'⚠️ ' if errors else '✅'} {report['id']} -> {report_id} (re-ran {', '.join(stale)})")
+        except Exception as e:
+            # E.g. the report store failing to save: the report stays as it was
+            with lock:
+                counts["failed"] += 1
+            print(f"❌ {report['id']}: {type(e).__name__}: {e}")
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="reanalyze") as pool:
+        for report in get_store().latest_reports():
+            counts["steps_total"] += len(STEP_PROMPTS)
+            stale = stale_steps(report)
+            if not stale:
+                counts["unchanged"] += 1
+                continue
+            if dry_run:
+                counts["steps_rerun"] += len(stale)
+                print(f"🔎 {report['id']}: {', '.join(stale)}")
+                continue
+            slots.acquire()
+            pool.submit(refresh, report)
+
+    print(f"\n✅ Re-analysis complete: {counts['updated']} updated, {counts['failed']} with errors, "
+          f"{counts['unchanged']} unchanged; re-ran {counts['steps_rerun']} of {counts['steps_total']} steps")
+    return counts
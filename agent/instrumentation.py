@@ -0,0 +1,286 @@
+"""
+Per-step latency, token and cost instrumentation
+llm.complete() emits one record per analyzer call to every registered hook; Metrics
+aggregates them into summary tables and Prometheus text, SpanExporter writes
+OpenTelemetry-style spans as JSON lines
+"""
+
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import config
+
+# Upper bounds (seconds) of the Prometheus histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_hooks = []
+_hooks_lock = threading.Lock()
+_trace_export_checked = False
+
+
+def add_hook(hook):
+    """Call hook(record) after every analyzer call; see emit() for the record fields"""
+    with _hooks_lock:
+        _hooks.append(hook)
+
+
+def remove_hook(hook):
+    with _hooks_lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+
+def emit(record):
+    """
+    Send a call record to every hook
+
+    Record fields: step, idea_id, model, attempt (> 0 for an escalation, see agent/router.py),
+    cached, coalesced (shared an identical in-flight call's answer), cancelled (stopped by
+    its caller, e.g. the feasibility gate; not an error), error, started (unix seconds), wall_s, ttft_s, queue_wait_s, retries,
+    prompt_tokens, cached_prompt_tokens (served from the provider's prompt cache), completion_tokens
+    """
+    global _trace_export_checked
+    with _hooks_lock:
+        if not _trace_export_checked:
+            # Resolved on the first call so importing this module doesn't load .env
+            _trace_export_checked = True
+            if config.TRACE_EXPORT_PATH:
+                _hooks.append(SpanExporter(config.TRACE_EXPORT_PATH))
+        hooks = list(_hooks)
+    for hook in hooks:
+        try:
+            hook(record)
+        except Exception:
+            pass  # Instrumentation must never break an analysis
+
+
+def call_cost(record):
+    """US dollars a call cost at config.MODEL_PRICES (0 for cached calls and unpriced models)"""
+    prompt_price, completion_price = config.MODEL_PRICES.get(record["model"], (0.0, 0.0))
+    return (record["prompt_tokens"] * prompt_price + record["completion_tokens"] * completion_price) / 1e6
+
+
+class Metrics:
+    """Thread-safe aggregation of call records by step (and by step and model)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.steps = {}
+        self.models = {}  # (step, model) -> calls, escalated, wall_s, tokens, cost
+
+    def record(self, record):
+        cost = call_cost(record)
+        escalated = record.get("attempt", 0) > 0
+        with self.lock:
+            step = self.steps.setdefault(record["step"], {
+                "calls": 0, "errors": 0, "cached": 0, "coalesced": 0, "cancelled": 0, "retries": 0,
+                "wall_s": 0.0, "ttft_s": 0.0, "queue_wait_s": 0.0,
+                "prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0,
+                "escalated": 0, "cost": 0.0,
+                "buckets": [0] * len(LATENCY_BUCKETS),
+            })
+            step["calls"] += 1
+            step["errors"] += 1 if record["error"] else 0
+            step["cached"] += 1 if record["cached"] else 0
+            step["coalesced"] += 1 if record.get("coalesced") else 0
+            step["cancelled"] += 1 if record.get("cancelled") else 0
+            step["retries"] += record["retries"]
+            step["wall_s"] += record["wall_s"]
+            step["ttft_s"] += record["ttft_s"] or 0.0
+            step["queue_wait_s"] += record["queue_wait_s"]
+            step["prompt_tokens"] += record["prompt_tokens"]
+            step["cached_prompt_tokens"] += record.get("cached_prompt_tokens", 0)
+            step["completion_tokens"] += record["completion_tokens"]
+            step["escalated"] += escalated
+            step["cost"] += cost
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if record["wall_s"] <= bound:
+                    step["buckets"][i] += 1
+
+            routed = self.models.setdefault((record["step"], record["model"]), {
+                "calls": 0, "escalated": 0, "wall_s": 0.0, "tokens": 0, "cost": 0.0,
+            })
+            routed["calls"] += 1
+            routed["escalated"] += escalated
+            routed["wall_s"] += record["wall_s"]
+            routed["tokens"] += record["prompt_tokens"] + record["completion_tokens"]
+            routed["cost"] += cost
+
+    def summary_table(self):
+        """Fixed-width table of per-step averages and totals"""
+        header = f"{'Step':<13}{'Calls':>6}{'Cached':>7}{'Shared':>7}{'Err':>5}{'Esc':>5}{'Wall s':>8}" \
+                 f"{'TTFT s':>8}{'Queue s':>9}{'Retry':>6}{'Prompt tok':>12}{'Compl tok':>11}{'Cost $':>10}"
+        lines = [header, "-" * len(header)]
+        totals = {"calls": 0, "cached": 0, "coalesced": 0, "errors": 0, "escalated": 0, "retries": 0,
+                  "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0}
+        with self.lock:
+            for name, step in self.steps.items():
+                calls = step["calls"] or 1
+                lines.append(
+                    f"{name:<13}{step['calls']:>6}{step['cached']:>7}{step['coalesced']:>7}{step['errors']:>5}{step['escalated']:>5}"
+                    f"{step['wall_s'] / calls:>8.2f}{step['ttft_s'] / calls:>8.2f}"
+                    f"{step['queue_wait_s'] / calls:>9.2f}{step['retries']:>6}"
+                    f"{step['prompt_tokens']:>12}{step['completion_tokens']:>11}{step['cost']:>10.4f}"
+                )
+                for key in totals:
+                    totals[key] += step[key]
+        lines.append("-" * len(header))
+        lines.append(
+            f"{'TOTAL':<13}{totals['calls']:>6}{totals['cached']:>7}{totals['coalesced']:>7}{totals['errors']:>5}{totals['escalated']:>5}"
+            f"{'':>8}{'':>8}{'':>9}{totals['retries']:>6}{totals['prompt_tokens']:>12}"
+            f"{totals['completion_tokens']:>11}{totals['cost']:>10.4f}"
+        )
+        return "\n".join(lines)
+
+    def routing_table(self):
+        """
+        Per step and model: share of the step's calls, average wall time and tokens, and
+        cost, i.e. what escalating to the larger model costs in latency and spend
+        """
+        header = f"{'Step':<13}{'Model':<26}{'Calls':>6}{'Share':>7}{'Esc':>5}{'Wall s':>8}" \
+                 f"{'Tokens':>8}{'Cost $':>10}{'$/call':>10}"
+        lines = [header, "-" * len(header)]
+        with self.lock:
+            models = {key: dict(value) for key, value in self.models.items()}
+        step_calls = {}
+        for (step, _), routed in models.items():
+            step_calls[step] = step_calls.get(step, 0) + routed["calls"]
+        for (step, model), routed in models.items():
+            calls = routed["calls"] or 1
+            lines.append(
+                f"{step:<13}{model[:25]:<26}{routed['calls']:>6}{routed['calls'] / step_calls[step]:>7.0%}"
+                f"{routed['escalated']:>5}{routed['wall_s'] / calls:>8.2f}{routed['tokens'] // calls:>8}"
+                f"{routed['cost']:>10.4f}{routed['cost'] / calls:>10.6f}"
+            )
+        return "\n".join(lines)
+
+    def prometheus(self):
+        """Render the metrics in the Prometheus text exposition format"""
+        out = [
+            "# HELP validator_llm_calls_total Analyzer calls by step and outcome",
+            "# TYPE validator_llm_calls_total counter",
+        ]
+        with self.lock:
+            steps = {name: dict(step) for name, step in self.steps.items()}
+        for name, step in steps.items():
+            ok = step["calls"] - step["errors"] - step["cached"] - step["coalesced"] - step["cancelled"]
+            out.append(f'validator_llm_calls_total{{step="{name}",outcome="ok"}} {ok}')
+            out.append(f'validator_llm_calls_total{{step="{name}",outcome="cached"}} {step["cached"]}')
+            out.append(f'validator_llm_calls_total{{step="{name}",outcome="coalesced"}} {step["coalesced"]}')
+            out.append(f'validator_llm_calls_total{{step="{name}",outcome="cancelled"}} {step["cancelled"]}')
+            out.append(f'validator_llm_calls_total{{step="{name}",outcome="error"}} {step["errors"]}')
+
+        out += ["# HELP validator_llm_call_seconds Analyzer call wall time",
+                "# TYPE validator_llm_call_seconds histogram"]
+        for name, step in steps.items():
+            for bound, count in zip(LATENCY_BUCKETS, step["buckets"]):
+                out.append(f'validator_llm_call_seconds_bucket{{step="{name}",le="{bound}"}} {count}')
+            out.append(f'validator_llm_call_seconds_bucket{{step="{name}",le="+Inf"}} {step["calls"]}')
+            out.append(f'validator_llm_call_seconds_sum{{step="{name}"}} {step["wall_s"]:.6f}')
+            out.append(f'validator_llm_call_seconds_count{{step="{name}"}} {step["calls"]}')
+
+        for metric, field, help_text in (
+            ("validator_llm_ttft_seconds_total", "ttft_s", "Summed time to first token"),
+            ("validator_llm_queue_wait_seconds_total", "queue_wait_s", "Summed time spent waiting in the scheduler"),
+            ("validator_llm_retries_total", "retries", "Retried requests"),
+            ("validator_llm_escalations_total", "escalated", "Calls re-asked on a larger model"),
+            ("validator_llm_cost_dollars_total", "cost", "Spend at config.MODEL_PRICES"),
+        ):
+            out += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            for name, step in steps.items():
+                out.append(f'{metric}{{step="{name}"}} {step[field]}')
+
+        out += ["# HELP validator_llm_tokens_total Tokens reported by the API",
+                "# TYPE validator_llm_tokens_total counter"]
+        for name, step in steps.items():
+            out.append(f'validator_llm_tokens_total{{step="{name}",kind="prompt"}} {step["prompt_tokens"]}')
+            out.append(f'validator_llm_tokens_total{{step="{name}",kind="cached_prompt"}} '
+                       f'{step["cached_prompt_tokens"]}')
+            out.append(f'validator_llm_tokens_total{{step="{name}",kind="completion"}} {step["completion_tokens"]}')
+        return "\n".join(out) + "\n"
+
+
+@contextmanager
+def collecting():
+    """Collect the records emitted inside the block into a fresh Metrics"""
+    metrics = Metrics()
+    add_hook(metrics.record)
+    try:
+        yield metrics
+    finally:
+        remove_hook(metrics.record)
+
+
+def to_span(record):
+    """Convert a call record to an OpenTelemetry-style span dict (one trace per idea)"""
+    start_ns = int(record["started"] * 1e9)
+    return {
+        "trace_id": hashlib.sha256(record["idea_id"].encode("utf-8")).hexdigest()[:32],
+        "span_id": os.urandom(8).hex(),
+        "name": f"analyzer.{record['step']}",
+        "start_time_unix_nano": start_ns,
+        "end_time_unix_nano": start_ns + int(record["wall_s"] * 1e9),
+        "status": {"code": "ERROR" if record["error"] else "OK", "message": record["error"] or ""},
+        "attributes": {
+            "validator.step": record["step"],
+            "validator.idea_id": record["idea_id"],
+            "validator.cached": record["cached"],
+            "validator.coalesced": record.get("coalesced", False),
+            "validator.cancelled": record.get("cancelled", False),
+            "validator.retries": record["retries"],
+            "validator.queue_wait_s": record["queue_wait_s"],
+            "validator.ttft_s": record["ttft_s"],
+            "validator.attempt": record.get("attempt", 0),
+            "validator.cost_usd": call_cost(record),
+            "gen_ai.request.model": record["model"],
+            "gen_ai.usage.input_tokens": record["prompt_tokens"],
+            "gen_ai.usage.cache_read_input_tokens": record.get("cached_prompt_tokens", 0),
+            "gen_ai.usage.output_tokens": record["completion_tokens"],
+        },
+    }
+
+
+class SpanExporter:
+    """Hook that appends one span per call as a JSON line to a file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def __call__(self, record):
+        line = json.dumps(to_span(record))
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+# Process-wide metrics behind the Prometheus endpoint
+metrics = Metrics()
+add_hook(metrics.record)
+
+
+def serve_prometheus(port, host="127.0.0.1"):
+    """Expose the process-wide metrics at http://host:port/metrics from a daemon thread"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Loads ssl; only needed here
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,444 @@
+"""
+Shared LLM client layer for the Startup Validator Agent
+All analyzers call the Groq API through here so they share one keep-alive connection pool
+(or, with TRANSCRIPT_MODE=replay, one transcript of recorded answers; see agent/transcript.py)
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+
+import config
+from agent import instrumentation, transcript
+from agent.cache import cache_key, get_cache, idea_hash, template_hash
+from agent.prompt_compiler import compile_prompt
+from agent.rate_limit import estimate_tokens
+from agent.scheduler import INTERACTIVE, get_scheduler
+from agent.single_flight import flights
+from config import (
+    ESTIMATED_COMPLETION_TOKENS,
+    LLM_HTTP2,
+    LLM_KEEPALIVE_EXPIRY,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_TIMEOUT,
+    MODEL_NAME,
+    SINGLE_FLIGHT,
+)
+from prompts.prompts import TERSE_STEP_PROMPTS
+
+_lock = threading.Lock()
+_client = None
+# Totals over every uncached call in this process
+usage_totals = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+# httpx async pools are bound to the event loop they were opened on
+_async_clients = weakref.WeakKeyDictionary()
+
+
+class CallCancelled(Exception):
+    """Raised by complete() when its cancel event was set before or while the answer arrived"""
+
+
+def _http2_enabled():
+    """HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 keep-alive without it"""
+    if not LLM_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _pool_options():
+    import httpx
+
+    return {
+        "http2": _http2_enabled(),
+        "timeout": LLM_TIMEOUT,
+        "limits": httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def get_client():
+    """Return the shared Groq client, building it on first use (the SDK is imported here too)"""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None and transcript.mode() == "replay":
+                _client = transcript.ReplayClient(transcript.get_transcript())
+            elif _client is None:
+                import httpx
+                from groq import Groq
+
+                _client = Groq(
+                    api_key=config.GROQ_API_KEY,
+                    base_url=config.GROQ_BASE_URL,
+                    http_client=httpx.Client(**_pool_options()),
+                    max_retries=0,  # Retries are owned by the scheduler
+                )
+    return _client
+
+
+def get_async_client():
+    """Return the shared AsyncGroq client for the running event loop, building it on first use"""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None and transcript.mode() == "replay":
+            client = _async_clients[loop] = transcript.AsyncReplayClient(transcript.get_transcript())
+        elif client is None:
+            import httpx
+            from groq import AsyncGroq
+
+            client = AsyncGroq(
+                api_key=config.GROQ_API_KEY,
+                base_url=config.GROQ_BASE_URL,
+                http_client=httpx.AsyncClient(**_pool_options()),
+                max_retries=0,
+            )
+            _async_clients[loop] = client
+    return client
+
+
+def _estimate(messages, params):
+    prompt_tokens = sum(estimate_tokens(message["content"]) for message in messages)
+    return prompt_tokens + params.get("max_tokens", ESTIMATED_COMPLETION_TOKENS)
+
+
+def chat_completion(messages, model=MODEL_NAME, priority=INTERACTIVE, estimated_tokens=None,
+                    trace=None, cancel=None, **params):
+    """
+    Create a chat completion on the shared client (safe to call from any thread)
+
+    The request waits for its turn in the scheduler and is retried on 429/5xx errors.
+    The caller should hand the real usage to get_scheduler().settle() once it is known.
+    trace (dict) collects the scheduler's queue wait and retry count for instrumentation.
+    If the cancel event (threading.Event) is set by the time the scheduler admits the
+    request, it is not sent and CallCancelled is raised.
+    With TRANSCRIPT_MODE=record the request and its answer are added to the transcript.
+    """
+    if estimated_tokens is None:
+        estimated_tokens = _estimate(messages, params)
+    client = get_client()
+    sent = []
+
+    def send():
+        if cancel is not None and cancel.is_set():
+            raise CallCancelled("cancelled before the request was sent")
+        sent.append(time.perf_counter())
+        return client.chat.completions.with_raw_response.create(model=model, messages=messages, **params)
+
+    raw = get_scheduler().call(
+        send,
+        estimated_tokens,
+        priority,
+        trace=trace,
+    )
+    if transcript.mode() == "record":
+        # Timed from the attempt that succeeded
+        return transcript.capture(raw.parse(), model, messages, params, sent[-1])
+    return raw.parse()
+
+
+async def achat_completion(messages, model=MODEL_NAME, priority=INTERACTIVE, estimated_tokens=None,
+                           trace=None, **params):
+    """Async counterpart of chat_completion"""
+    if estimated_tokens is None:
+        estimated_tokens = _estimate(messages, params)
+    client = get_async_client()
+    sent = []
+
+    async def send():
+        sent.append(time.perf_counter())
+        return await client.chat.completions.with_raw_response.create(model=model, messages=messages, **params)
+
+    raw = await get_scheduler().acall(send, estimated_tokens, priority, trace=trace)
+    if transcript.mode() == "record":
+        return transcript.capture(await raw.parse(), model, messages, params, sent[-1])
+    return await raw.parse()
+
+
+def _stream_content(response, on_token, trace, cancel=None):
+    """Forward streamed deltas to on_token and return (full text, usage); stops if cancel is set"""
+    parts = []
+    usage = None
+    for chunk in response:
+        if cancel is not None and cancel.is_set():
+            response.close()  # Drops the connection, so the server stops generating
+            raise CallCancelled("cancelled while streaming")
+        if chunk.choices:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if not parts:
+                    trace["first_token"] = time.perf_counter()
+                parts.append(delta)
+                on_token(delta)
+        # Groq reports usage on the final chunk under x_groq
+        x_groq = getattr(chunk, "x_groq", None)
+        usage = getattr(x_groq, "usage", None) or getattr(chunk, "usage", None) or usage
+    return "".join(parts), usage
+
+
+async def _astream_content(response, on_token, trace):
+    """Async counterpart of _stream_content"""
+    parts = []
+    usage = None
+    async for chunk in response:
+        if chunk.choices:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if not parts:
+                    trace["first_token"] = time.perf_counter()
+                parts.append(delta)
+                on_token(delta)
+        x_groq = getattr(chunk, "x_groq", None)
+        usage = getattr(x_groq, "usage", None) or getattr(chunk, "usage", None) or usage
+    return "".join(parts), usage
+
+
+def complete(step, template, idea, model=MODEL_NAME, use_cache=True, on_token=None,
+             priority=INTERACTIVE, context=None, attempt=0, terse=False, cancel=None, **params):
+    """
+    Render a step's prompt template for an idea and return the completion text
+
+    Every call, cached or not, is reported to the instrumentation hooks. A call identical
+    to one already in flight (see _flight_key) waits for that one's answer instead of
+    sending its own request (config.SINGLE_FLIGHT).
+
+    Args:
+        step (str): Step key, e.g. "feasibility"
+        template (str): Prompt template from prompts/prompts.py with an {idea} placeholder
+        idea (str): The startup idea description
+        model (str): Groq model name
+        use_cache (bool): Set False to bypass the response cache for this call
+        on_token (callable): Stream the completion, calling on_token(text) for each delta
+        priority (int): scheduler.INTERACTIVE or scheduler.BATCH
+        context (str): Appended to the rendered prompt (upstream step summaries)
+        attempt (int): Position of `model` in the step's route (see agent/router.py);
+            above 0 marks an escalation after a smaller model's answer was incomplete
+        terse (bool): Use the step's shorter prompt from prompts.TERSE_STEP_PROMPTS, if any
+        cancel (threading.Event): Once set, the call raises CallCancelled instead of sending
+            its request, or stops reading a streamed answer (a non-streamed request already
+            sent is read to the end)
+        **params: Extra sampling parameters (temperature, max_tokens, ...)
+    """
+    if terse:
+        template = TERSE_STEP_PROMPTS.get(step, template)
+    record, trace = _start_record(step, idea, model, attempt)
+    try:
+        content, usage = _complete(step, template, idea, model, use_cache, on_token, priority,
+                                   context, trace, params, cancel)
+    except CallCancelled:
+        record["cancelled"] = True
+        raise
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    else:
+        _record_usage(record, usage)
+        return content
+    finally:
+        _emit(record, trace)
+
+
+async def acomplete(step, template, idea, model=MODEL_NAME, use_cache=True, on_token=None,
+                    priority=INTERACTIVE, context=None, attempt=0, terse=False, **params):
+    """Async counterpart of complete(); joins in-flight calls made by threads and coroutines alike"""
+    if terse:
+        template = TERSE_STEP_PROMPTS.get(step, template)
+    record, trace = _start_record(step, idea, model, attempt)
+    try:
+        content, usage = await _acomplete(step, template, idea, model, use_cache, on_token, priority,
+                                          context, trace, params)
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    else:
+        _record_usage(record, usage)
+        return content
+    finally:
+        _emit(record, trace)
+
+
+# Mark a usage value as "served from the cache" / "shared with an identical in-flight call"
+_CACHED = object()
+_COALESCED = object()
+
+
+def _start_record(step, idea, model, attempt):
+    record = {
+        "step": step,
+        "idea_id": idea_hash(idea),
+        "model": model,
+        "attempt": attempt,
+        "cached": False,
+        "coalesced": False,
+        "cancelled": False,
+        "error": None,
+        "started": time.time(),
+        "prompt_tokens": 0,
+        "cached_prompt_tokens": 0,
+        "completion_tokens": 0,
+    }
+    return record, {"queue_wait": 0.0, "retries": 0, "started": time.perf_counter()}
+
+
+def _record_usage(record, usage):
+    record["cached"] = usage is _CACHED
+    # A coalesced call sent no request of its own, so it is billed no tokens
+    record["coalesced"] = usage is _COALESCED
+    if not record["cached"] and not record["coalesced"]:
+        record["prompt_tokens"] = getattr(usage, "prompt_tokens", 0) or 0
+        # Prompt prefix the provider served from its cache, where it reports that
+        details = getattr(usage, "prompt_tokens_details", None)
+        record["cached_prompt_tokens"] = getattr(details, "cached_tokens", 0) or 0
+        record["completion_tokens"] = getattr(usage, "completion_tokens", 0) or 0
+
+
+def _emit(record, trace):
+    finished = time.perf_counter()
+    record["wall_s"] = finished - trace["started"]
+    record["ttft_s"] = trace.get("first_token", finished) - trace["started"]
+    record["queue_wait_s"] = trace["queue_wait"]
+    record["retries"] = trace["retries"]
+    instrumentation.emit(record)
+
+
+def _cache_params(params, context):
+    return {**params, "context": context} if context else params
+
+
+def _flight_key(model, template, idea, context, params):
+    """In-flight key: the cache key, with runs of whitespace in the idea collapsed"""
+    return cache_key(model, template, " ".join(idea.split()), _cache_params(params, context))
+
+
+def _cached(cache, step, template, idea, model, context, params, on_token):
+    """(key, version, cached text or None) for a call, or Nones without a cache"""
+    if cache is None:
+        return None, None, None
+    key = cache_key(model, template, idea, _cache_params(params, context))
+    version = template_hash(template)
+    cached = cache.get(key, step, version)
+    if cached is not None and on_token is not None:
+        on_token(cached)
+    return key, version, cached
+
+
+def _settle(step, content, usage, estimated, cache, key, version):
+    """Book a finished request's usage and cache its answer"""
+    get_scheduler().settle(estimated, getattr(usage, "total_tokens", None))
+    with _lock:
+        usage_totals["requests"] += 1
+        usage_totals["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+        usage_totals["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+    if cache is not None:
+        cache.set(key, content, step, version)
+
+
+def _complete(step, template, idea, model, use_cache, on_token, priority, context, trace, params, cancel=None):
+    """Body of complete(); returns (content, usage or _CACHED or _COALESCED)"""
+    cache = get_cache() if use_cache else None
+    key, version, cached = _cached(cache, step, template, idea, model, context, params, on_token)
+    if cached is not None:
+        return cached, _CACHED
+
+    # Static instructions go first as the system message, the idea and context after them
+    messages = compile_prompt(template).messages(idea, context)
+    estimated = _estimate(messages, params)
+
+    if cancel is not None and cancel.is_set():
+        raise CallCancelled("cancelled before the request was queued")
+
+    def request():
+        try:
+            response = chat_completion(
+                messages,
+                model=model,
+                priority=priority,
+                estimated_tokens=estimated,
+                trace=trace,
+                cancel=cancel,
+                stream=on_token is not None,
+                **params,
+            )
+            if on_token is not None:
+                content, usage = _stream_content(response, on_token, trace, cancel)
+            else:
+                content, usage = response.choices[0].message.content, getattr(response, "usage", None)
+        except CallCancelled:
+            # Give back the reserved budget; a cut stream's usage is unknown, so it is kept
+            if "first_token" not in trace:
+                get_scheduler().settle(estimated, 0)
+            raise
+        _settle(step, content, usage, estimated, cache, key, version)
+        return content, usage
+
+    if not SINGLE_FLIGHT:
+        return request()
+    while True:
+        try:
+            (content, usage), shared = flights.do(_flight_key(model, template, idea, context, params), request)
+        except CallCancelled:
+            if cancel is not None and cancel.is_set():
+                raise
+            continue  # The call this one joined was cancelled by its own caller; make it again
+        break
+    if shared:
+        # Like a cache hit, the whole answer arrives at once
+        if on_token is not None:
+            on_token(content)
+        return content, _COALESCED
+    return content, usage
+
+
+async def _acomplete(step, template, idea, model, use_cache, on_token, priority, context, trace, params):
+    """Body of acomplete()"""
+    cache = get_cache() if use_cache else None
+    key, version, cached = _cached(cache, step, template, idea, model, context, params, on_token)
+    if cached is not None:
+        return cached, _CACHED
+
+    messages = compile_prompt(template).messages(idea, context)
+    estimated = _estimate(messages, params)
+
+    async def request():
+        response = await achat_completion(
+            messages,
+            model=model,
+            priority=priority,
+            estimated_tokens=estimated,
+            trace=trace,
+            stream=on_token is not None,
+            **params,
+        )
+        if on_token is not None:
+            content, usage = await _astream_content(response, on_token, trace)
+        else:
+            content, usage = response.choices[0].message.content, getattr(response, "usage", None)
+        _settle(step, content, usage, estimated, cache, key, version)
+        return content, usage
+
+    if not SINGLE_FLIGHT:
+        return await request()
+    (content, usage), shared = await flights.ado(_flight_key(model, template, idea, context, params), request)
+    if shared:
+        if on_token is not None:
+            on_token(content)
+        return content, _COALESCED
+    return content, usage
+
+
+def close():
+    """Close the shared sync client and its connection pool"""
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
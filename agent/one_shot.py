@@ -0,0 +1,48 @@
+"""
+One-shot mode for the Startup Validator Agent
+Asks for all six sections in one request and splits the response back into steps
+"""
+
+import re
+
+from agent.llm import complete
+from config import MODEL_NAME, ONE_SHOT_MAX_TOKENS
+from prompts.prompts import ONE_SHOT_PROMPT, ONE_SHOT_SECTIONS
+
+SECTION_KEYS = [key for key, _ in ONE_SHOT_SECTIONS]
+
+# A marker line such as "<<<MARKET>>>", tolerating stray markdown around it
+_MARKER = re.compile(r"^[\s*#`]*<<<\s*([A-Z_]+)\s*>>>[\s*#`]*$", re.MULTILINE)
+
+
+def split_sections(text):
+    """
+    Split a one-shot response into {step key: section text}
+
+    Unknown markers are ignored and empty sections are left out, so a caller can
+    treat any key missing from the result as "failed to parse".
+    """
+    sections = {}
+    markers = list(_MARKER.finditer(text))
+    for i, match in enumerate(markers):
+        key = match.group(1).lower()
+        if key not in SECTION_KEYS:
+            continue
+        end = markers[i + 1].start() if i + 1 < len(markers) else len(text)
+        body = text[match.end():end].strip()
+        if body and key not in sections:
+            sections[key] = body
+    return sections
+
+
+def analyze_combined(idea, **options):
+    """
+    Run the combined prompt and return the sections that parsed
+
+    Options are passed to llm.complete (use_cache, priority, ...). Streaming is not
+    used here since sections can only be routed once their marker has arrived.
+    """
+    options.pop("on_token", None)
+    options.setdefault("max_tokens", ONE_SHOT_MAX_TOKENS)
+    text = complete("one_shot", ONE_SHOT_PROMPT, idea, model=MODEL_NAME, **options)
+    return split_sections(text)
@@ -0,0 +1,388 @@
+"""
+Step pipeline for the Startup Validator Agent
+Runs the six analysis steps one after another, as a dependency graph (each step as soon as
+the steps it builds on are done), or as one combined request
+"""
+
+import importlib
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from config import CONCURRENT_STEPS, FEASIBILITY_GATE, ONE_SHOT, STEP_CONTEXT_CHARS, STEP_INPUTS, STEP_POLICIES
+from prompts.prompts import STEP_CONTEXT_PROMPT
+
+
+def _lazy(module, name):
+    """Stand-in for agent.<module>.<name> that imports it (and the LLM stack) on first call"""
+    def analyzer(idea, **options):
+        return getattr(importlib.import_module(f"agent.{module}"), name)(idea, **options)
+    analyzer.__name__ = name
+    return analyzer
+
+
+# (key, label used in error messages, analyzer) in the fixed STEP 1-6 order
+STEPS = [
+    ("feasibility", "feasibility analysis", _lazy("idea_analyzer", "analyze_idea")),
+    ("market", "market analysis", _lazy("market_analyzer", "analyze_market")),
+    ("risks", "risk analysis", _lazy("risk_analyzer", "analyze_risk")),
+    ("features", "feature generation", _lazy("feature_generator", "generate_features")),
+    ("mvp", "MVP planning", _lazy("mvp_planner", "plan_mvp")),
+    ("timeline", "timeline generation", _lazy("timeline_planner", "generate_timeline")),
+]
+analyze_combined = _lazy("one_shot", "analyze_combined")
+
+STEP_LABELS = {key: label for key, label, _ in STEPS}
+
+
+def _check_graph():
+    """Steps may only depend on steps listed before them, which rules out cycles"""
+    seen = set()
+    for key, _, _ in STEPS:
+        unknown = set(STEP_INPUTS.get(key, ())) - seen
+        if unknown:
+            raise ValueError(f"STEP_INPUTS[{key!r}] must only list earlier steps, not {sorted(unknown)}")
+        seen.add(key)
+
+
+_check_graph()
+
+
+class StepCancelled(Exception):
+    """Raised in place of a step result when the step was cancelled"""
+
+
+class StepSkipped(StepCancelled):
+    """Raised in place of a step result when the feasibility gate closed (verdict NO)"""
+
+
+GATE_STEP = "feasibility"
+
+
+def gate_closed(text):
+    """True if a feasibility answer gives a clear NO verdict (an unclear one lets the idea through)"""
+    from agent.structured import parse_feasibility
+
+    return parse_feasibility(text).verdict is False
+
+
+def split_skipped(errors):
+    """
+    Separate steps skipped by the feasibility gate from real failures
+
+    Returns:
+        tuple: (failures dict, skipped step keys) - any skipped step marks the idea as triaged
+    """
+    failures = {key: error for key, error in errors.items() if not isinstance(error, StepSkipped)}
+    return failures, [key for key in errors if key not in failures]
+
+
+def iter_steps(idea, concurrent=None, policies=None, on_token=None, one_shot=None,
+               steps=None, known=None, gate=None, **options):
+    """
+    Run the steps for an idea and yield their outcomes in STEP 1-6 order
+
+    Args:
+        idea (str): The startup idea description
+        concurrent (bool): Start each step as soon as its config.STEP_INPUTS are done,
+            instead of one after another (defaults to config.CONCURRENT_STEPS)
+        policies (dict): Per-step timeout/cancellation policy (defaults to config.STEP_POLICIES)
+        on_token (callable): Stream completions, calling on_token(key, text) for each delta
+        one_shot (bool): Ask for all six sections in one request, falling back to per-step
+            calls for sections that are missing or incomplete (defaults to config.ONE_SHOT)
+        steps (list): Run only these step keys (one_shot is ignored then)
+        known (dict): Existing section texts used as context by the steps that depend on them
+        gate (str): Feasibility gate (defaults to config.FEASIBILITY_GATE): if the feasibility
+            verdict is NO, every other step is skipped with StepSkipped. "first" holds the
+            other steps back until feasibility is done; "speculative" runs them alongside it
+            and cancels the ones still in flight, as soon as a streamed verdict line reads NO
+            when on_token is given. Sequential runs always go feasibility first.
+            Ignored in one-shot mode (a single request) and when feasibility isn't run
+        **options: Passed to every analyzer (use_cache, priority, ...)
+
+    Yields:
+        tuple: (key, result, error) - exactly one of result/error is None
+    """
+    if concurrent is None:
+        concurrent = CONCURRENT_STEPS
+    if one_shot is None:
+        one_shot = ONE_SHOT
+    if gate is None:
+        gate = FEASIBILITY_GATE
+    policies = policies or STEP_POLICIES
+
+    if steps is not None:
+        selected = [step for step in STEPS if step[0] in steps]
+        yield from _run_steps(selected, idea, concurrent, policies, on_token, options, known=known, gate=gate)
+        return
+    if not one_shot:
+        yield from _run_steps(STEPS, idea, concurrent, policies, on_token, options, known=known, gate=gate)
+        return
+
+    try:
+        sections = analyze_combined(idea, **options)
+    except Exception:
+        sections = {}  # Every step falls back to its own call
+    else:
+        from agent.router import missing_fields
+
+        # Incomplete sections go through their step's own model route instead
+        sections = {key: text for key, text in sections.items() if not missing_fields(key, text)}
+    missing = [step for step in STEPS if step[0] not in sections]
+    fallback = _run_steps(missing, idea, concurrent, policies, on_token, options, known=sections)
+
+    for key, _, _ in STEPS:
+        if key in sections:
+            if on_token is not None:
+                on_token(key, sections[key])
+            yield key, sections[key], None
+        else:
+            yield next(fallback)
+
+
+def summarize(text, limit=STEP_CONTEXT_CHARS):
+    """Cut a section to about `limit` characters, at a line break where possible"""
+    text = text.strip()
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n", 0, limit)
+    return text[:cut if cut > limit // 2 else limit].rstrip() + "\n[...]"
+
+
+def step_context(key, outcomes):
+    """Prompt suffix with summaries of the step's finished inputs, or None if it has none"""
+    parts = [
+        f"\n## {STEP_LABELS[name].capitalize()}\n{summarize(outcomes[name][0])}"
+        for name in STEP_INPUTS.get(key, ())
+        if name in outcomes and outcomes[name][0] is not None
+    ]
+    if not parts:
+        return None
+    return STEP_CONTEXT_PROMPT.format(context="".join(parts))
+
+
+def critical_path():
+    """Longest chain of dependent steps, e.g. ['feasibility', 'features', 'mvp', 'timeline']"""
+    chains = {}
+    for key, _, _ in STEPS:  # STEPS is in dependency order
+        longest = max((chains[name] for name in STEP_INPUTS.get(key, ())), key=len, default=[])
+        chains[key] = longest + [key]
+    return max(chains.values(), key=len)
+
+
+def _run_steps(steps, idea, concurrent, policies, on_token, options, known=None, gate=None):
+    """
+    Run the given (key, label, analyzer) steps and yield outcomes in the order given
+
+    A step waits for its STEP_INPUTS that are among `steps` and gets their summaries as
+    context; inputs outside `steps` are taken from `known` (key -> text) if present.
+    A failed input doesn't block its dependents, they just run without that context.
+    With a gate, a NO feasibility verdict skips every step not finished yet.
+    """
+    if not steps:
+        return
+    outcomes = {key: (text, None) for key, text in (known or {}).items()}
+    gated = bool(gate) and any(key == GATE_STEP for key, _, _ in steps)
+    skipped = StepSkipped("skipped: feasibility verdict is NO")
+    # Set from a speculative run's streamed feasibility answer as soon as its verdict reads NO
+    verdict_no = Future()
+
+    def stream_to(key):
+        if on_token is None:
+            return None
+        if not (concurrent and gated and gate == "speculative" and key == GATE_STEP):
+            return lambda text: on_token(key, text)
+        from agent.structured import StreamingParser
+
+        parser = StreamingParser(GATE_STEP)
+
+        def forward(text):
+            on_token(key, text)
+            parsed = parser.feed(text)
+            if parsed is not None and parsed.verdict is False and not verdict_no.done():
+                verdict_no.set_result(True)
+        return forward
+
+    if not concurrent:
+        closed = False
+        for key, _, analyzer in steps:
+            if closed:
+                outcomes[key] = (None, skipped)
+                yield key, None, skipped
+                continue
+            try:
+                result = analyzer(idea, on_token=stream_to(key), context=step_context(key, outcomes), **options)
+                outcomes[key] = (result, None)
+                if gated and key == GATE_STEP:
+                    closed = gate_closed(result)
+                yield key, result, None
+            except Exception as e:
+                outcomes[key] = (None, e)
+                yield key, None, e
+        return
+
+    executor = ThreadPoolExecutor(max_workers=len(steps), thread_name_prefix="step")
+    abort = Future()
+    # Per step, set when the step is given up on so its LLM call stops (see llm.complete)
+    cancels = {}
+    order = [key for key, _, _ in steps]
+    waiting = {key: analyzer for key, _, analyzer in steps}
+    running = {}  # key -> (future, deadline)
+
+    def on_done(key):
+        def callback(future):
+            if cancels[key].is_set():
+                return  # Given up on; its outcome is already recorded
+            failed = future.cancelled() or future.exception() is not None
+            if failed and policies[key].get("cancel_others_on_failure") and not abort.done():
+                abort.set_result(key)
+        return callback
+
+    def stop(key):
+        """Give up on a running step: drop it if it hasn't started, else stop its LLM call"""
+        cancels[key].set()
+        running[key][0].cancel()
+
+    def gate_done():
+        """Whether this run's feasibility step has finished (a `known` verdict doesn't count)"""
+        return GATE_STEP not in waiting and GATE_STEP not in running
+
+    def start_ready():
+        """Submit every waiting step whose inputs have all finished"""
+        for key in list(waiting):
+            if any(name in waiting or name in running for name in STEP_INPUTS.get(key, ())):
+                continue
+            if gated and gate == "first" and key != GATE_STEP and not gate_done():
+                continue
+            analyzer = waiting.pop(key)
+            cancels[key] = threading.Event()
+            future = executor.submit(analyzer, idea, on_token=stream_to(key),
+                                     context=step_context(key, outcomes), cancel=cancels[key], **options)
+            future.add_done_callback(on_done(key))
+            timeout = policies[key].get("timeout")
+            running[key] = (future, None if timeout is None else time.monotonic() + timeout)
+
+    try:
+        start_ready()
+        position = 0
+        while position < len(order):
+            deadlines = [deadline for _, deadline in running.values() if deadline is not None]
+            remaining = max(0, min(deadlines) - time.monotonic()) if deadlines else None
+            wait([future for future, _ in running.values()] + [abort] + ([verdict_no] if gated else []),
+                 timeout=remaining, return_when=FIRST_COMPLETED)
+
+            now = time.monotonic()
+            for key, (future, deadline) in list(running.items()):
+                if future.done():
+                    try:
+                        outcomes[key] = (future.result(), None)
+                    except Exception as e:
+                        outcomes[key] = (None, e)
+                elif abort.done():
+                    stop(key)
+                    outcomes[key] = (None, StepCancelled(f"cancelled after {STEP_LABELS[abort.result()]} failed"))
+                elif deadline is not None and now >= deadline:
+                    stop(key)
+                    outcomes[key] = (None, TimeoutError(f"timed out after {policies[key]['timeout']}s"))
+                else:
+                    continue
+                del running[key]
+            if gated and (gate_done() or verdict_no.done()):
+                gated = False  # The verdict is checked once
+                verdict_text = outcomes[GATE_STEP][0] if gate_done() else None
+                closed = verdict_no.done() or (verdict_text is not None and gate_closed(verdict_text))
+            else:
+                closed = False
+            if closed:
+                # A verdict read from the stream lets feasibility finish its answer
+                for key in [key for key in running if key != GATE_STEP]:
+                    stop(key)
+                    outcomes[key] = (None, skipped)
+                    del running[key]
+                for key in waiting:
+                    outcomes[key] = (None, skipped)
+                waiting.clear()
+            if abort.done():
+                for key in waiting:
+                    outcomes[key] = (None, StepCancelled(f"cancelled after {STEP_LABELS[abort.result()]} failed"))
+                waiting.clear()
+            start_ready()
+
+            while position < len(order) and order[position] in outcomes:
+                key = order[position]
+                yield (key, *outcomes[key])
+                position += 1
+    finally:
+        # Steps still running if the caller stopped early; don't block on any of them
+        for key in running:
+            stop(key)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_pipeline(idea, concurrent=None, policies=None, **options):
+    """
+    Run the steps for an idea (all six unless steps= is given) and collect their outcomes
+
+    Returns:
+        tuple: (results, errors) dicts keyed by step
+    """
+    results, errors = {}, {}
+    for key, result, error in iter_steps(idea, concurrent, policies, **options):
+        if error is None:
+            results[key] = result
+        else:
+            errors[key] = error
+    return results, errors
+
+
+class OrderedStreamPrinter:
+    """
+    Print streamed tokens for several concurrent steps in a fixed section order
+
+    The section currently on screen is written as tokens arrive; the others are
+    buffered and flushed as soon as their turn comes. Pass token() as the
+    on_token callback of iter_steps() and call finish() for each outcome it yields.
+    """
+
+    def __init__(self, titles, print_header, out=None):
+        self.order = list(titles)
+        self.titles = titles
+        self.print_header = print_header
+        self.out = out or sys.stdout
+        self.buffers = {key: [] for key in self.order}
+        self.position = 0
+        self.lock = threading.Lock()
+
+    def _current(self):
+        return self.order[self.position] if self.position < len(self.order) else None
+
+    def start(self):
+        """Print the first section header"""
+        with self.lock:
+            self.print_header(self.titles[self._current()])
+
+    def token(self, key, text):
+        with self.lock:
+            index = self.order.index(key)
+            if index == self.position:
+                self.out.write(text)
+                self.out.flush()
+            elif index > self.position:
+                self.buffers[key].append(text)
+            # Tokens for finished sections (e.g. a timed-out call still streaming) are dropped
+
+    def finish(self, key, message=None):
+        """End the current section, optionally with a closing message, and show the next one"""
+        with self.lock:
+            if key != self._current():
+                return
+            if message:
+                self.out.write(f"\n{message}")
+            self.out.write("\n")
+            self.position += 1
+            key = self._current()
+            if key is not None:
+                self.print_header(self.titles[key])
+                self.out.write("".join(self.buffers.pop(key)))
+                self.out.flush()
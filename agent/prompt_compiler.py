@@ -0,0 +1,80 @@
+"""
+Prompt compilation for the analyzer calls
+Every step template is a long static block (persona, guidance, output format) followed
+by "Startup Idea:\n{idea}". A template is compiled once into that static block, sent as
+the system message, and a short user message holding just the idea and any upstream
+context. Requests for a step then share one identical prefix across ideas, which is
+what provider-side prompt caching matches on, and nothing static is re-rendered per call.
+"""
+
+import threading
+
+from agent.rate_limit import estimate_tokens
+
+IDEA_MARKER = "Startup Idea:"
+
+_compiled = {}
+_lock = threading.Lock()
+
+
+class CompiledPrompt:
+    """A template split into a pre-rendered system message and the idea/context message"""
+
+    __slots__ = ("template", "system", "user_prefix", "user_suffix")
+
+    def __init__(self, template, system, user_prefix, user_suffix):
+        self.template = template
+        self.system = system
+        self.user_prefix = user_prefix
+        self.user_suffix = user_suffix
+
+    def user(self, idea, context=None):
+        return f"{self.user_prefix}{idea}{self.user_suffix}{context or ''}"
+
+    def messages(self, idea, context=None):
+        """Chat messages for an idea: the static system message first, then the idea"""
+        user = {"role": "user", "content": self.user(idea, context)}
+        if not self.system:
+            return [user]
+        return [{"role": "system", "content": self.system}, user]
+
+
+def _compile(template):
+    head, marker, tail = template.rpartition(IDEA_MARKER)
+    prefix, placeholder, suffix = tail.partition("{idea}")
+    try:
+        # Rendering the static part with no fields also unescapes doubled braces
+        system = head.format().strip()
+        suffix = suffix.format()
+    except (IndexError, KeyError, ValueError):
+        system = None
+    if not marker or not placeholder or system is None:
+        # Not in the usual layout: send the whole rendered template as the user message
+        prefix, placeholder, suffix = template.partition("{idea}")
+        return CompiledPrompt(template, None, prefix.format(), suffix.format().rstrip())
+    return CompiledPrompt(template, system, f"{marker}{prefix}", suffix.rstrip())
+
+
+def compile_prompt(template):
+    """The compiled form of a template, built on first use"""
+    compiled = _compiled.get(template)
+    if compiled is None:
+        with _lock:
+            compiled = _compiled.setdefault(template, _compile(template))
+    return compiled
+
+
+def token_counts(template, idea, context=None):
+    """
+    Estimated input tokens of one call, before and after compilation
+
+    Returns:
+        dict: "inline" (the template rendered as one user message, as before), "system"
+            (static, identical for every idea) and "user" (the part that changes per idea)
+    """
+    compiled = compile_prompt(template)
+    return {
+        "inline": estimate_tokens(template.format(idea=idea) + (context or "")),
+        "system": estimate_tokens(compiled.system or ""),
+        "user": estimate_tokens(compiled.user(idea, context)),
+    }
@@ -0,0 +1,181 @@
+"""
+Vectorized scoring and ranking of saved ideas
+The report store keeps the numeric metrics of each idea's latest report (verdict,
+complexity, weeks and budget to MVP, TAM, competitor and risk counts) packed as float64
+rows at save time, so ranking loads them straight into one NumPy matrix and scores,
+ranks and finds the Pareto front of every idea in a few array operations instead of
+parsing each report in a Python loop.
+
+Needs numpy (optional dependency): pip install numpy
+"""
+
+from agent.structured import METRIC_COLUMNS
+from config import RANKING_WEIGHTS
+
+try:
+    import numpy as np
+except ImportError:  # Only ranking needs numpy
+    np = None
+
+# Dimension scores, all 0-100 and higher = better (see RISK_SCORES in ADVANCED_CONFIG.md)
+DIMENSIONS = ["feasibility", "market_size", "competition", "risk_profile"]
+
+# Absolute scales behind the scores: (value scoring 0, value scoring 100)
+WEEKS_SCALE = (52, 4)
+BUDGET_SCALE = (1e6, 1e4)           # Log scale
+TAM_SCALE = (1e7, 1e11)             # Log scale: $10M .. $100B
+COMPETITORS_SCALE = (10, 1)
+RISK_LOAD_SCALE = (0, 24)           # 3 points per High, 2 per Medium, 1 per Low risk
+
+_COLUMN = {name: index for index, name in enumerate(METRIC_COLUMNS)}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Ranking ideas needs numpy: pip install numpy")
+
+
+def _scale(values, scale, log=False):
+    """Map values linearly (or log-linearly) onto 0-100, clipped; NaN stays NaN"""
+    low, high = scale
+    if log:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values, low, high = np.log10(values), np.log10(low), np.log10(high)
+    return np.clip((values - low) / (high - low) * 100, 0, 100)
+
+
+def _filled(values, default=50.0):
+    """Unknown values count as middling"""
+    return np.where(np.isnan(values), default, values)
+
+
+def percentile_ranks(values):
+    """Mid-rank percentile (0-100) of every value within the array; ties share a rank"""
+    _require_numpy()
+    values = np.asarray(values, dtype=float)
+    ranks = np.full(values.shape, 50.0)
+    present = ~np.isnan(values)
+    ordered = np.sort(values[present])
+    if ordered.size:
+        below = np.searchsorted(ordered, values[present], "left")
+        through = np.searchsorted(ordered, values[present], "right")
+        ranks[present] = (below + through) / (2 * ordered.size) * 100
+    return ranks
+
+
+def dimension_scores(metrics):
+    """
+    0-100 score per dimension for a matrix of report metrics
+
+    Args:
+        metrics: (n, len(METRIC_COLUMNS)) array, NaN where a report didn't give a value
+
+    Returns:
+        dict: Array per DIMENSIONS entry, plus "risk_score" (higher = more risk)
+    """
+    _require_numpy()
+    metrics = np.asarray(metrics, dtype=float).reshape(-1, len(METRIC_COLUMNS))
+    column = lambda name: metrics[:, _COLUMN[name]]  # noqa: E731
+
+    feasibility = (
+        0.50 * _filled(column("verdict") * 100)
+        + 0.20 * _filled((3 - column("complexity")) / 2 * 100)
+        + 0.15 * _filled(_scale(column("weeks_to_mvp"), WEEKS_SCALE))
+        + 0.15 * _filled(_scale(column("budget"), BUDGET_SCALE, log=True))
+    )
+    risk_load = (3 * column("high_risks") + 2 * column("medium_risks") + column("low_risks"))
+    risk_score = _filled(_scale(risk_load, RISK_LOAD_SCALE))
+    return {
+        "feasibility": feasibility,
+        "market_size": _filled(_scale(column("tam"), TAM_SCALE, log=True)),
+        "competition": _filled(_scale(column("competitors"), COMPETITORS_SCALE)),
+        "risk_profile": 100 - risk_score,
+        "risk_score": risk_score,
+    }
+
+
+def pareto_front(scores):
+    """
+    Mask of the rows no other row beats on every column (all columns: higher = better)
+
+    Each pass keeps only the rows that beat the current candidate somewhere (or tie it
+    everywhere), so the loop runs about once per front member, not once per row.
+    """
+    _require_numpy()
+    scores = np.asarray(scores, dtype=float)
+    # Visit likely front members first so dominated rows are dropped early
+    order = np.argsort(-scores.sum(axis=1), kind="stable")
+    candidates, remaining = order, scores[order]
+    position = 0
+    while position < len(remaining):
+        current = remaining[position]
+        keep = np.any(remaining > current, axis=1) | np.all(remaining == current, axis=1)
+        candidates, remaining = candidates[keep], remaining[keep]
+        position = int(np.count_nonzero(keep[:position])) + 1
+    mask = np.zeros(len(scores), dtype=bool)
+    mask[candidates] = True
+    return mask
+
+
+def score(metrics, weights=None):
+    """
+    Dimension scores, weighted overall score, percentile rank and Pareto membership
+
+    Args:
+        metrics: (n, len(METRIC_COLUMNS)) array of report metrics
+        weights (dict): Weight per dimension (default: config.RANKING_WEIGHTS)
+
+    Returns:
+        dict: Arrays "feasibility", "market_size", "competition", "risk_profile",
+        "risk_score", "total" (0-100), "percentile" (0-100) and "pareto" (bool)
+    """
+    weights = RANKING_WEIGHTS if weights is None else weights
+    unknown = set(weights) - set(DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Unknown ranking dimensions: {', '.join(sorted(unknown))}")
+    scores = dimension_scores(metrics)
+    matrix = np.column_stack([scores[name] for name in DIMENSIONS])
+    vector = np.array([weights.get(name, 0.0) for name in DIMENSIONS], dtype=float)
+    if vector.sum() <= 0:
+        raise ValueError("Ranking weights must sum to more than 0")
+    scores["total"] = matrix @ (vector / vector.sum())
+    scores["percentile"] = percentile_ranks(scores["total"])
+    scores["pareto"] = pareto_front(matrix[:, vector > 0])
+    return scores
+
+
+def rank_ideas(store=None, weights=None, top=None, pareto_only=False, include_archived=False):
+    """
+    Rank the latest report of every saved idea, best first
+
+    Returns:
+        list: Dicts with id, idea, score, percentile, pareto and each dimension score
+    """
+    from agent.report_store import get_store
+
+    _require_numpy()
+    store = store or get_store()
+    report_ids, packed = store.latest_metrics(include_archived=include_archived)
+    if not report_ids:
+        return []
+    scores = score(np.frombuffer(packed, dtype=np.float64), weights)
+
+    order = np.argsort(-scores["total"], kind="stable")
+    if pareto_only:
+        order = order[scores["pareto"][order]]
+    order = order[:top] if top else order
+    columns = {name: scores[name][order].round(1).tolist() for name in (*DIMENSIONS, "total", "percentile")}
+    pareto = scores["pareto"][order].tolist()
+    ids = [report_ids[index] for index in order.tolist()]
+    ideas = store.ideas(ids)
+    return [
+        {
+            "id": report_id,
+            "idea": ideas.get(report_id, ""),
+            "score": columns["total"][i],
+            "percentile": columns["percentile"][i],
+            "pareto": pareto[i],
+            **{name: columns[name][i] for name in DIMENSIONS},
+        }
+        for i, report_id in enumerate(ids)
+    ]
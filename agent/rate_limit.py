@@ -0,0 +1,253 @@
+"""
+Request and token budgets for Groq calls
+Token buckets for the requests-per-minute and tokens-per-minute budgets that the scheduler
+(agent/scheduler.py) admits calls against.
+RateLimiter is per process; SqliteRateLimiter and RedisRateLimiter keep the buckets in a shared
+sqlite file or Redis server so several worker processes (or hosts) spend one global budget.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token) used before the real usage is known"""
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `per_minute` units per minute"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount):
+        """Seconds until `amount` units are available, without taking them"""
+        amount = min(float(amount), self.capacity)
+        with self.lock:
+            self._refill()
+            return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        with self.lock:
+            self._refill()
+            self.tokens -= min(float(amount), self.capacity)
+
+    def cap(self, remaining):
+        """Lower the bucket to what the server says is left (never raise it)"""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, float(remaining))
+
+    def adjust(self, amount):
+        """Give back (negative) or take extra (positive) units once the real cost is known"""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class RateLimiter:
+    """Requests-per-minute plus tokens-per-minute budget shared by every worker thread"""
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def delay(self, estimated_tokens):
+        """Seconds until one request of roughly `estimated_tokens` fits in both budgets"""
+        return max(self.requests.delay(1), self.tokens.delay(estimated_tokens))
+
+    def take(self, estimated_tokens):
+        self.requests.take(1)
+        self.tokens.take(estimated_tokens)
+
+    def try_acquire(self, estimated_tokens):
+        """Take one request if both budgets allow it now and return 0, else the seconds to wait"""
+        delay = self.delay(estimated_tokens)
+        if delay <= 0:
+            self.take(estimated_tokens)
+        return delay
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """Correct the token budget with the usage reported by the API"""
+        if actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+
+class _SharedBucket:
+    """One bucket of a shared limiter, with the TokenBucket methods the scheduler uses"""
+
+    def __init__(self, limiter, name, per_minute):
+        self.limiter = limiter
+        self.name = name
+        self.capacity = float(per_minute)
+
+    def cap(self, remaining):
+        self.limiter._update(self.name, "cap", float(remaining))
+
+    def adjust(self, amount):
+        self.limiter._update(self.name, "adjust", float(amount))
+
+
+class SqliteRateLimiter:
+    """
+    Requests/tokens-per-minute budget kept in a sqlite file, shared by every process using it
+
+    Each check-and-take runs in one write transaction, so processes never overspend
+    between looking at a bucket and charging it. Times are wall-clock (time.time()).
+    """
+
+    def __init__(self, path, requests_per_minute, tokens_per_minute):
+        self.path = path
+        self._local = threading.local()
+        self.requests = _SharedBucket(self, "requests", requests_per_minute)
+        self.tokens = _SharedBucket(self, "tokens", tokens_per_minute)
+        db = self._conn()
+        with db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS rate_buckets "
+                "(name TEXT PRIMARY KEY, capacity REAL NOT NULL, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            for bucket in (self.requests, self.tokens):
+                # A new capacity (e.g. another --rpm) replaces the old one, the level is kept
+                db.execute(
+                    "INSERT INTO rate_buckets VALUES (?, ?, ?, ?) ON CONFLICT (name) DO UPDATE SET "
+                    "capacity = excluded.capacity, tokens = MIN(tokens, excluded.capacity)",
+                    (bucket.name, bucket.capacity, bucket.capacity, time.time()),
+                )
+
+    def _conn(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def _transaction(self, change):
+        """Run change(levels) on the refilled {name: [capacity, tokens]} and write the levels back"""
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            levels = {}
+            for name, capacity, tokens, updated in db.execute("SELECT * FROM rate_buckets"):
+                levels[name] = [capacity, min(capacity, tokens + max(0.0, now - updated) * capacity / 60.0)]
+            result = change(levels)
+            db.executemany(
+                "UPDATE rate_buckets SET tokens = ?, updated = ? WHERE name = ?",
+                [(tokens, now, name) for name, (_, tokens) in levels.items()],
+            )
+            db.execute("COMMIT")
+            return result
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def try_acquire(self, estimated_tokens):
+        """Take one request if both budgets allow it now and return 0, else the seconds to wait"""
+        def change(levels):
+            wants = {"requests": 1.0, "tokens": float(estimated_tokens)}
+            delay = 0.0
+            for name, amount in wants.items():
+                capacity, tokens = levels[name]
+                amount = min(amount, capacity)
+                if tokens < amount:
+                    delay = max(delay, (amount - tokens) / (capacity / 60.0))
+            if delay <= 0:
+                for name, amount in wants.items():
+                    levels[name][1] -= min(amount, levels[name][0])
+            return delay
+        return self._transaction(change)
+
+    def _update(self, name, op, amount):
+        def change(levels):
+            capacity, tokens = levels[name]
+            levels[name][1] = min(tokens, amount) if op == "cap" else min(capacity, tokens - amount)
+        self._transaction(change)
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """Correct the token budget with the usage reported by the API"""
+        if actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+
+# Same bucket arithmetic as SqliteRateLimiter, run atomically inside Redis on the server's clock.
+# KEYS: requests hash, tokens hash. ARGV: op ("acquire" / "cap" / "adjust"), bucket, amount,
+# requests capacity, tokens capacity. Returns the delay as a string (Lua numbers become ints).
+_REDIS_BUCKET_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local capacities = {tonumber(ARGV[4]), tonumber(ARGV[5])}
+local levels = {}
+for i = 1, 2 do
+    local tokens = tonumber(redis.call('HGET', KEYS[i], 'tokens') or capacities[i])
+    local updated = tonumber(redis.call('HGET', KEYS[i], 'updated') or now)
+    levels[i] = math.min(capacities[i], tokens + math.max(0, now - updated) * capacities[i] / 60)
+end
+local delay = 0
+if ARGV[1] == 'acquire' then
+    local wants = {1, tonumber(ARGV[3])}
+    for i = 1, 2 do
+        local amount = math.min(wants[i], capacities[i])
+        if levels[i] < amount then
+            delay = math.max(delay, (amount - levels[i]) / (capacities[i] / 60))
+        end
+    end
+    if delay <= 0 then
+        for i = 1, 2 do levels[i] = levels[i] - math.min(wants[i], capacities[i]) end
+    end
+else
+    local i = tonumber(ARGV[2])
+    if ARGV[1] == 'cap' then
+        levels[i] = math.min(levels[i], tonumber(ARGV[3]))
+    else
+        levels[i] = math.min(capacities[i], levels[i] - tonumber(ARGV[3]))
+    end
+end
+for i = 1, 2 do
+    redis.call('HSET', KEYS[i], 'tokens', tostring(levels[i]), 'updated', tostring(now))
+    redis.call('EXPIRE', KEYS[i], 3600)
+end
+return tostring(delay)
+"""
+
+
+class RedisRateLimiter:
+    """Requests/tokens-per-minute budget kept in Redis, shared by workers on every host"""
+
+    def __init__(self, client, prefix, requests_per_minute, tokens_per_minute):
+        self.requests = _SharedBucket(self, "requests", requests_per_minute)
+        self.tokens = _SharedBucket(self, "tokens", tokens_per_minute)
+        self._keys = [f"{prefix}:rate:requests", f"{prefix}:rate:tokens"]
+        self._script = client.register_script(_REDIS_BUCKET_SCRIPT)
+
+    def _run(self, op, bucket, amount):
+        args = [op, bucket, amount, self.requests.capacity, self.tokens.capacity]
+        return float(self._script(keys=self._keys, args=args))
+
+    def try_acquire(self, estimated_tokens):
+        """Take one request if both budgets allow it now and return 0, else the seconds to wait"""
+        return self._run("acquire", 0, estimated_tokens)
+
+    def _update(self, name, op, amount):
+        self._run(op, 1 if name == "requests" else 2, amount)
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """Correct the token budget with the usage reported by the API"""
+        if actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
@@ -0,0 +1,521 @@
+"""
+Indexed report store for saved analyses
+One sqlite database (WAL mode, safe for concurrent writers) with B-tree indexes on
+idea hash and timestamp, an FTS5 full-text index over the analysis sections, an
+LSH index of idea signatures for near-duplicate lookups and the numeric metrics of
+each idea's latest report, parsed once at save time and packed for fast ranking.
+Analyses can be stored zstd-compressed against a dictionary trained on saved reports
+(REPORT_COMPRESSION, needs the optional zstandard package); each report stays one row,
+readable on its own, and plain and compressed rows can be mixed.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from datetime import datetime
+
+from agent import similarity
+from agent.cache import idea_hash
+from config import (
+    REPORT_COMPRESSION,
+    REPORT_COMPRESSION_LEVEL,
+    REPORT_DICT_SIZE,
+    REPORT_STORE_PATH,
+    SIMILARITY_THRESHOLD,
+)
+
+SECTIONS = ["feasibility", "market", "risks", "features", "mvp", "timeline"]
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Compressed reports need zstandard: pip install zstandard") from None
+    return zstandard
+
+
+def _stored_size(stored):
+    return len(stored.encode("utf-8")) if isinstance(stored, str) else len(stored)
+
+
+def _to_unix(value):
+    """Accept a datetime, ISO string or unix timestamp"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+class ReportStore:
+    """Append-mostly store of analysis reports keyed by idea hash and timestamp"""
+
+    def __init__(self, path=REPORT_STORE_PATH, compression=REPORT_COMPRESSION):
+        self.path = path
+        self.compression = compression  # None or "zstd"
+        self._dictionary = None  # Newest trained zstd dictionary, loaded on first compressed save
+        self._dictionary_loaded = False
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._ready = False
+        self.has_fts = False
+
+    def _conn(self):
+        """One connection per thread; sqlite serializes writers through its own lock"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=30)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            with self._schema_lock:
+                if not self._ready:
+                    self._create_schema(db)
+                    self._ready = True
+        return db
+
+    def _create_schema(self, db):
+        with db:
+            db.execute(
+                """CREATE TABLE IF NOT EXISTS reports (
+                    id INTEGER PRIMARY KEY,
+                    report_id TEXT NOT NULL UNIQUE,
+                    idea_hash TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    idea TEXT NOT NULL,
+                    analysis TEXT NOT NULL,
+                    meta TEXT NOT NULL DEFAULT '{}',
+                    archived INTEGER NOT NULL DEFAULT 0
+                )"""
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS idx_reports_idea ON reports (idea_hash, created_at)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_reports_created ON reports (archived, created_at)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS idea_signatures (idea_hash TEXT PRIMARY KEY, signature BLOB NOT NULL)"
+            )
+            db.execute(
+                """CREATE TABLE IF NOT EXISTS idea_bands (
+                    band_key INTEGER NOT NULL,
+                    idea_hash TEXT NOT NULL,
+                    PRIMARY KEY (band_key, idea_hash)
+                ) WITHOUT ROWID"""
+            )
+            db.execute(
+                """CREATE TABLE IF NOT EXISTS idea_metrics (
+                    idea_hash TEXT PRIMARY KEY,
+                    report_id TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    archived INTEGER NOT NULL DEFAULT 0,
+                    metrics BLOB NOT NULL
+                )"""
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS zstd_dictionaries "
+                "(dict_id INTEGER PRIMARY KEY, created_at REAL NOT NULL, data BLOB NOT NULL)"
+            )
+        try:
+            with db:
+                db.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5("
+                    f"idea, {', '.join(SECTIONS)}, content='', tokenize='porter')"
+                )
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False  # sqlite built without FTS5; search() falls back to LIKE
+        version = db.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            self._index_missing_ideas(db)
+        if version < 2:
+            self._add_missing_metrics(db)
+            db.execute("PRAGMA user_version = 2")
+
+    def _index_idea(self, db, key, idea):
+        sig = similarity.signature(idea)
+        cursor = db.execute(
+            "INSERT OR IGNORE INTO idea_signatures VALUES (?, ?)", (key, similarity.pack(sig))
+        )
+        if cursor.rowcount:
+            db.executemany(
+                "INSERT OR IGNORE INTO idea_bands VALUES (?, ?)",
+                [(band_key, key) for band_key in similarity.band_keys(sig)],
+            )
+
+    def _index_missing_ideas(self, db):
+        """Add signatures for reports saved before the similarity index existed"""
+        rows = db.execute(
+            "SELECT idea_hash, idea FROM reports WHERE idea_hash NOT IN "
+            "(SELECT idea_hash FROM idea_signatures) GROUP BY idea_hash"
+        ).fetchall()
+        with db:
+            for key, idea in rows:
+                self._index_idea(db, key, idea)
+
+    def _update_metrics(self, db, key, report_id, created_at, archived, analysis):
+        """Keep the metrics of an idea's newest report: METRIC_COLUMNS as float64, NaN if missing"""
+        from agent.structured import METRIC_COLUMNS, numeric_metrics
+
+        values = numeric_metrics(analysis)
+        packed = array("d", (float("nan") if values[c] is None else values[c] for c in METRIC_COLUMNS))
+        db.execute(
+            "INSERT INTO idea_metrics VALUES (?, ?, ?, ?, ?) ON CONFLICT (idea_hash) DO UPDATE SET "
+            "report_id = excluded.report_id, created_at = excluded.created_at, "
+            "archived = excluded.archived, metrics = excluded.metrics "
+            "WHERE excluded.created_at >= idea_metrics.created_at",
+            (key, report_id, created_at, int(archived), packed.tobytes()),
+        )
+
+    def _add_missing_metrics(self, db):
+        """Parse metrics for ideas saved before the metrics table existed"""
+        rows = db.execute(
+            "SELECT idea_hash, report_id, created_at, archived, analysis FROM reports AS r "
+            "WHERE created_at = (SELECT MAX(created_at) FROM reports WHERE idea_hash = r.idea_hash)"
+        ).fetchall()
+        with db:
+            for key, report_id, created_at, archived, analysis in rows:
+                self._update_metrics(db, key, report_id, created_at, archived, self._decode(analysis))
+
+    def _active_dictionary(self):
+        """The newest trained dictionary, or None to compress without one"""
+        if not self._dictionary_loaded:
+            row = self._conn().execute(
+                "SELECT data FROM zstd_dictionaries ORDER BY created_at DESC LIMIT 1"
+            ).fetchone()
+            self._dictionary = row and _zstd().ZstdCompressionDict(row[0])
+            self._dictionary_loaded = True
+        return self._dictionary
+
+    def _encode(self, analysis):
+        """An analysis as stored: JSON text, or zstd-compressed JSON bytes"""
+        text = json.dumps(analysis)
+        if self.compression != "zstd":
+            return text
+        dictionary = self._active_dictionary()
+        dict_id = dictionary.dict_id() if dictionary else 0
+        # Compressors aren't thread-safe: one per thread, rebuilt when the dictionary changes
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None or self._local.compressor_dict_id != dict_id:
+            compressor = _zstd().ZstdCompressor(level=REPORT_COMPRESSION_LEVEL, dict_data=dictionary)
+            self._local.compressor, self._local.compressor_dict_id = compressor, dict_id
+        return compressor.compress(text.encode("utf-8"))
+
+    def _decode(self, stored):
+        """Inverse of _encode(); compressed rows name the dictionary they need in their frame header"""
+        if isinstance(stored, str):
+            return json.loads(stored)
+        zstandard = _zstd()
+        dict_id = zstandard.get_frame_parameters(stored).dict_id
+        decompressors = getattr(self._local, "decompressors", None)
+        if decompressors is None:
+            decompressors = self._local.decompressors = {}
+        decompressor = decompressors.get(dict_id)
+        if decompressor is None:
+            dictionary = None
+            if dict_id:
+                row = self._conn().execute(
+                    "SELECT data FROM zstd_dictionaries WHERE dict_id = ?", (dict_id,)
+                ).fetchone()
+                if row is None:
+                    raise ValueError(f"Report compressed with unknown zstd dictionary {dict_id}")
+                dictionary = zstandard.ZstdCompressionDict(row[0])
+            decompressor = decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=dictionary)
+        return json.loads(decompressor.decompress(stored))
+
+    def train_dictionary(self, samples=2000, size=REPORT_DICT_SIZE):
+        """
+        Train a zstd dictionary on a random sample of saved analyses and use it for new saves
+
+        The headings and phrasing the step prompts ask for repeat in every report, so a
+        dictionary of them lets each report compress well on its own. Earlier dictionaries
+        are kept for the rows compressed with them.
+
+        Returns:
+            int: The dictionary id
+        """
+        zstandard = _zstd()
+        rows = self._conn().execute(
+            "SELECT analysis FROM reports WHERE id IN (SELECT id FROM reports ORDER BY RANDOM() LIMIT ?)",
+            (samples,),
+        ).fetchall()
+        if len(rows) < 10:
+            raise ValueError(f"Need at least 10 saved reports to train a dictionary, found {len(rows)}")
+        data = [json.dumps(self._decode(row[0])).encode("utf-8") for row in rows]
+        dictionary = zstandard.train_dictionary(size, data, level=REPORT_COMPRESSION_LEVEL)
+        db = self._conn()
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO zstd_dictionaries VALUES (?, ?, ?)",
+                (dictionary.dict_id(), time.time(), dictionary.as_bytes()),
+            )
+        self._dictionary, self._dictionary_loaded = dictionary, True
+        return dictionary.dict_id()
+
+    def recompress(self, batch_size=500):
+        """
+        Rewrite every stored analysis in the store's format (compressed with the newest
+        dictionary, or plain JSON if compression is off)
+
+        Returns:
+            tuple: (reports rewritten, stored bytes before, stored bytes after)
+        """
+        db = self._conn()
+        rewritten = before = after = 0
+        last_id = 0
+        while True:
+            rows = db.execute(
+                "SELECT id, analysis FROM reports WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            updates = [(self._encode(self._decode(stored)), row_id) for row_id, stored in rows]
+            with db:
+                db.executemany("UPDATE reports SET analysis = ? WHERE id = ?", updates)
+            rewritten += len(rows)
+            before += sum(_stored_size(stored) for _, stored in rows)
+            after += sum(_stored_size(stored) for stored, _ in updates)
+            last_id = rows[-1][0]
+        db.execute("VACUUM")  # Give the freed pages back to the file system
+        return rewritten, before, after
+
+    def _row_to_report(self, row):
+        return {
+            "id": row["report_id"],
+            "timestamp": datetime.fromtimestamp(row["created_at"]).isoformat(),
+            "idea": row["idea"],
+            "analysis": self._decode(row["analysis"]),
+            "meta": json.loads(row["meta"]),
+            "archived": bool(row["archived"]),
+        }
+
+    def save(self, idea, analysis, meta=None, created_at=None, archived=False):
+        """
+        Store a report and return its id
+
+        Ids are "<idea hash>-<microsecond timestamp>", so concurrent saves never collide.
+        """
+        created_at = _to_unix(created_at) or time.time()
+        key = idea_hash(idea)
+        db = self._conn()
+        with db:
+            report_id = f"{key}-{int(created_at * 1_000_000)}"
+            while db.execute("SELECT 1 FROM reports WHERE report_id = ?", (report_id,)).fetchone():
+                created_at += 0.000001
+                report_id = f"{key}-{int(created_at * 1_000_000)}"
+            cursor = db.execute(
+                "INSERT INTO reports (report_id, idea_hash, created_at, idea, analysis, meta, archived) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (report_id, key, created_at, idea, self._encode(analysis), json.dumps(meta or {}), int(archived)),
+            )
+            self._index_idea(db, key, idea)
+            self._update_metrics(db, key, report_id, created_at, archived, analysis)
+            if self.has_fts:
+                db.execute(
+                    f"INSERT INTO reports_fts (rowid, idea, {', '.join(SECTIONS)}) "
+                    f"VALUES (?, ?, {', '.join('?' for _ in SECTIONS)})",
+                    (cursor.lastrowid, idea, *(str(analysis.get(s, "")) for s in SECTIONS)),
+                )
+        return report_id
+
+    def get(self, report_id):
+        """Return one report by id, or None"""
+        row = self._conn().execute("SELECT * FROM reports WHERE report_id = ?", (report_id,)).fetchone()
+        return self._row_to_report(row) if row else None
+
+    def latest_for_idea(self, idea):
+        """Most recent report for an idea text, or None"""
+        row = self._conn().execute(
+            "SELECT * FROM reports WHERE idea_hash = ? ORDER BY created_at DESC LIMIT 1",
+            (idea_hash(idea),),
+        ).fetchone()
+        return self._row_to_report(row) if row else None
+
+    def contains(self, idea, created_at):
+        """Whether a report for this idea text saved at created_at (datetime, ISO or unix) exists"""
+        row = self._conn().execute(
+            "SELECT 1 FROM reports WHERE idea_hash = ? AND created_at = ? LIMIT 1",
+            (idea_hash(idea), _to_unix(created_at)),
+        ).fetchone()
+        return row is not None
+
+    def history(self, idea):
+        """Every report for an idea text, oldest first"""
+        rows = self._conn().execute(
+            "SELECT * FROM reports WHERE idea_hash = ? ORDER BY created_at", (idea_hash(idea),)
+        )
+        return [self._row_to_report(row) for row in rows]
+
+    def similar(self, idea, threshold=SIMILARITY_THRESHOLD, limit=5):
+        """
+        Latest reports of stored ideas that are near-duplicates of `idea`
+
+        Returns:
+            list: (score, report) pairs, best first; score is the estimated word-set
+            Jaccard similarity (1.0 for the same idea text)
+        """
+        sig = similarity.signature(idea)
+        keys = similarity.band_keys(sig)
+        db = self._conn()
+        rows = db.execute(
+            "SELECT idea_hash, signature FROM idea_signatures WHERE idea_hash IN "
+            f"(SELECT DISTINCT idea_hash FROM idea_bands WHERE band_key IN ({', '.join('?' for _ in keys)}))",
+            keys,
+        ).fetchall()
+        scored = sorted(
+            ((similarity.similarity(sig, similarity.unpack(blob)), key) for key, blob in rows),
+            reverse=True,
+        )
+        matches = []
+        for score, key in scored:
+            if score < threshold or len(matches) >= limit:
+                break
+            row = db.execute(
+                "SELECT * FROM reports WHERE idea_hash = ? ORDER BY created_at DESC LIMIT 1", (key,)
+            ).fetchone()
+            if row is not None and not row["archived"]:
+                matches.append((score, self._row_to_report(row)))
+        return matches
+
+    def latest_reports(self, include_archived=False):
+        """Yield the newest report of every idea, oldest idea first"""
+        sql = (
+            "SELECT * FROM reports AS r WHERE created_at = "
+            "(SELECT MAX(created_at) FROM reports WHERE idea_hash = r.idea_hash)"
+        )
+        if not include_archived:
+            sql += " AND archived = 0"
+        sql += " ORDER BY created_at"
+        for row in self._conn().execute(sql):
+            yield self._row_to_report(row)
+
+    def latest_metrics(self, include_archived=False):
+        """
+        Metrics of the newest report of every idea, without touching report text
+
+        Returns:
+            tuple: (report ids, one bytes object of float64 rows, one value per
+            METRIC_COLUMNS entry in each row, NaN where the report gave none)
+        """
+        sql = "SELECT report_id, metrics FROM idea_metrics"
+        if not include_archived:
+            sql += " WHERE archived = 0"
+        cursor = self._conn().cursor()
+        cursor.row_factory = None  # Plain tuples: much cheaper than sqlite3.Row for 50k rows
+        rows = cursor.execute(sql).fetchall()
+        return [row[0] for row in rows], b"".join(row[1] for row in rows)
+
+    def ideas(self, report_ids):
+        """{report id: idea text} for the given reports"""
+        ideas, report_ids = {}, list(report_ids)
+        for start in range(0, len(report_ids), 500):  # Stay under sqlite's variable limit
+            chunk = report_ids[start:start + 500]
+            rows = self._conn().execute(
+                f"SELECT report_id, idea FROM reports WHERE report_id IN ({', '.join('?' for _ in chunk)})",
+                chunk,
+            )
+            ideas.update((row["report_id"], row["idea"]) for row in rows)
+        return ideas
+
+    def _range_sql(self, columns, start, end, include_archived, limit=None):
+        clauses, args = [], []
+        if not include_archived:
+            clauses.append("r.archived = 0")
+        if start is not None:
+            clauses.append("r.created_at >= ?")
+            args.append(_to_unix(start))
+        if end is not None:
+            clauses.append("r.created_at < ?")
+            args.append(_to_unix(end))
+        sql = f"SELECT {columns} FROM reports AS r"
+        if "m." in columns:
+            sql += " LEFT JOIN idea_metrics AS m ON m.report_id = r.report_id"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY r.created_at"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return sql, args
+
+    def range(self, start=None, end=None, include_archived=False, limit=None):
+        """Yield reports created in [start, end), oldest first, without loading them all"""
+        sql, args = self._range_sql("r.*", start, end, include_archived, limit)
+        for row in self._conn().execute(sql, args):
+            yield self._row_to_report(row)
+
+    def range_with_metrics(self, start=None, end=None, include_archived=False):
+        """
+        Like range(), yielding (report, packed metrics) pairs; the metrics are the float64
+        row kept for the idea's latest report, or None for its older reports
+        """
+        sql, args = self._range_sql("r.*, m.metrics AS packed_metrics", start, end, include_archived)
+        for row in self._conn().execute(sql, args):
+            yield self._row_to_report(row), row["packed_metrics"]
+
+    def recent(self, limit=20, include_archived=False):
+        """Newest reports first"""
+        sql = "SELECT * FROM reports"
+        if not include_archived:
+            sql += " WHERE archived = 0"
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        return [self._row_to_report(row) for row in self._conn().execute(sql, (limit,))]
+
+    def search(self, query, limit=20):
+        """Full-text search over ideas and analysis sections, best matches first"""
+        db = self._conn()
+        if self.has_fts:
+            # Every word is a quoted phrase, so input like C++, "B2B or foo:bar is matched as
+            # text instead of being parsed as FTS5 query syntax; all words must appear
+            terms = " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+            if not terms:
+                return []
+            rows = db.execute(
+                "SELECT reports.* FROM reports_fts JOIN reports ON reports.id = reports_fts.rowid "
+                "WHERE reports_fts MATCH ? ORDER BY bm25(reports_fts) LIMIT ?",
+                (terms, limit),
+            )
+        else:
+            # Compressed analyses can only match on the idea here
+            pattern = f"%{query}%"
+            rows = db.execute(
+                "SELECT * FROM reports WHERE idea LIKE ? OR analysis LIKE ? "
+                "ORDER BY created_at DESC LIMIT ?",
+                (pattern, pattern, limit),
+            )
+        return [self._row_to_report(row) for row in rows]
+
+    def archive_older_than(self, days):
+        """Flag reports older than `days` as archived; returns how many were archived"""
+        cutoff = time.time() - days * 86400
+        db = self._conn()
+        with db:
+            cursor = db.execute(
+                "UPDATE reports SET archived = 1 WHERE archived = 0 AND created_at < ?", (cutoff,)
+            )
+            db.execute("UPDATE idea_metrics SET archived = 1 WHERE archived = 0 AND created_at < ?", (cutoff,))
+        return cursor.rowcount
+
+    def count(self, include_archived=False):
+        sql = "SELECT COUNT(*) FROM reports"
+        if not include_archived:
+            sql += " WHERE archived = 0"
+        return self._conn().execute(sql).fetchone()[0]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return the shared report store, opening it on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ReportStore()
+    return _store
@@ -0,0 +1,76 @@
+"""
+Per-step model routing
+Each step has a route of models in config.STEP_MODELS. The first (fast, cheap) model
+answers first, and its output is checked with the structured parsers. Only if a
+required field is missing or doesn't parse is the step asked again on the next model,
+so the larger model is paid for where the small one falls short.
+"""
+
+from agent.llm import complete
+from agent.structured import PARSERS
+from config import MODEL_NAME, STEP_MODELS
+
+
+def _weeks_covered(timeline):
+    return max((block.end_week for block in timeline.weeks), default=0)
+
+
+# Fields each step's answer must have, as (name, check on the parsed result)
+REQUIRED_FIELDS = {
+    "feasibility": [
+        ("verdict", lambda f: f.verdict is not None),
+        ("complexity", lambda f: bool(f.complexity)),
+        ("weeks_to_mvp", lambda f: f.weeks_to_mvp is not None),
+        ("budget", lambda f: f.budget is not None),
+    ],
+    "market": [
+        ("target_users", lambda m: bool(m.target_users)),
+        ("market_size", lambda m: bool(m.market_size)),
+        ("competitors", lambda m: bool(m.competitors)),
+    ],
+    "risks": [
+        ("at least 3 risks with a severity", lambda risks: len(risks) >= 3),
+    ],
+    "features": [
+        ("features", lambda plan: bool(plan.features)),
+    ],
+    "mvp": [
+        ("at least 3 phases", lambda phases: len(phases) >= 3),
+    ],
+    "timeline": [
+        ("weeks 1-12", lambda timeline: _weeks_covered(timeline) >= 12),
+    ],
+}
+
+
+def step_models(step):
+    """Models tried for a step, in order (config.STEP_MODELS, or just config.MODEL_NAME)"""
+    return STEP_MODELS.get(step) or [MODEL_NAME]
+
+
+def missing_fields(step, text):
+    """Required fields the step's answer lacks (empty if it is complete)"""
+    try:
+        parsed = PARSERS[step](text)
+    except Exception:
+        return ["parseable answer"]
+    return [name for name, check in REQUIRED_FIELDS.get(step, ()) if not check(parsed)]
+
+
+def complete_routed(step, template, idea, on_token=None, **options):
+    """
+    llm.complete() on the step's route: return the first answer that has every required
+    field, or the last model's answer if none does
+
+    A streamed answer that turns out incomplete is followed by a notice line and the
+    next model's answer on the same on_token callback.
+    """
+    models = step_models(step)
+    for attempt, model in enumerate(models):
+        text = complete(step, template, idea, model=model, on_token=on_token, attempt=attempt, **options)
+        missing = missing_fields(step, text) if attempt + 1 < len(models) else []
+        if not missing:
+            return text
+        if on_token is not None:
+            on_token(f"\n\n[missing {', '.join(missing)}; asking {models[attempt + 1]}]\n\n")
+    return text
@@ -0,0 +1,224 @@
+"""
+Rate-limit-aware request scheduler for Groq calls
+Every API call waits here for its turn: interactive calls go before batch calls, both
+token buckets must have room, and 429/5xx/connection failures are retried with jittered backoff
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import re
+import threading
+import time
+
+from agent.rate_limit import RateLimiter
+from config import (
+    RATE_LIMIT_REQUESTS_PER_MINUTE,
+    RATE_LIMIT_TOKENS_PER_MINUTE,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_MAX_DELAY,
+)
+
+# Lower number = served first
+INTERACTIVE = 0
+BATCH = 1
+
+
+def retryable_errors():
+    """Errors worth retrying; groq is imported lazily, and is loaded by the time a call fails"""
+    import groq
+
+    return (groq.RateLimitError, groq.InternalServerError, groq.APIConnectionError)
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def parse_duration(value):
+    """Parse Groq reset headers like "7.66s", "2m59.56s" or "500ms" into seconds"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class Scheduler:
+    """Process-wide gate in front of the Groq API"""
+
+    def __init__(self, requests_per_minute=RATE_LIMIT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=RATE_LIMIT_TOKENS_PER_MINUTE,
+                 max_attempts=RETRY_MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY,
+                 max_delay=RETRY_MAX_DELAY):
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0, "failures": 0}
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+
+    def set_limits(self, requests_per_minute, tokens_per_minute):
+        """Replace both budgets (e.g. with a batch run's own quota)"""
+        self.set_limiter(RateLimiter(requests_per_minute, tokens_per_minute))
+
+    def set_limiter(self, limiter):
+        """Use another limiter, e.g. a rate_limit.SqliteRateLimiter shared with other processes"""
+        with self._cond:
+            self.limiter = limiter
+            self._cond.notify_all()
+
+    def _admit(self, priority, estimated_tokens):
+        """Block until this caller is first in line and both budgets have room, then charge them"""
+        ticket = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            self._cond.notify_all()
+            while True:
+                if self._queue[0] != ticket:
+                    self._cond.wait()
+                    continue
+                delay = self._paused_until - time.monotonic()
+                if delay <= 0:
+                    # Check and charge in one step, so a shared limiter can't be overspent in between
+                    delay = self.limiter.try_acquire(estimated_tokens)
+                if delay <= 0:
+                    heapq.heappop(self._queue)
+                    self._cond.notify_all()
+                    return
+                # Wake early if a higher-priority caller jumps the queue
+                self._cond.wait(delay)
+
+    def _pause(self, seconds):
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def observe_headers(self, headers):
+        """Sync the local buckets with the x-ratelimit-* headers of a response"""
+        if not headers:
+            return
+        remaining_requests = headers.get("x-ratelimit-remaining-requests")
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        try:
+            if remaining_requests is not None:
+                self.limiter.requests.cap(int(remaining_requests))
+                if int(remaining_requests) <= 0:
+                    self._pause(parse_duration(headers.get("x-ratelimit-reset-requests")) or 1.0)
+            if remaining_tokens is not None:
+                self.limiter.tokens.cap(int(remaining_tokens))
+                if int(remaining_tokens) <= 0:
+                    self._pause(parse_duration(headers.get("x-ratelimit-reset-tokens")) or 1.0)
+        except ValueError:
+            pass
+
+    def _backoff(self, error, attempt):
+        """Seconds to wait before retrying, or None if the error should not be retried"""
+        import groq
+
+        if not isinstance(error, retryable_errors()) or attempt + 1 >= self.max_attempts:
+            return None
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        retry_after = parse_duration(headers.get("retry-after"))
+        if isinstance(error, groq.RateLimitError):
+            self.stats["rate_limited"] += 1
+            self.observe_headers(headers)
+            if retry_after is not None:
+                # Everyone waits, not just this caller, so a 429 doesn't turn into a storm
+                self._pause(retry_after)
+                return retry_after
+        if retry_after is not None:
+            return retry_after
+        # Full jitter exponential backoff
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, send, estimated_tokens, priority=INTERACTIVE, on_retry=None, trace=None):
+        """
+        Run send() once admitted, retrying transient failures
+
+        Args:
+            send (callable): Makes the request and returns a raw response with .headers
+            estimated_tokens (int): Tokens reserved from the budget before the call
+            priority (int): INTERACTIVE or BATCH
+            on_retry (callable): Called with (attempt, error, delay) before each retry
+            trace (dict): If given, "queue_wait" (seconds) and "retries" are added to it
+        """
+        attempt = 0
+        while True:
+            queued = time.monotonic()
+            self._admit(priority, estimated_tokens)
+            if trace is not None:
+                trace["queue_wait"] = trace.get("queue_wait", 0.0) + time.monotonic() - queued
+            self.stats["requests"] += 1
+            try:
+                raw = send()
+            except Exception as e:
+                delay = self._backoff(e, attempt)
+                if delay is None:
+                    self.stats["failures"] += 1
+                    raise
+                self.stats["retries"] += 1
+                if trace is not None:
+                    trace["retries"] = trace.get("retries", 0) + 1
+                if on_retry is not None:
+                    on_retry(attempt + 1, e, delay)
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self.observe_headers(getattr(raw, "headers", None))
+            return raw
+
+    async def acall(self, send, estimated_tokens, priority=INTERACTIVE, on_retry=None, trace=None):
+        """Async counterpart of call(); send is a coroutine function"""
+        attempt = 0
+        while True:
+            queued = time.monotonic()
+            await asyncio.to_thread(self._admit, priority, estimated_tokens)
+            if trace is not None:
+                trace["queue_wait"] = trace.get("queue_wait", 0.0) + time.monotonic() - queued
+            self.stats["requests"] += 1
+            try:
+                raw = await send()
+            except Exception as e:
+                delay = self._backoff(e, attempt)
+                if delay is None:
+                    self.stats["failures"] += 1
+                    raise
+                self.stats["retries"] += 1
+                if trace is not None:
+                    trace["retries"] = trace.get("retries", 0) + 1
+                if on_retry is not None:
+                    on_retry(attempt + 1, e, delay)
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self.observe_headers(getattr(raw, "headers", None))
+            return raw
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """Correct the token budget with the usage reported by the API"""
+        self.limiter.settle(estimated_tokens, actual_tokens)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Return the process-wide scheduler, building it on first use"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = Scheduler()
+    return _scheduler
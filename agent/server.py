@@ -0,0 +1,419 @@
+"""
+HTTP API for the Startup Validator Agent
+A small asyncio HTTP/1.1 server (no web framework needed) in front of the step pipeline:
+
+    POST /analyze          {"idea": ..., "one_shot": false, "use_cache": true} -> report JSON
+    POST /analyze?stream=1 same body (or Accept: text/event-stream) -> server-sent events
+                           (token deltas, each section's fields parsed so far, each section)
+    POST /batch            {"ideas": [idea or {"id", "idea"}, ...]} -> one JSON line per idea
+    GET  /reports/<id>     a saved report
+    GET  /health           queue and coalescing counters
+
+Pipelines run on a bounded worker pool and share the process-wide Groq client, scheduler
+and cache. Requests for an idea that is already being analyzed join that analysis instead
+of starting another one, and new ideas get 503 + Retry-After once the queue is full.
+"""
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from agent.cache import idea_hash
+from agent.incremental import step_fingerprints
+from agent.pipeline import StepSkipped, iter_steps
+from agent.report_store import get_store
+from agent.scheduler import BATCH, INTERACTIVE
+from agent.single_flight import flights
+from agent.structured import PARSERS, StreamingParser, to_plain
+from config import SERVER_MAX_BODY_BYTES, SERVER_MAX_QUEUE, SERVER_RETRY_AFTER, SERVER_WORKERS
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class Request:
+    __slots__ = ("method", "path", "query", "headers", "body", "streaming")
+
+    def __init__(self, method, target, headers, body):
+        url = urlsplit(target)
+        self.method = method
+        self.path = url.path.rstrip("/") or "/"
+        self.query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        self.headers = headers
+        self.body = body
+        self.streaming = False  # Set once a streamed response has sent its headers
+
+    def json(self):
+        try:
+            return json.loads(self.body or b"{}")
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPError(400, "request body is not valid JSON")
+
+    @property
+    def keep_alive(self):
+        return self.headers.get("connection", "").lower() != "close"
+
+
+def flag(options, name, default):
+    """A true/false option of a JSON body; anything but a JSON boolean (e.g. "false") is a 400"""
+    value = options.get(name, default)
+    if not isinstance(value, bool):
+        raise HTTPError(400, f'"{name}" must be true or false')
+    return value
+
+
+async def read_request(reader):
+    """Parse one HTTP/1.1 request from the stream, or return None when the client hung up"""
+    try:
+        line = await reader.readline()
+        if not line:
+            return None
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise HTTPError(400, "malformed request")
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "malformed Content-Length")
+    if length < 0:
+        raise HTTPError(400, "malformed Content-Length")
+    if length > SERVER_MAX_BODY_BYTES:
+        raise HTTPError(413, f"request body over {SERVER_MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method, target, headers, body)
+
+
+def _head(status, headers):
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def send_json(writer, status, body, keep_alive=True, headers=None):
+    payload = json.dumps(body).encode("utf-8")
+    writer.write(_head(status, {
+        "Content-Type": "application/json",
+        "Content-Length": len(payload),
+        "Connection": "keep-alive" if keep_alive else "close",
+        **(headers or {}),
+    }) + payload)
+    await writer.drain()
+
+
+async def start_stream(request, writer, content_type):
+    """Headers of a streamed response; its body ends when the connection closes"""
+    request.streaming = True
+    writer.write(_head(200, {"Content-Type": content_type, "Cache-Control": "no-cache", "Connection": "close"}))
+    await writer.drain()
+
+
+def job_key(idea, one_shot, use_cache):
+    """Requests with the same key share one analysis; a fresh (uncached) run never joins a cached one"""
+    return idea_hash(idea), bool(one_shot), bool(use_cache)
+
+
+class Job:
+    """
+    One analysis shared by every request for the same idea
+
+    Events ("token", "parsed", "step", "done") are kept in order, so a client that joins
+    late gets the full stream replayed before the live events. Token events, and the
+    "parsed" events with a section's typed fields as they complete, are only produced
+    when the request that started the job asked for a stream; "step" events always carry
+    each section's full text.
+    """
+
+    def __init__(self, key, idea, one_shot, use_cache, priority, stream=False):
+        self.key = key
+        self.idea = idea
+        self.stream_tokens = stream
+        self.one_shot = one_shot
+        self.use_cache = use_cache
+        self.priority = priority
+        self.events = []
+        self.listeners = set()
+        self.result = asyncio.get_running_loop().create_future()
+        self.task = None  # Keeps the running analysis task referenced
+
+    def publish(self, event, data):
+        self.events.append((event, data))
+        for queue in self.listeners:
+            queue.put_nowait((event, data))
+
+    async def stream(self):
+        """Yield (event, data) from the first event through "done" """
+        queue = asyncio.Queue()
+        for item in self.events:
+            queue.put_nowait(item)
+        self.listeners.add(queue)
+        try:
+            while True:
+                event, data = await queue.get()
+                yield event, data
+                if event == "done":
+                    return
+        finally:
+            self.listeners.discard(queue)
+
+
+class ValidatorServer:
+    """asyncio HTTP server; call start() from a running event loop, then serve_forever()"""
+
+    def __init__(self, host, port, workers=SERVER_WORKERS, max_queue=SERVER_MAX_QUEUE, store=None):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_queue = max_queue
+        self.store = store or get_store()
+        self.stats = {"requests": 0, "analyses": 0, "coalesced": 0, "rejected": 0}
+        self._jobs = {}  # job_key() -> Job, while the analysis runs
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analyze")
+        self._server = None
+        self._loop = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    def submit(self, idea, one_shot=False, use_cache=True, priority=INTERACTIVE, stream=False):
+        """The running job for this idea, or a new one; raises HTTPError(503) when the queue is full"""
+        key = job_key(idea, one_shot, use_cache)
+        job = self._jobs.get(key)
+        if job is not None:
+            self.stats["coalesced"] += 1
+            return job
+        if len(self._jobs) >= self.workers + self.max_queue:
+            self.stats["rejected"] += 1
+            raise HTTPError(503, "analysis queue is full, retry later",
+                            {"Retry-After": SERVER_RETRY_AFTER})
+        job = self._jobs[key] = Job(key, idea, bool(one_shot), bool(use_cache), priority, stream)
+        self.stats["analyses"] += 1
+        job.task = asyncio.ensure_future(self._run(job))
+        return job
+
+    async def _run(self, job):
+        try:
+            record = await self._loop.run_in_executor(self._executor, self._analyze, job)
+        except Exception as e:  # Pipeline steps report their own errors; this is anything else
+            record = {"id": None, "idea": job.idea, "analysis": {}, "errors": {"pipeline": str(e)}}
+        del self._jobs[job.key]
+        job.publish("done", record)
+        job.result.set_result(record)
+
+    def _analyze(self, job):
+        """Worker thread: run the pipeline, forwarding its events to the job, and save the report"""
+        def publish(event, data):
+            self._loop.call_soon_threadsafe(job.publish, event, data)
+
+        parsers = {key: StreamingParser(key) for key in PARSERS}
+
+        def on_token(step, text):
+            publish("token", {"step": step, "text": text})
+            parsed = parsers[step].feed(text)
+            if parsed is not None:
+                publish("parsed", {"step": step, "data": to_plain(parsed)})
+
+        results, errors, skipped = {}, {}, []
+        for key, result, error in iter_steps(
+            job.idea,
+            one_shot=job.one_shot,
+            on_token=on_token if job.stream_tokens else None,
+            use_cache=job.use_cache,
+            priority=job.priority,
+        ):
+            if error is None:
+                results[key] = result
+                publish("step", {"step": key, "text": result})
+            elif isinstance(error, StepSkipped):
+                skipped.append(key)
+                publish("step", {"step": key, "skipped": str(error)})
+            else:
+                errors[key] = str(error)
+                publish("step", {"step": key, "error": str(error)})
+
+        report_id = None
+        if results:
+            fingerprints = step_fingerprints(job.idea)
+            meta = {"fingerprints": {key: fingerprints[key] for key in results if key not in errors}}
+            if skipped:
+                meta["triaged"] = True
+            report_id = self.store.save(job.idea, results, meta=meta)
+        record = {"id": report_id, "idea": job.idea, "analysis": results, "errors": errors}
+        if skipped:
+            record.update(triaged=True, skipped=skipped)
+        return record
+
+    @property
+    def queued(self):
+        return max(0, len(self._jobs) - self.workers)
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request = None
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    self.stats["requests"] += 1
+                    if not await self._route(request, writer):
+                        break
+                except HTTPError as e:
+                    await send_json(writer, e.status, {"error": str(e)}, keep_alive=False, headers=e.headers)
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    # E.g. the report store failing: answer rather than leave the client waiting
+                    target = f"{request.method} {request.path}" if request is not None else "request"
+                    print(f"❌ {target}: {type(e).__name__}: {e}", flush=True)
+                    if request is None or not request.streaming:
+                        await send_json(writer, 500, {"error": "internal server error"}, keep_alive=False)
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # Client went away
+        finally:
+            writer.close()
+
+    async def _route(self, request, writer):
+        """Answer one request; returns whether the connection can take another"""
+        routes = {
+            "/analyze": ("POST", self._analyze_endpoint),
+            "/batch": ("POST", self._batch_endpoint),
+            "/health": ("GET", self._health_endpoint),
+        }
+        if request.path.startswith("/reports/"):
+            method, handler = "GET", self._report_endpoint
+        elif request.path in routes:
+            method, handler = routes[request.path]
+        else:
+            raise HTTPError(404, f"no route for {request.path}")
+        if request.method != method:
+            raise HTTPError(405, f"use {method} for {request.path}", {"Allow": method})
+        return await handler(request, writer)
+
+    def _idea_from(self, value):
+        idea = value.get("idea") if isinstance(value, dict) else value
+        if not isinstance(idea, str) or not idea.strip():
+            raise HTTPError(400, 'every idea needs non-empty "idea" text')
+        return idea.strip()
+
+    async def _analyze_endpoint(self, request, writer):
+        body = request.json()
+        if not isinstance(body, dict):
+            raise HTTPError(400, "request body must be a JSON object")
+        streaming = (request.query.get("stream", "").lower() in ("1", "true", "yes")
+                     or "text/event-stream" in request.headers.get("accept", ""))
+        job = self.submit(self._idea_from(body), one_shot=flag(body, "one_shot", False),
+                          use_cache=flag(body, "use_cache", True), stream=streaming)
+        if not streaming:
+            record = await asyncio.shield(job.result)
+            await send_json(writer, 200, record, keep_alive=request.keep_alive)
+            return request.keep_alive
+
+        await start_stream(request, writer, "text/event-stream")
+        async for event, data in job.stream():
+            writer.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+            await writer.drain()
+        return False
+
+    async def _batch_endpoint(self, request, writer):
+        body = request.json()
+        items = body.get("ideas") if isinstance(body, dict) else body
+        if not isinstance(items, list) or not items:
+            raise HTTPError(400, 'request body needs a non-empty "ideas" list')
+        options = body if isinstance(body, dict) else {}
+        one_shot = flag(options, "one_shot", False)
+        use_cache = flag(options, "use_cache", True)
+        ideas = []
+        for item in items:
+            idea = self._idea_from(item)
+            key = item.get("id") if isinstance(item, dict) else None
+            ideas.append((str(key or idea_hash(idea)), idea))
+        # All or nothing: a batch is only accepted if the queue has room for every new idea
+        new = {job_key(idea, one_shot, use_cache) for _, idea in ideas} - self._jobs.keys()
+        if len(self._jobs) + len(new) > self.workers + self.max_queue:
+            self.stats["rejected"] += 1
+            raise HTTPError(503, f"analysis queue can't take {len(new)} more ideas, retry later",
+                            {"Retry-After": SERVER_RETRY_AFTER})
+        jobs = [
+            (key, self.submit(idea, one_shot=one_shot, use_cache=use_cache, priority=BATCH))
+            for key, idea in ideas
+        ]
+
+        # Same records as batch.py's output file, in the order ideas finish
+        await start_stream(request, writer, "application/x-ndjson")
+        waiting = {asyncio.ensure_future(asyncio.shield(job.result)): key for key, job in jobs}
+        while waiting:
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                record = future.result()
+                line = {"id": waiting.pop(future), "timestamp": datetime.now().isoformat(),
+                        "idea": record["idea"], "analysis": record["analysis"],
+                        "errors": record["errors"], "report_id": record["id"]}
+                if record.get("triaged"):
+                    line.update(triaged=True, skipped=record["skipped"])
+                writer.write((json.dumps(line) + "\n").encode("utf-8"))
+            await writer.drain()
+        return False
+
+    async def _report_endpoint(self, request, writer):
+        report_id = request.path[len("/reports/"):]
+        report = await asyncio.to_thread(self.store.get, report_id)
+        if report is None:
+            raise HTTPError(404, f"no report {report_id}")
+        await send_json(writer, 200, report, keep_alive=request.keep_alive)
+        return request.keep_alive
+
+    async def _health_endpoint(self, request, writer):
+        body = {"status": "ok", "running": len(self._jobs) - self.queued, "queued": self.queued,
+                "time": time.time(), **self.stats,
+                # Analyzer calls that shared an identical in-flight call's answer, across all jobs
+                "calls_coalesced": flights.stats["coalesced"]}
+        await send_json(writer, 200, body, keep_alive=request.keep_alive)
+        return request.keep_alive
+
+
+async def serve(host, port, workers=SERVER_WORKERS, max_queue=SERVER_MAX_QUEUE, on_ready=None):
+    """Run the API until cancelled; on_ready(server) is called once it is listening"""
+    server = await ValidatorServer(host, port, workers, max_queue).start()
+    if on_ready is not None:
+        on_ready(server)
+    try:
+        await server.serve_forever()
+    finally:
+        server.close()
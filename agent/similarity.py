@@ -0,0 +1,85 @@
+"""
+Near-duplicate detection for idea texts
+Ideas are reduced to word sets, hashed into MinHash signatures and split into LSH bands;
+the report store indexes the band keys, so a lookup only compares the handful of stored
+ideas that share a band and never scans the whole table
+"""
+
+import hashlib
+import re
+from array import array
+
+from config import SIMILARITY_BANDS, SIMILARITY_ROWS
+
+SIGNATURE_LENGTH = SIMILARITY_BANDS * SIMILARITY_ROWS
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can for from has have in into is it its of on or that the "
+    "their them they this to using uses use via we which who will with your you our "
+    "app apps platform tool service startup".split()
+)
+
+
+def _stem(word):
+    """Crude suffix stripping so "tracks"/"tracking"/"tracked" hash alike"""
+    for suffix in ("ing", "ed", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def tokens(text):
+    """Set of normalized content words of an idea"""
+    return {_stem(word) for word in _WORD.findall(text.lower()) if word not in _STOPWORDS}
+
+
+def _token_hashes(token):
+    """SIGNATURE_LENGTH independent 64-bit hashes of a token in one SHAKE call"""
+    return array("Q", hashlib.shake_128(token.encode("utf-8")).digest(8 * SIGNATURE_LENGTH))
+
+
+def signature(text):
+    """MinHash signature of an idea: per hash function, the minimum over its words"""
+    rows = [_token_hashes(token) for token in tokens(text)] or [array("Q", bytes(8 * SIGNATURE_LENGTH))]
+    return list(map(min, zip(*rows)))
+
+
+def band_keys(sig):
+    """One signed 64-bit key per LSH band: band number in the top bits, row hash below"""
+    keys = []
+    for band in range(SIMILARITY_BANDS):
+        rows = sig[band * SIMILARITY_ROWS:(band + 1) * SIMILARITY_ROWS]
+        digest = hashlib.blake2b(array("Q", rows).tobytes(), digest_size=7).digest()
+        keys.append((band << 56) | int.from_bytes(digest, "little"))
+    return keys
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two ideas' word sets"""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def pack(sig):
+    return array("Q", sig).tobytes()
+
+
+def unpack(blob):
+    return array("Q", blob).tolist()
+
+
+def diff_ideas(old, new):
+    """Word-level diff of two idea texts: [-removed-] and {+added+}"""
+    import difflib
+
+    old_words, new_words = old.split(), new.split()
+    parts = []
+    for op, i1, i2, j1, j2 in difflib.SequenceMatcher(a=old_words, b=new_words).get_opcodes():
+        if op == "equal":
+            parts.append(" ".join(old_words[i1:i2]))
+            continue
+        if i2 > i1:
+            parts.append("[-" + " ".join(old_words[i1:i2]) + "-]")
+        if j2 > j1:
+            parts.append("{+" + " ".join(new_words[j1:j2]) + "+}")
+    return " ".join(parts)
@@ -0,0 +1,79 @@
+"""
+Single-flight deduplication of identical in-flight calls
+The first caller for a key runs the call; callers asking for the same key while it is
+still running wait for that call's outcome instead of making their own. Threads and
+coroutines share one registry of futures, so a coroutine can join a call a thread is
+making and the other way round.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Registry of in-flight calls by key, with counts of calls made and callers coalesced"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future of the running call
+        self.stats = {"calls": 0, "coalesced": 0}
+
+    def _join(self, key):
+        """Return (future, True) for a new call this caller must run, or the running one's future"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.stats["calls"] += 1
+            return future, True
+
+    def _settle(self, key, future, result=None, error=None):
+        # Settled before removal, so a caller arriving in between still gets this outcome
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+        with self._lock:
+            del self._calls[key]
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key, fn):
+        """
+        Run fn() unless an identical call is in flight, then wait for that one
+
+        Returns:
+            tuple: (result, shared) - shared is True if the result came from another caller's call
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn()
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, result)
+        return result, False
+
+    async def ado(self, key, fn):
+        """Async counterpart of do(); fn is a coroutine function"""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future), True
+        try:
+            result = await fn()
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, result)
+        return result, False
+
+
+# Process-wide registry for analyzer calls (see agent/llm.py)
+flights = SingleFlight()
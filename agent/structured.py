@@ -0,0 +1,635 @@
+"""
+Typed results parsed from analyzer output
+The prompts already fix each step's layout ("- Label: value" lines, **HEADING** blocks),
+so the text is parsed into compact __slots__ dataclasses; JSON answers (e.g. from a
+JSON-mode model) are accepted too. Parsing tolerates truncated or still-streaming text,
+so comparison, summaries and CSV export never need another LLM call.
+"""
+
+import json
+import re
+from dataclasses import asdict, dataclass, field, fields, is_dataclass
+from typing import Optional
+
+
+@dataclass(slots=True)
+class Feasibility:
+    complexity: str = ""                  # "Low" / "Medium" / "High"
+    complexity_note: str = ""
+    weeks_to_mvp: Optional[int] = None    # Upper end of the estimate
+    budget: Optional[float] = None        # US dollars, upper end of the estimate
+    budget_note: str = ""
+    team_size: Optional[int] = None
+    dependencies: list = field(default_factory=list)
+    verdict: Optional[bool] = None        # YES / NO
+    verdict_reason: str = ""
+
+
+@dataclass(slots=True)
+class Market:
+    target_users: str = ""
+    tam: Optional[float] = None           # US dollars, None if given as a user count
+    market_size: str = ""
+    demand: str = ""
+    competitors: list = field(default_factory=list)
+    value_proposition: str = ""
+    go_to_market: str = ""
+
+
+@dataclass(slots=True)
+class Risk:
+    category: str = ""                    # "Technical", "Market", ...
+    name: str = ""
+    severity: str = ""                    # "High" / "Medium" / "Low"
+    impact: str = ""
+    mitigation: str = ""
+
+
+@dataclass(slots=True)
+class Feature:
+    name: str = ""
+    why: str = ""
+    outcome: str = ""
+
+
+@dataclass(slots=True)
+class FeaturePlan:
+    improvements: list = field(default_factory=list)
+    hypothesis: str = ""
+    features: list = field(default_factory=list)      # [Feature]
+    out_of_scope: list = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Phase:
+    number: int = 0
+    name: str = ""
+    start_week: Optional[int] = None
+    end_week: Optional[int] = None        # None for open-ended ("Weeks 10+")
+    build: list = field(default_factory=list)
+    deliverable: str = ""
+    success_criteria: str = ""
+
+
+@dataclass(slots=True)
+class Task:
+    name: str = ""
+    owner: str = ""
+
+
+@dataclass(slots=True)
+class WeekBlock:
+    start_week: int = 0
+    end_week: int = 0
+    title: str = ""
+    tasks: list = field(default_factory=list)         # [Task]
+    milestone: str = ""
+
+
+@dataclass(slots=True)
+class Timeline:
+    weeks: list = field(default_factory=list)         # [WeekBlock]
+    critical_path: list = field(default_factory=list)
+    assumptions: list = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Analysis:
+    feasibility: Optional[Feasibility] = None
+    market: Optional[Market] = None
+    risks: list = field(default_factory=list)         # [Risk]
+    features: Optional[FeaturePlan] = None
+    mvp: list = field(default_factory=list)           # [Phase]
+    timeline: Optional[Timeline] = None
+
+    def to_dict(self):
+        return asdict(self)
+
+
+# Element types of list fields, for building objects from JSON
+_ITEM_TYPES = {
+    (FeaturePlan, "features"): Feature,
+    (WeekBlock, "tasks"): Task,
+    (Timeline, "weeks"): WeekBlock,
+}
+
+
+# ----------------------------------------------------------------------------
+# Text helpers
+# ----------------------------------------------------------------------------
+
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+_MARKUP = re.compile(r"\*\*|__|`")
+_LABEL = re.compile(r"^([A-Za-z][A-Za-z0-9 /&()'-]{1,40}?)\s*:\s*(.*)$")
+_NUMBER = r"(\d+(?:[.,]\d+)*)"
+_MONEY = re.compile(r"\$\s*" + _NUMBER + r"\s*(k|m|b|bn|thousand|million|billion|trillion|t)?\b", re.I)
+_SCALE = {"k": 1e3, "thousand": 1e3, "m": 1e6, "million": 1e6, "b": 1e9, "bn": 1e9,
+          "billion": 1e9, "t": 1e12, "trillion": 1e12}
+_PLACEHOLDER = re.compile(r"^\[[^\]]*\]$")
+
+
+def _clean(line):
+    """A line without list bullets, markdown emphasis and surrounding whitespace"""
+    return _MARKUP.sub("", _BULLET.sub("", line)).strip()
+
+
+def _value(text):
+    """Empty string for unfilled template placeholders like "[X weeks]" """
+    text = text.strip()
+    return "" if _PLACEHOLDER.match(text) else text
+
+
+def _split(text, separator=r"\s+[-–—]\s+"):
+    return [part.strip() for part in re.split(separator, text) if part.strip()]
+
+
+def _items(text):
+    """Comma/semicolon separated list"""
+    return [_value(item) for item in re.split(r"[;,]\s*", text) if _value(item)]
+
+
+def _max_int(text):
+    numbers = [int(n) for n in re.findall(r"\d+", text)]
+    return max(numbers) if numbers else None
+
+
+def _money(text):
+    """Largest dollar amount in the text ("$20,000-$40,000" -> 40000, "$5B" -> 5e9)"""
+    amounts = []
+    for number, scale in _MONEY.findall(text):
+        value = float(number.replace(",", ""))
+        amounts.append(value * _SCALE.get(scale.lower(), 1) if scale else value)
+    return max(amounts) if amounts else None
+
+
+def _is_heading(line):
+    stripped = line.strip()
+    return stripped.startswith("#") or (
+        stripped.startswith("**") and stripped.rstrip(":").endswith("**") and len(stripped) > 4
+    )
+
+
+def _blocks(text):
+    """Split text into (heading, [lines]) blocks; lines before the first heading get heading ''"""
+    blocks = [("", [])]
+    for line in text.splitlines():
+        if _is_heading(line):
+            blocks.append((_clean(line.strip().lstrip("#")).rstrip(":").strip(), []))
+        elif line.strip():
+            blocks[-1][1].append(line)
+    return [block for block in blocks if block[0] or block[1]]
+
+
+def _labelled(lines):
+    """{lowercase label: value} for "Label: value" lines"""
+    values = {}
+    for line in lines:
+        match = _LABEL.match(_clean(line))
+        if match:
+            values.setdefault(match.group(1).strip().lower(), _value(match.group(2)))
+    return values
+
+
+def _find(values, *prefixes):
+    for label, value in values.items():
+        if label.startswith(prefixes):
+            return value
+    return ""
+
+
+# ----------------------------------------------------------------------------
+# JSON (possibly truncated)
+# ----------------------------------------------------------------------------
+
+def _close_json(text):
+    """Close an unterminated JSON document: open strings, then brackets in reverse order"""
+    stack, in_string, escaped = [], False, False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+    if in_string:
+        text += '"'
+    text = re.sub(r"[\s,:]+$", "", text)
+    return text + "".join(reversed(stack))
+
+
+def loads_partial(text):
+    """
+    Parse a JSON object that may be wrapped in ``` fences or cut off mid-stream
+
+    Returns the object parsed so far, or None if no object has started yet.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    body = text[start:].strip().removesuffix("```").strip()
+    try:
+        return json.loads(body)
+    except json.JSONDecodeError:
+        pass
+    # Drop the incomplete trailing member, one separator at a time
+    cut = len(body)
+    for _ in range(32):
+        try:
+            return json.loads(_close_json(body[:cut]))
+        except json.JSONDecodeError:
+            cut = max(body.rfind(",", 0, cut), body.rfind("{", 0, cut) + 1, body.rfind("[", 0, cut) + 1)
+            if cut <= 0:
+                return None
+    return None
+
+
+def _to_str(value):
+    if isinstance(value, str):
+        return _value(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return None
+
+
+def _to_level(value):
+    """First word, capitalized: "medium - some APIs" -> "Medium" (complexity, severity)"""
+    value = _to_str(value)
+    return value.split()[0].capitalize() if value else None
+
+
+def _to_number(value, parse):
+    """Numbers pass through, text goes through the text path's parser, anything else is dropped"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        return parse(value)
+    return None
+
+
+def _to_int(value, parse=_max_int):
+    value = _to_number(value, parse)
+    return None if value is None else int(value)
+
+
+def _to_money(value):
+    # "$20k" like the text path; "20000" or "5B" as if they had the dollar sign
+    value = _to_number(value, lambda text: _money(text) or _money("$" + text.strip()))
+    return None if value is None else float(value)
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        word = re.match(r"\W*(yes|no|true|false)\b", value, re.I)
+        return None if word is None else word.group(1).lower() in ("yes", "true")
+    return None
+
+
+def _to_list(value):
+    """List of non-empty strings; a single string is split like the text path's lists"""
+    if isinstance(value, str):
+        return _items(value)
+    if isinstance(value, list):
+        return [item for item in map(_to_str, value) if item]
+    return None
+
+
+# Normalisers by field type, so JSON values end up typed like the text path's
+_NORMALISERS = {
+    str: _to_str,
+    int: _to_int,
+    Optional[int]: _to_int,
+    Optional[float]: _to_money,
+    Optional[bool]: _to_bool,
+    list: _to_list,
+}
+_FIELD_NORMALISERS = {
+    (Feasibility, "complexity"): _to_level,
+    (Feasibility, "team_size"): lambda value: _to_int(value, _team_size),
+    (Risk, "severity"): _to_level,
+}
+
+
+def _from_json(cls, data):
+    """
+    Build a dataclass from a dict, ignoring unknown keys
+
+    Every value goes through its field's normaliser; values that don't convert (e.g. a
+    verdict of "maybe", a budget of {}) are dropped and the field keeps its default.
+    """
+    if not isinstance(data, dict):
+        return cls()
+    values = {}
+    for f in fields(cls):
+        if f.name not in data:
+            continue
+        value = data[f.name]
+        item_type = _ITEM_TYPES.get((cls, f.name))
+        if item_type is not None:
+            value = [_from_json(item_type, item) for item in value if isinstance(item, dict)] \
+                if isinstance(value, list) else None
+        else:
+            value = _FIELD_NORMALISERS.get((cls, f.name), _NORMALISERS[f.type])(value)
+        if value is not None:
+            values[f.name] = value
+    return cls(**values)
+
+
+def _json_items(text, name, cls):
+    """Objects of the list under `name` in a JSON answer (risks, phases)"""
+    data = loads_partial(text)
+    items = data.get(name) if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        return []
+    return [_from_json(cls, item) for item in items if isinstance(item, dict)]
+
+
+def _looks_like_json(text):
+    stripped = text.lstrip()
+    return stripped.startswith("{") or stripped.startswith("```json")
+
+
+# ----------------------------------------------------------------------------
+# Step parsers
+# ----------------------------------------------------------------------------
+
+def parse_feasibility(text):
+    if _looks_like_json(text):
+        return _from_json(Feasibility, loads_partial(text))
+    values = _labelled(text.splitlines())
+    result = Feasibility()
+    complexity = _split(_find(values, "technical complexity", "complexity"))
+    if complexity:
+        result.complexity = _value(complexity[0]).split()[0].capitalize() if _value(complexity[0]) else ""
+        result.complexity_note = " - ".join(complexity[1:])
+    weeks = _find(values, "estimated time", "time to mvp", "timeline")
+    result.weeks_to_mvp = _max_int(weeks)
+    budget = _find(values, "budget")
+    result.budget = _money(budget)
+    result.budget_note = budget
+    result.team_size = _team_size(_find(values, "team size", "team"))
+    result.dependencies = _items(_find(values, "critical dependencies", "dependencies"))
+    verdict = _find(values, "feasibility verdict", "verdict")
+    if verdict:
+        word = re.match(r"\W*(yes|no)\b", verdict, re.I)
+        result.verdict = None if word is None else word.group(1).lower() == "yes"
+        result.verdict_reason = " - ".join(_split(verdict)[1:])
+    return result
+
+
+def _team_size(text):
+    """Sum of the headcounts in "2-3 developers, 1 designer, 0.5 founder" (ranges count high)"""
+    total = 0.0
+    for part in re.split(r"[,;+]|\band\b", text):
+        numbers = [float(n) for n in re.findall(r"\d+(?:\.\d+)?", part)]
+        total += max(numbers) if numbers else 0
+    return round(total) if total else None
+
+
+def parse_market(text):
+    if _looks_like_json(text):
+        return _from_json(Market, loads_partial(text))
+    values = _labelled(text.splitlines())
+    size = _find(values, "market size", "tam")
+    return Market(
+        target_users=_find(values, "target users", "target"),
+        tam=_money(size),
+        market_size=size,
+        demand=_find(values, "demand"),
+        competitors=_items(_find(values, "top 3 competitors", "competitors", "competition")),
+        value_proposition=_find(values, "unique value", "value proposition", "uvp"),
+        go_to_market=_find(values, "initial go-to-market", "go-to-market", "go to market"),
+    )
+
+
+_SEVERITY = re.compile(r"\(?\s*severity\s*:\s*(high|medium|low)[^)]*\)?", re.I)
+
+
+def parse_risks(text):
+    if _looks_like_json(text):
+        return _json_items(text, "risks", Risk)
+    risks = []
+    for heading, lines in _blocks(text):
+        category = re.sub(r"\s*risks?$", "", heading, flags=re.I).title()
+        for line in lines:
+            cleaned = _clean(line)
+            severity = _SEVERITY.search(cleaned)
+            if severity is None:
+                continue
+            name = _value(cleaned[:severity.start()].strip(" -:"))
+            rest = _split(cleaned[severity.end():].strip(" -:"))
+            if not name or name.startswith("[Risk"):
+                continue
+            risks.append(Risk(
+                category=category,
+                name=name,
+                severity=severity.group(1).capitalize(),
+                impact=_value(rest[0]) if rest else "",
+                mitigation=_value(" - ".join(rest[1:])) if len(rest) > 1 else "",
+            ))
+    return risks
+
+
+def parse_features(text):
+    if _looks_like_json(text):
+        return _from_json(FeaturePlan, loads_partial(text))
+    plan = FeaturePlan()
+    for heading, lines in _blocks(text):
+        title = heading.lower()
+        items = [_value(_clean(line)) for line in lines if _value(_clean(line))]
+        if "improvement" in title:
+            plan.improvements = items
+        elif "hypothesis" in title:
+            plan.hypothesis = " ".join(items)
+        elif "out of scope" in title:
+            plan.out_of_scope = items
+        elif "feature" in title:
+            for item in items:
+                parts = _split(item)
+                if parts and not parts[0].startswith("[Feature"):
+                    plan.features.append(Feature(
+                        name=parts[0],
+                        why=_value(parts[1]) if len(parts) > 1 else "",
+                        outcome=_value(" - ".join(parts[2:])) if len(parts) > 2 else "",
+                    ))
+    return plan
+
+
+_PHASE = re.compile(r"phase\s*(\d+)\s*[:.-]?\s*(.*?)\s*(?:\(\s*weeks?\s*(\d+)\s*(?:[-–]\s*(\d+))?\s*(\+)?\s*\))?$", re.I)
+
+
+def parse_mvp(text):
+    if _looks_like_json(text):
+        return _json_items(text, "phases", Phase)
+    phases = []
+    for heading, lines in _blocks(text):
+        match = _PHASE.match(heading)
+        if match is None:
+            continue
+        values = _labelled(lines)
+        start = int(match.group(3)) if match.group(3) else None
+        end = int(match.group(4)) if match.group(4) else (None if match.group(5) else start)
+        phases.append(Phase(
+            number=int(match.group(1)),
+            name=_value(match.group(2)),
+            start_week=start,
+            end_week=end,
+            build=_items(_find(values, "build", "action")),
+            deliverable=_find(values, "key deliverable", "deliverable"),
+            success_criteria=_find(values, "success criteria", "success"),
+        ))
+    return phases
+
+
+_WEEK = re.compile(r"weeks?\s*(\d+)\s*(?:[-–]\s*(\d+))?\s*[:.-]?\s*(.*)$", re.I)
+_OWNER = re.compile(r"\s*[-–—(]\s*owner\s*:\s*([^)]*)\)?\s*$", re.I)
+
+
+def parse_timeline(text):
+    if _looks_like_json(text):
+        return _from_json(Timeline, loads_partial(text))
+    timeline = Timeline()
+    for heading, lines in _blocks(text):
+        match = _WEEK.match(heading)
+        if match is not None:
+            start = int(match.group(1))
+            block = WeekBlock(start_week=start, end_week=int(match.group(2) or start),
+                              title=_value(match.group(3)))
+            for line in lines:
+                cleaned = _clean(line)
+                if cleaned.lower().startswith("milestone"):
+                    block.milestone = _value(cleaned.split(":", 1)[1]) if ":" in cleaned else ""
+                    continue
+                owner = _OWNER.search(cleaned)
+                name = _value(cleaned[:owner.start()] if owner else cleaned)
+                if name:
+                    block.tasks.append(Task(name=name, owner=_value(owner.group(1)) if owner else ""))
+            timeline.weeks.append(block)
+            continue
+        items = [_value(_clean(line)) for line in lines if _value(_clean(line))]
+        if "critical" in heading.lower():
+            timeline.critical_path = items
+        elif "assumption" in heading.lower():
+            timeline.assumptions = items
+    return timeline
+
+
+PARSERS = {
+    "feasibility": parse_feasibility,
+    "market": parse_market,
+    "risks": parse_risks,
+    "features": parse_features,
+    "mvp": parse_mvp,
+    "timeline": parse_timeline,
+}
+
+
+def parse_analysis(analysis_results):
+    """Parse a report's {step: text} dict into an Analysis (missing steps stay empty)"""
+    if isinstance(analysis_results, Analysis):
+        return analysis_results
+    parsed = Analysis()
+    for key, parser in PARSERS.items():
+        text = analysis_results.get(key)
+        if text:
+            setattr(parsed, key, parser(text))
+    return parsed
+
+
+# Numeric columns kept per report for ranking (see agent/ranking.py); None when not given
+METRIC_COLUMNS = [
+    "verdict", "complexity", "weeks_to_mvp", "budget", "team_size", "tam",
+    "competitors", "high_risks", "medium_risks", "low_risks",
+]
+_COMPLEXITY_LEVELS = {"Low": 1, "Medium": 2, "High": 3}
+
+
+def numeric_metrics(analysis_results):
+    """The METRIC_COLUMNS values of a report, as a dict"""
+    analysis = parse_analysis(analysis_results)
+    feasibility, market = analysis.feasibility, analysis.market
+    severities = [risk.severity for risk in analysis.risks]
+    return {
+        "verdict": None if feasibility is None or feasibility.verdict is None else int(feasibility.verdict),
+        "complexity": feasibility and _COMPLEXITY_LEVELS.get(feasibility.complexity),
+        "weeks_to_mvp": feasibility and feasibility.weeks_to_mvp,
+        "budget": feasibility and feasibility.budget,
+        "team_size": feasibility and feasibility.team_size,
+        "tam": market and market.tam,
+        "competitors": len(market.competitors) if market else None,
+        "high_risks": severities.count("High") if analysis.risks else None,
+        "medium_risks": severities.count("Medium") if analysis.risks else None,
+        "low_risks": severities.count("Low") if analysis.risks else None,
+    }
+
+
+def _settled(text):
+    """The JSON text up to its last separator or bracket outside a string, so no value is cut off"""
+    end, in_string, escaped = 0, False, False
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in ",{}[]":
+            end = index + 1
+    return text[:end]
+
+
+class StreamingParser:
+    """
+    Incrementally parse one step's streamed output
+
+    feed() each delta; it returns the object parsed from everything complete so far
+    whenever that grew, else None. Only whole lines of a text answer are parsed, and a
+    JSON answer only up to its last finished value, so a half-streamed "NO" or "$20,0"
+    never shows up as a value.
+    """
+
+    def __init__(self, step):
+        self.parse = PARSERS[step]
+        self.buffer = []
+        self.length_parsed = 0
+        self.result = None
+
+    def feed(self, text):
+        self.buffer.append(text)
+        if not any(char in text for char in "\n,}]"):
+            return None
+        content = "".join(self.buffer)
+        self.buffer = [content]
+        complete = _settled(content) if _looks_like_json(content) else content[:content.rfind("\n") + 1]
+        if len(complete) <= self.length_parsed:
+            return None
+        self.length_parsed = len(complete)
+        self.result = self.parse(complete)
+        return self.result
+
+    def finish(self):
+        """Parse the whole output, including a final line without a newline"""
+        self.result = self.parse("".join(self.buffer))
+        return self.result
+
+
+def to_plain(value):
+    """Dataclasses (and lists of them) as plain dicts/lists, e.g. for json.dumps"""
+    if is_dataclass(value):
+        return asdict(value)
+    if isinstance(value, list):
+        return [to_plain(item) for item in value]
+    return value
@@ -0,0 +1,361 @@
+"""
+Record/replay transcripts of Groq calls
+In record mode every chat completion and its answer (the streamed deltas with their arrival
+times, the usage and the latency) is appended to a sqlite transcript indexed by request.
+In replay mode the transcript stands in for the API: the same requests get the recorded
+answers back, paced like the original or config.TRANSCRIPT_SPEED times faster, without the
+network or an API key. TRANSCRIPT_MODE and TRANSCRIPT_PATH are read from the environment.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+import config
+from config import TRANSCRIPT_FALLBACK
+
+MODES = ("record", "replay")
+
+
+class TranscriptMiss(LookupError):
+    """Raised in replay mode for a request the transcript has no answer for"""
+
+
+def mode():
+    """The transcript mode from the environment: "record", "replay" or None"""
+    value = config.TRANSCRIPT_MODE
+    if value is not None and value not in MODES:
+        raise ValueError(f"TRANSCRIPT_MODE must be one of {', '.join(MODES)}, not {value!r}")
+    return value
+
+
+def request_key(model, messages, params):
+    """Address of a request: model, messages and sampling parameters (streamed or not doesn't count)"""
+    params = {name: value for name, value in params.items() if name != "stream"}
+    payload = json.dumps({"model": model, "messages": messages, "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def prompt_key(model, messages):
+    """Address of a step's prompt on a model: the system message, which is the same for every idea"""
+    system = next((m["content"] for m in messages if m["role"] == "system"), "")
+    return hashlib.sha256(f"{model}\0{system}".encode("utf-8")).hexdigest()
+
+
+def _usage_dict(usage):
+    if usage is None or isinstance(usage, dict):
+        return usage
+    if hasattr(usage, "model_dump"):
+        return usage.model_dump(exclude_none=True)
+    return {name: getattr(usage, name, None) for name in ("prompt_tokens", "completion_tokens", "total_tokens")}
+
+
+def _namespace(value):
+    """Recorded JSON as attribute objects, the way the SDK's response models read"""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{name: _namespace(item) for name, item in value.items()})
+    return value
+
+
+class Transcript:
+    """Thread-safe sqlite log of recorded exchanges, looked up by request_key()"""
+
+    def __init__(self, path):
+        self.path = path
+        self.stats = {"recorded": 0, "replayed": 0, "fallbacks": 0}
+        self._lock = threading.Lock()
+        self._db = None
+        self._ids = {}        # (column, key) -> ids of the matching exchanges, oldest first
+        self._exchanges = {}  # id -> decoded exchange
+        self._served = {}     # request key -> answers replayed for it so far
+
+    def _conn(self):
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS exchanges (
+                    id INTEGER PRIMARY KEY,
+                    request_key TEXT NOT NULL,
+                    prompt_key TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    usage TEXT,
+                    chunks TEXT,
+                    total_s REAL NOT NULL,
+                    recorded_at REAL NOT NULL
+                )"""
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_exchanges_request ON exchanges (request_key)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_exchanges_prompt ON exchanges (prompt_key)")
+        return self._db
+
+    def record(self, model, messages, params, content, usage, total_s, chunks=None):
+        """
+        Append one exchange
+
+        Args:
+            messages (list): The request's chat messages; params its other arguments
+            usage: The usage the API reported (SDK object or dict)
+            total_s (float): Seconds from sending the request to the end of the answer
+            chunks (list): [seconds after sending, delta] pairs of a streamed answer
+        """
+        # Only the user message is kept readable; the system message is the step's prompt
+        prompt = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        row = (
+            request_key(model, messages, params), prompt_key(model, messages), model, prompt, content,
+            json.dumps(_usage_dict(usage)), None if chunks is None else json.dumps(chunks, separators=(",", ":")),
+            total_s, time.time(),
+        )
+        with self._lock:
+            db = self._conn()
+            with db:
+                db.execute(
+                    "INSERT INTO exchanges (request_key, prompt_key, model, prompt, content, usage, chunks, "
+                    "total_s, recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    row,
+                )
+            self.stats["recorded"] += 1
+
+    def _matching(self, column, key):
+        ids = self._ids.get((column, key))
+        if ids is None:
+            rows = self._conn().execute(f"SELECT id FROM exchanges WHERE {column} = ? ORDER BY id", (key,))
+            ids = self._ids[(column, key)] = [row[0] for row in rows]
+        return ids
+
+    def _exchange(self, exchange_id):
+        exchange = self._exchanges.get(exchange_id)
+        if exchange is None:
+            content, usage, chunks, total_s = self._conn().execute(
+                "SELECT content, usage, chunks, total_s FROM exchanges WHERE id = ?", (exchange_id,)
+            ).fetchone()
+            exchange = self._exchanges[exchange_id] = {
+                "content": content,
+                "usage": json.loads(usage) if usage else None,
+                "chunks": json.loads(chunks) if chunks else None,
+                "total_s": total_s,
+            }
+        return exchange
+
+    def lookup(self, model, messages, params, fallback=None):
+        """
+        The recorded exchange for a request
+
+        A request recorded several times gets those answers in recording order, starting over
+        after the last. With fallback, a request never recorded gets an answer recorded for the
+        same prompt and model (picked by its request key, so always the same one); otherwise,
+        or if there is none, TranscriptMiss is raised. fallback defaults to
+        config.TRANSCRIPT_FALLBACK.
+        """
+        if fallback is None:
+            fallback = TRANSCRIPT_FALLBACK
+        key = request_key(model, messages, params)
+        with self._lock:
+            ids = self._matching("request_key", key)
+            if ids:
+                served = self._served.get(key, 0)
+                self._served[key] = served + 1
+                exchange_id = ids[served % len(ids)]
+            else:
+                ids = self._matching("prompt_key", prompt_key(model, messages)) if fallback else []
+                if not ids:
+                    raise TranscriptMiss(f"No recorded answer for this {model} request in {self.path}")
+                exchange_id = ids[int(key[:12], 16) % len(ids)]
+                self.stats["fallbacks"] += 1
+            self.stats["replayed"] += 1
+            return self._exchange(exchange_id)
+
+    def count(self):
+        with self._lock:
+            return self._conn().execute("SELECT COUNT(*) FROM exchanges").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_transcript = None
+_transcript_lock = threading.Lock()
+
+
+def get_transcript():
+    """Return the transcript at config.TRANSCRIPT_PATH, opening it on first use"""
+    global _transcript
+    if _transcript is None:
+        with _transcript_lock:
+            if _transcript is None:
+                _transcript = Transcript(config.TRANSCRIPT_PATH)
+    return _transcript
+
+
+# Recording
+
+
+def capture(response, model, messages, params, sent):
+    """
+    Record a chat completion response (sent: perf_counter() when the request went out)
+
+    A streamed response is returned wrapped, and recorded once it has been read to the end;
+    a stream closed early (a cancelled call) is not recorded.
+    """
+    if not params.get("stream"):
+        get_transcript().record(model, messages, params, response.choices[0].message.content,
+                                getattr(response, "usage", None), time.perf_counter() - sent)
+        return response
+    return _RecordingStream(response, model, messages, params, sent)
+
+
+class _RecordingStream:
+    def __init__(self, stream, model, messages, params, sent):
+        self._stream = stream
+        self._request = (model, messages, params)
+        self._sent = sent
+        self._chunks = []
+        self._usage = None
+
+    def _observe(self, chunk):
+        if chunk.choices and chunk.choices[0].delta.content:
+            self._chunks.append([round(time.perf_counter() - self._sent, 4), chunk.choices[0].delta.content])
+        x_groq = getattr(chunk, "x_groq", None)
+        self._usage = getattr(x_groq, "usage", None) or getattr(chunk, "usage", None) or self._usage
+
+    def _finish(self):
+        get_transcript().record(*self._request, "".join(delta for _, delta in self._chunks), self._usage,
+                                time.perf_counter() - self._sent, self._chunks)
+
+    def __iter__(self):
+        for chunk in self._stream:
+            self._observe(chunk)
+            yield chunk
+        self._finish()
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._observe(chunk)
+            yield chunk
+        self._finish()
+
+    def close(self):
+        return self._stream.close()
+
+
+# Replaying
+
+
+def _wait(started, offset, speed):
+    """Seconds left until `offset` seconds of the recording have passed since `started`"""
+    return started + offset / speed - time.perf_counter() if speed else 0
+
+
+def _response(exchange):
+    message = SimpleNamespace(role="assistant", content=exchange["content"])
+    return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+                           usage=_namespace(exchange["usage"]))
+
+
+class _Replayed:
+    """Stands in for the SDK's raw response: no rate limit headers, parse() gives the answer"""
+
+    headers = None
+
+    def __init__(self, parsed):
+        self._parsed = parsed
+
+    def parse(self):
+        return self._parsed
+
+
+class _AsyncReplayed(_Replayed):
+    async def parse(self):
+        return self._parsed
+
+
+class _ReplayStream:
+    """A recorded answer streamed back with its recorded delta timing"""
+
+    def __init__(self, exchange, speed):
+        # An answer recorded without streaming arrives as one delta at its recorded latency
+        self._chunks = exchange["chunks"] or [[exchange["total_s"], exchange["content"]]]
+        self._usage = exchange["usage"]
+        self._speed = speed
+        self._started = time.perf_counter()
+        self._closed = False
+
+    def _last(self):
+        # Groq reports usage on the final chunk under x_groq
+        return SimpleNamespace(choices=[], usage=None, x_groq=SimpleNamespace(usage=_namespace(self._usage)))
+
+    @staticmethod
+    def _chunk(delta):
+        choice = SimpleNamespace(index=0, delta=SimpleNamespace(content=delta), finish_reason=None)
+        return SimpleNamespace(choices=[choice], usage=None, x_groq=None)
+
+    def __iter__(self):
+        for offset, delta in self._chunks:
+            if self._closed:
+                return
+            wait = _wait(self._started, offset, self._speed)
+            if wait > 0:
+                time.sleep(wait)
+            yield self._chunk(delta)
+        yield self._last()
+
+    async def __aiter__(self):
+        for offset, delta in self._chunks:
+            if self._closed:
+                return
+            wait = _wait(self._started, offset, self._speed)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            yield self._chunk(delta)
+        yield self._last()
+
+    def close(self):
+        self._closed = True
+
+
+class ReplayClient:
+    """Answers client.chat.completions.with_raw_response.create() from a transcript"""
+
+    def __init__(self, transcript, speed=None):
+        self.transcript = transcript
+        self.speed = config.TRANSCRIPT_SPEED if speed is None else speed
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=self))
+
+    def create(self, model, messages, stream=False, **params):
+        exchange = self.transcript.lookup(model, messages, params)
+        if stream:
+            return _Replayed(_ReplayStream(exchange, self.speed))
+        # Like the API, a plain request returns once the whole answer is done
+        wait = _wait(time.perf_counter(), exchange["total_s"], self.speed)
+        if wait > 0:
+            time.sleep(wait)
+        return _Replayed(_response(exchange))
+
+    def close(self):
+        pass
+
+
+class AsyncReplayClient(ReplayClient):
+    """Async counterpart of ReplayClient"""
+
+    async def create(self, model, messages, stream=False, **params):
+        exchange = self.transcript.lookup(model, messages, params)
+        if stream:
+            return _AsyncReplayed(_ReplayStream(exchange, self.speed))
+        wait = _wait(time.perf_counter(), exchange["total_s"], self.speed)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return _AsyncReplayed(_response(exchange))
@@ -0,0 +1,291 @@
+"""
+Shared work queue for batch workers
+Ideas are enqueued once; worker processes (see agent/worker.py) lease them one at a time.
+A lease expires unless its worker renews it, so ideas held by a crashed or killed worker go
+back to the queue by themselves. Finished ideas keep their result record.
+
+Backends:
+- SqliteQueue: a sqlite file, for processes on one machine (the default)
+- RedisQueue: a Redis server, for workers on several hosts (needs: pip install redis)
+Each backend also provides a rate limiter that shares one budget across all its workers.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from agent.rate_limit import RedisRateLimiter, SqliteRateLimiter
+from config import QUEUE_MAX_ATTEMPTS
+
+STATUSES = ["pending", "leased", "done", "failed"]
+
+
+class Lease:
+    __slots__ = ("job_id", "idea", "attempt")
+
+    def __init__(self, job_id, idea, attempt):
+        self.job_id = job_id
+        self.idea = idea
+        self.attempt = attempt
+
+
+class SqliteQueue:
+    """Lease-based queue in a sqlite file (WAL mode, safe for many processes on one host)"""
+
+    def __init__(self, path, max_attempts=QUEUE_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        db = self._conn()
+        with db:
+            db.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    seq INTEGER PRIMARY KEY,
+                    job_id TEXT NOT NULL UNIQUE,
+                    idea TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    owner TEXT,
+                    lease_expires REAL,
+                    result TEXT,
+                    finished_at REAL
+                )"""
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, lease_expires)")
+
+    def _conn(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def enqueue(self, items):
+        """Add (job id, idea) pairs; ids already in the queue are skipped. Returns how many were added"""
+        db = self._conn()
+        added = 0
+        with db:
+            for job_id, idea in items:
+                added += db.execute("INSERT OR IGNORE INTO jobs (job_id, idea) VALUES (?, ?)",
+                                    (job_id, idea)).rowcount
+        return added
+
+    def lease(self, owner, seconds):
+        """Claim the oldest pending (or expired) job for `seconds`, or return None if there is none"""
+        now = time.time()
+        db = self._conn()
+        with db:
+            # Jobs whose worker died on every attempt are given up on instead of crashing the next one
+            db.execute(
+                "UPDATE jobs SET status = 'failed', owner = NULL, result = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (json.dumps({"errors": {"worker": "lease expired on every attempt"}}), now, self.max_attempts),
+            )
+            row = db.execute(
+                "UPDATE jobs SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE seq = (SELECT seq FROM jobs WHERE status = 'pending' "
+                "OR (status = 'leased' AND lease_expires < ?) ORDER BY seq LIMIT 1) "
+                "RETURNING job_id, idea, attempts",
+                (owner, now + seconds, now),
+            ).fetchone()
+        return Lease(*row) if row else None
+
+    def renew(self, lease, owner, seconds):
+        """Extend a lease; False if it expired and was taken over by another worker"""
+        db = self._conn()
+        with db:
+            return db.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE job_id = ? AND owner = ? AND status = 'leased'",
+                (time.time() + seconds, lease.job_id, owner),
+            ).rowcount == 1
+
+    def complete(self, lease, owner, record, failed=False):
+        """Store a job's result record; a late result after a takeover still counts if none is stored yet"""
+        db = self._conn()
+        with db:
+            db.execute(
+                "UPDATE jobs SET status = ?, owner = NULL, result = ?, finished_at = ? "
+                "WHERE job_id = ? AND status NOT IN ('done', 'failed')",
+                ("failed" if failed else "done", json.dumps(record), time.time(), lease.job_id),
+            )
+
+    def release(self, lease, owner):
+        """Hand a job back unfinished (e.g. on shutdown) without using up an attempt"""
+        db = self._conn()
+        with db:
+            db.execute(
+                "UPDATE jobs SET status = 'pending', owner = NULL, attempts = MAX(0, attempts - 1) "
+                "WHERE job_id = ? AND owner = ? AND status = 'leased'",
+                (lease.job_id, owner),
+            )
+
+    def counts(self):
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update(self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return counts
+
+    def retry_failed(self):
+        """Put failed jobs back in the queue with fresh attempts; returns how many"""
+        db = self._conn()
+        with db:
+            return db.execute(
+                "UPDATE jobs SET status = 'pending', attempts = 0, result = NULL WHERE status = 'failed'"
+            ).rowcount
+
+    def results(self):
+        """Yield the result record of every finished job, in queue order"""
+        rows = self._conn().execute(
+            "SELECT result FROM jobs WHERE status IN ('done', 'failed') AND result IS NOT NULL ORDER BY seq"
+        )
+        for (result,) in rows:
+            yield json.loads(result)
+
+    def rate_limiter(self, requests_per_minute, tokens_per_minute):
+        return SqliteRateLimiter(self.path, requests_per_minute, tokens_per_minute)
+
+
+# Redis layout under `prefix`: a hash of job id -> JSON job, a list of pending ids, a sorted
+# set of leased ids by expiry (server clock), a hash of lease owners and sets of finished ids
+_REDIS_LEASE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)) do
+    redis.call('ZREM', KEYS[2], id)
+    redis.call('HDEL', KEYS[3], id)
+    local job = cjson.decode(redis.call('HGET', KEYS[4], id))
+    if job.attempts >= tonumber(ARGV[3]) then
+        job.status = 'failed'
+        job.result = {errors = {worker = 'lease expired on every attempt'}}
+        redis.call('HSET', KEYS[4], id, cjson.encode(job))
+        redis.call('SADD', KEYS[5], id)
+    else
+        job.status = 'pending'
+        redis.call('HSET', KEYS[4], id, cjson.encode(job))
+        redis.call('LPUSH', KEYS[1], id)
+    end
+end
+local id = redis.call('LPOP', KEYS[1])
+if not id then return nil end
+local job = cjson.decode(redis.call('HGET', KEYS[4], id))
+job.status = 'leased'
+job.attempts = job.attempts + 1
+redis.call('HSET', KEYS[4], id, cjson.encode(job))
+redis.call('ZADD', KEYS[2], now + tonumber(ARGV[2]), id)
+redis.call('HSET', KEYS[3], id, ARGV[1])
+return {id, job.idea, job.attempts}
+"""
+
+_REDIS_RENEW_SCRIPT = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then return 0 end
+local clock = redis.call('TIME')
+redis.call('ZADD', KEYS[1], 'XX', tonumber(clock[1]) + tonumber(ARGV[3]), ARGV[1])
+return 1
+"""
+
+_REDIS_FINISH_SCRIPT = """
+local job = cjson.decode(redis.call('HGET', KEYS[3], ARGV[1]))
+if job.status == 'done' or job.status == 'failed' then return 0 end
+local owner = redis.call('HGET', KEYS[2], ARGV[1])
+if ARGV[3] == 'release' then
+    if owner ~= ARGV[2] then return 0 end
+    job.status = 'pending'
+    job.attempts = math.max(0, job.attempts - 1)
+    redis.call('LPUSH', KEYS[6], ARGV[1])
+else
+    job.status = ARGV[3]
+    job.result = cjson.decode(ARGV[4])
+    redis.call('SADD', ARGV[3] == 'done' and KEYS[4] or KEYS[5], ARGV[1])
+    redis.call('LREM', KEYS[6], 0, ARGV[1])
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('HSET', KEYS[3], ARGV[1], cjson.encode(job))
+return 1
+"""
+
+
+class RedisQueue:
+    """Lease-based queue in Redis, for workers on several hosts; lease times use the server clock"""
+
+    def __init__(self, url, prefix="validator", max_attempts=QUEUE_MAX_ATTEMPTS):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("The Redis queue needs the redis package: pip install redis") from None
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.max_attempts = max_attempts
+        self.keys = {name: f"{prefix}:{name}" for name in ("pending", "leases", "owners", "jobs", "done", "failed")}
+        self._lease = self.client.register_script(_REDIS_LEASE_SCRIPT)
+        self._renew = self.client.register_script(_REDIS_RENEW_SCRIPT)
+        self._finish = self.client.register_script(_REDIS_FINISH_SCRIPT)
+
+    def enqueue(self, items):
+        added = 0
+        for job_id, idea in items:
+            job = json.dumps({"idea": idea, "status": "pending", "attempts": 0})
+            if self.client.hsetnx(self.keys["jobs"], job_id, job):
+                self.client.rpush(self.keys["pending"], job_id)
+                added += 1
+        return added
+
+    def lease(self, owner, seconds):
+        keys = [self.keys[name] for name in ("pending", "leases", "owners", "jobs", "failed")]
+        row = self._lease(keys=keys, args=[owner, seconds, self.max_attempts])
+        return Lease(row[0], row[1], int(row[2])) if row else None
+
+    def renew(self, lease, owner, seconds):
+        return bool(self._renew(keys=[self.keys["leases"], self.keys["owners"]],
+                                args=[lease.job_id, owner, seconds]))
+
+    def _finish_job(self, lease, owner, status, record=None):
+        keys = [self.keys[name] for name in ("leases", "owners", "jobs", "done", "failed", "pending")]
+        self._finish(keys=keys, args=[lease.job_id, owner, status, json.dumps(record)])
+
+    def complete(self, lease, owner, record, failed=False):
+        self._finish_job(lease, owner, "failed" if failed else "done", record)
+
+    def release(self, lease, owner):
+        self._finish_job(lease, owner, "release")
+
+    def counts(self):
+        return {
+            "pending": self.client.llen(self.keys["pending"]),
+            "leased": self.client.zcard(self.keys["leases"]),
+            "done": self.client.scard(self.keys["done"]),
+            "failed": self.client.scard(self.keys["failed"]),
+        }
+
+    def retry_failed(self):
+        retried = 0
+        for job_id in self.client.smembers(self.keys["failed"]):
+            job = json.loads(self.client.hget(self.keys["jobs"], job_id))
+            job.update(status="pending", attempts=0, result=None)
+            self.client.hset(self.keys["jobs"], job_id, json.dumps(job))
+            self.client.srem(self.keys["failed"], job_id)
+            self.client.rpush(self.keys["pending"], job_id)
+            retried += 1
+        return retried
+
+    def results(self):
+        for _, job in self.client.hscan_iter(self.keys["jobs"]):
+            job = json.loads(job)
+            if job["status"] in ("done", "failed") and job.get("result"):
+                yield job["result"]
+
+    def rate_limiter(self, requests_per_minute, tokens_per_minute):
+        return RedisRateLimiter(self.client, self.prefix, requests_per_minute, tokens_per_minute)
+
+
+def open_queue(url):
+    """SqliteQueue for a file path (or sqlite:///path), RedisQueue for redis:// or rediss:// URLs"""
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisQueue(url)
+    return SqliteQueue(url.removeprefix("sqlite:///"))
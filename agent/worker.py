@@ -0,0 +1,167 @@
+"""
+Queue workers for batch analysis across processes and hosts
+Start any number of workers (python worker.py) against the same queue: each one leases
+ideas, runs the step pipeline, saves the report and records the result in the queue.
+All workers spend one rate-limit budget kept in the queue's backend, and a worker that
+dies loses its leases after QUEUE_LEASE_SECONDS so the others pick its ideas up.
+Reports go to the report store at `store_path` (default config.REPORT_STORE_PATH): workers on
+one host share that file, workers on several hosts only if it is on storage they all
+reach; otherwise `cli.py queue export` gathers the result records from the queue.
+"""
+
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+
+from agent.incremental import step_fingerprints
+from agent.pipeline import run_pipeline, split_skipped
+from agent.report_store import ReportStore, get_store
+from agent.scheduler import BATCH, get_scheduler
+from config import (
+    BATCH_CONCURRENCY,
+    BATCH_TERSE_PROMPTS,
+    BATCH_TRIAGE,
+    QUEUE_LEASE_SECONDS,
+    QUEUE_MAX_BACKOFF,
+    QUEUE_POLL_INTERVAL,
+    RATE_LIMIT_REQUESTS_PER_MINUTE,
+    RATE_LIMIT_TOKENS_PER_MINUTE,
+)
+
+
+def enqueue_file(queue, input_path):
+    """Add every idea of a batch input file (JSONL/CSV, see batch_analyzer.read_ideas) to the queue"""
+    from agent.batch_analyzer import read_ideas
+
+    return queue.enqueue(read_ideas(input_path))
+
+
+def run_worker(queue, concurrency=BATCH_CONCURRENCY, lease_seconds=QUEUE_LEASE_SECONDS,
+               requests_per_minute=None, tokens_per_minute=None, one_shot=None, use_cache=True,
+               save_reports=True, wait=False, worker_id=None, terse=None, triage=None, store_path=None):
+    """
+    Analyze ideas from a shared queue until it is empty (or forever with wait=True)
+
+    Args:
+        queue: agent.work_queue.SqliteQueue or RedisQueue
+        concurrency (int): Ideas this process analyzes at the same time
+        lease_seconds (float): How long a lease lasts without renewal; renewed every third of it
+        requests_per_minute, tokens_per_minute (int): Global budget shared by all workers
+            of the queue (default: config.RATE_LIMIT_*)
+        terse (bool): Send the shorter step prompts (default: config.BATCH_TERSE_PROMPTS)
+        triage (bool): Skip the other steps of ideas whose feasibility verdict is NO
+            (default: config.BATCH_TRIAGE)
+        wait (bool): Keep polling for new ideas instead of exiting when the queue is drained
+        worker_id (str): Name recorded on leases (default: "<host>-<pid>")
+        store_path (str): Report store to save to (default: config.REPORT_STORE_PATH)
+
+    Returns:
+        dict: Counts of analyzed, failed and triaged ideas
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    if terse is None:
+        terse = BATCH_TERSE_PROMPTS
+    if triage is None:
+        triage = BATCH_TRIAGE
+    get_scheduler().set_limiter(queue.rate_limiter(
+        requests_per_minute or RATE_LIMIT_REQUESTS_PER_MINUTE,
+        tokens_per_minute or RATE_LIMIT_TOKENS_PER_MINUTE,
+    ))
+    store = ReportStore(store_path) if store_path else get_store()
+    counts = {"analyzed": 0, "failed": 0, "triaged": 0}
+    held = {}  # job id -> lease
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def renew_leases():
+        while not stop.wait(lease_seconds / 3):
+            with lock:
+                leases = list(held.values())
+            for lease in leases:
+                if not queue.renew(lease, worker_id, lease_seconds):
+                    print(f"⚠️  Lost the lease on {lease.job_id}; another worker may re-run it")
+
+    def analyze(lease):
+        results, errors, skipped = {}, {}, []
+        report_id = None
+        try:
+            results, errors = run_pipeline(lease.idea, concurrent=False, one_shot=one_shot, priority=BATCH,
+                                           use_cache=use_cache, terse=terse, gate="first" if triage else False)
+            errors, skipped = split_skipped(errors)
+            errors = {step: str(error) for step, error in errors.items()}
+            if save_reports and results:
+                fingerprints = step_fingerprints(lease.idea, terse=terse)
+                meta = {
+                    "batch_id": lease.job_id,
+                    "worker": worker_id,
+                    "fingerprints": {step: fingerprints[step] for step in results},
+                }
+                report_id = store.save(lease.idea, results, meta={**meta, "triaged": True} if skipped else meta)
+        except Exception as e:
+            errors["worker"] = f"{type(e).__name__}: {e}"
+        record = {
+            "id": lease.job_id,
+            "timestamp": datetime.now().isoformat(),
+            "idea": lease.idea,
+            "analysis": results,
+            "errors": errors,
+            "report_id": report_id,
+            "worker": worker_id,
+        }
+        if skipped:
+            record.update(triaged=True, skipped=skipped)
+        queue.complete(lease, worker_id, record, failed=bool(errors))
+        with lock:
+            counts["failed" if errors else "triaged" if skipped else "analyzed"] += 1
+        print(f"{'⚠️ ' if errors else '🚫' if skipped else '✅'} {lease.job_id} (attempt {lease.attempt})")
+
+    def work():
+        failures = 0  # Queue errors in a row
+        while not stop.is_set():
+            try:
+                lease = queue.lease(worker_id, lease_seconds)
+                if lease is None:
+                    pending = queue.counts()
+                    # Ideas leased by other workers may still come back if those workers die
+                    if not wait and not pending["pending"] and not pending["leased"]:
+                        return
+                    failures = 0
+                    stop.wait(QUEUE_POLL_INTERVAL)
+                    continue
+                with lock:
+                    held[lease.job_id] = lease
+                try:
+                    analyze(lease)
+                finally:
+                    with lock:
+                        held.pop(lease.job_id, None)
+                failures = 0
+            except Exception as e:
+                # E.g. a sqlite lock timeout or Redis being down: an unrecorded idea's lease
+                # expires and it is re-run, so back off and keep this consumer alive
+                failures += 1
+                backoff = min(QUEUE_POLL_INTERVAL * 2 ** (failures - 1), QUEUE_MAX_BACKOFF)
+                print(f"⚠️  Queue error ({type(e).__name__}: {e}); retrying in {backoff:g}s")
+                stop.wait(backoff)
+
+    threading.Thread(target=renew_leases, daemon=True, name="lease-renewal").start()
+    threads = [threading.Thread(target=work, daemon=True, name=f"worker-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    try:
+        while any(thread.is_alive() for thread in threads):
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        stop.set()
+        with lock:
+            leases = list(held.values())
+        for lease in leases:
+            queue.release(lease, worker_id)
+        print(f"\n🛑 Worker {worker_id} stopped; handed back {len(leases)} unfinished ideas")
+    stop.set()
+
+    print(f"\n✅ Worker {worker_id} done: {counts['analyzed']} analyzed, {counts['failed']} with errors, "
+          f"{counts['triaged']} triaged as not feasible")
+    return counts
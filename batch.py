@@ -0,0 +1,63 @@
+"""
+Batch analysis entry point for the Startup Validator Agent
+
+Run: python batch.py ideas.jsonl results.jsonl
+Input is JSONL (strings or {"id": ..., "idea": ...} objects) or CSV with an "idea" column.
+Re-running with the same output file resumes where the previous run stopped.
+"""
+
+import argparse
+
+from config import BATCH_CONCURRENCY, METRICS_PORT
+
+def add_arguments(parser):
+    """Batch options, shared with `cli.py batch`"""
+    parser.add_argument("input", help="JSONL or CSV file of ideas")
+    parser.add_argument("output", help="JSONL file results are appended to")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY,
+                        help="ideas analyzed at the same time")
+    parser.add_argument("--rpm", type=int,
+                        help="requests-per-minute budget (default: config.RATE_LIMIT_REQUESTS_PER_MINUTE)")
+    parser.add_argument("--tpm", type=int,
+                        help="tokens-per-minute budget (default: config.RATE_LIMIT_TOKENS_PER_MINUTE)")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="re-run ideas whose earlier result has errors")
+    parser.add_argument("--one-shot", action="store_true",
+                        help="one combined request per idea instead of six")
+    parser.add_argument("--terse", action="store_true",
+                        help="send the shorter step prompts (default: config.BATCH_TERSE_PROMPTS)")
+    parser.add_argument("--triage", action="store_true",
+                        help="skip the other steps of ideas whose feasibility verdict is NO (default: config.BATCH_TRIAGE)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="bypass the response cache")
+    parser.add_argument("--no-save", action="store_true",
+                        help="don't also save results to the report store")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="reuse the saved report of a near-duplicate idea instead of analyzing it")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help="serve Prometheus metrics on this port while the batch runs")
+
+def run(args):
+    """Run a batch from parsed arguments"""
+    from agent.batch_analyzer import run_batch
+    from agent.instrumentation import metrics, serve_prometheus
+
+    if args.metrics_port:
+        serve_prometheus(args.metrics_port)
+        print(f"📈 Prometheus metrics at http://127.0.0.1:{args.metrics_port}/metrics")
+
+    run_batch(args.input, args.output, concurrency=args.concurrency,
+              requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+              retry_failed=args.retry_failed, one_shot=args.one_shot or None,
+              use_cache=not args.no_cache, save_reports=not args.no_save, dedupe=args.dedupe,
+              terse=args.terse or None, triage=args.triage or None)
+    print("\n" + metrics.summary_table())
+    print("\n" + metrics.routing_table())
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a file of startup ideas in batch")
+    add_arguments(parser)
+    run(parser.parse_args())
+
+if __name__ == "__main__":
+    main()
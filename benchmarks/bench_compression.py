@@ -0,0 +1,127 @@
+"""
+Report compression benchmark
+
+Saves the same synthetic reports (each section in the analyzers' layout, as the mock Groq
+server answers, with random prose added to every line) to three temporary report stores:
+- json: plain JSON text (REPORT_COMPRESSION = None)
+- zstd: each report compressed on its own, without a dictionary
+- zstd+dict: compressed against a dictionary trained on --train earlier reports
+
+Reports stored bytes per report, save throughput, random single-report reads and raw
+encode/decode speed. Exits non-zero if a report doesn't read back unchanged or the
+dictionary doesn't beat plain zstd on size.
+
+Run: python benchmarks/bench_compression.py [--reports 5000] [--train 1000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from mock_groq_server import fake_completion
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent.report_store import ReportStore  # noqa: E402
+from prompts.prompts import STEP_PROMPTS  # noqa: E402
+
+
+def make_reports(count, seed):
+    rng = random.Random(seed)
+    sections = {step: fake_completion(template.format(idea="a sample idea")) for step, template in STEP_PROMPTS.items()}
+    vocabulary = sorted({word.strip(".,:()[]*-") for text in STEP_PROMPTS.values() for word in text.split()} - {""})
+    reports = []
+    for i in range(count):
+        analysis = {
+            step: "\n".join(
+                f"{line} {' '.join(rng.choices(vocabulary, k=rng.randint(3, 15)))} {rng.randint(1, 999)}"
+                if line.strip() else line
+                for line in text.splitlines()
+            )
+            for step, text in sections.items()
+        }
+        reports.append((f"idea {i} {' '.join(rng.choices(vocabulary, k=8))}", analysis))
+    return reports
+
+
+def measure(name, path, reports, train):
+    store = ReportStore(path, compression=None if name == "json" else "zstd")
+    if name == "zstd+dict":
+        for idea, analysis in train:
+            store.save(idea, analysis)
+        store.train_dictionary(samples=len(train))
+
+    first_row = store.count(include_archived=True)
+    started = time.perf_counter()
+    ids = [store.save(idea, analysis) for idea, analysis in reports]
+    write_s = time.perf_counter() - started
+
+    stored = store._conn().execute(
+        "SELECT SUM(LENGTH(CAST(analysis AS BLOB))), COUNT(*) FROM reports WHERE id > ?", (first_row,)
+    ).fetchone()
+    sample = random.Random(3).sample(range(len(ids)), min(2000, len(ids)))
+    started = time.perf_counter()
+    intact = all(store.get(ids[i])["analysis"] == reports[i][1] for i in sample)
+    read_s = time.perf_counter() - started
+
+    analyses = [analysis for _, analysis in reports]
+    started = time.perf_counter()
+    encoded = [store._encode(analysis) for analysis in analyses]
+    encode_s = time.perf_counter() - started
+    started = time.perf_counter()
+    for value in encoded:
+        store._decode(value)
+    decode_s = time.perf_counter() - started
+    return {
+        "bytes_per_report": stored[0] / stored[1],
+        "writes_per_s": len(reports) / write_s,
+        "reads_per_s": len(sample) / read_s,
+        "encode_ms": encode_s / len(analyses) * 1000,
+        "decode_ms": decode_s / len(analyses) * 1000,
+        "intact": intact,
+        "file_mb": os.path.getsize(path) / 2**20,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare plain JSON and zstd-compressed report storage")
+    parser.add_argument("--reports", type=int, default=5000, help="reports saved and read per store")
+    parser.add_argument("--train", type=int, default=1000, help="reports the dictionary is trained on")
+    args = parser.parse_args()
+
+    reports = make_reports(args.reports, seed=1)
+    train = make_reports(args.train, seed=2)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("json", "zstd", "zstd+dict"):
+            results[name] = measure(name, os.path.join(tmp, f"{name}.sqlite3"), reports, train)
+
+    print(f"\n{args.reports} reports per store (dictionary trained on {args.train} others)\n")
+    print(f"{'Storage':<11}{'bytes/report':>13}{'ratio':>7}{'saves/s':>9}{'reads/s':>9}"
+          f"{'enc ms':>8}{'dec ms':>8}{'file MB':>9}")
+    print("-" * 74)
+    plain = results["json"]["bytes_per_report"]
+    for name, result in results.items():
+        print(f"{name:<11}{result['bytes_per_report']:>13.0f}{plain / result['bytes_per_report']:>6.1f}x"
+              f"{result['writes_per_s']:>9.0f}{result['reads_per_s']:>9.0f}"
+              f"{result['encode_ms']:>8.3f}{result['decode_ms']:>8.3f}{result['file_mb']:>9.1f}")
+    print("\n(saves/s includes the search, similarity and metrics indexes; enc/dec ms is per report;\n"
+          " file MB includes the search index, and the zstd+dict store also holds the training reports)")
+
+    failures = [f"{name} reports didn't read back unchanged" for name, result in results.items() if not result["intact"]]
+    if results["zstd+dict"]["bytes_per_report"] >= results["zstd"]["bytes_per_report"]:
+        failures.append("the dictionary didn't make reports smaller than plain zstd")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"\n✅ Dictionary-compressed reports take "
+          f"{results['zstd+dict']['bytes_per_report'] / plain:.0%} of the plain JSON bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Report export memory benchmark
+
+Fills a temporary report store with synthetic reports (every section in the analyzers'
+layout, as the mock Groq server answers), then exports the oldest N of them at growing
+N in each format, each export in a fresh process, and reports the peak RSS of that
+process. A naive export that loads every report into a list and writes one JSON
+document is measured alongside for comparison.
+
+Exits non-zero if the peak RSS of a streaming export grows by more than --max-growth-mb
+from the smallest to the largest N.
+
+Run: python benchmarks/bench_export.py [--reports 1000 4000 16000] [--formats jsonl timeline-csv parquet]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from mock_groq_server import fake_completion
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent.report_store import ReportStore  # noqa: E402
+from prompts.prompts import STEP_PROMPTS  # noqa: E402
+
+START = 1_700_000_000  # Report i is saved at START + i seconds
+
+
+def fill_store(path, count):
+    rng = random.Random(7)
+    sections = {step: fake_completion(template.format(idea="a sample idea")) for step, template in STEP_PROMPTS.items()}
+    store = ReportStore(path)
+    for i in range(count):
+        analysis = {step: f"{text}\n- Note {i}: {rng.random()}" for step, text in sections.items()}
+        store.save(f"idea {i} {rng.random()}", analysis, created_at=START + i)
+
+
+def child(fmt, store_path, count, output):
+    """Export the first `count` reports (runs in its own process)"""
+    store = ReportStore(store_path)
+    if fmt == "naive-json":
+        reports = list(store.range(end=START + count))
+        with open(output, "w") as f:
+            json.dump(reports, f, indent=2)
+        return
+    from agent.export import export_reports
+
+    export_reports(output, fmt, store=store, end=START + count)
+
+
+def peak_rss_mb(fmt, store_path, count, output):
+    """Peak RSS of a fresh process running one export, in MB"""
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--child", fmt, store_path,
+                                str(count), output])
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode:
+        raise RuntimeError(f"{fmt} export of {count} reports failed")
+    return usage.ru_maxrss / 1024  # KB on Linux
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure peak memory of report exports")
+    parser.add_argument("--reports", type=int, nargs="+", default=[1000, 4000, 16000], help="report counts to export")
+    parser.add_argument("--formats", nargs="+", default=["jsonl", "timeline-csv", "parquet"],
+                        help="export formats (parquet / arrow need pyarrow)")
+    parser.add_argument("--max-growth-mb", type=float, default=25.0,
+                        help="fail if a streaming export's peak RSS grows more than this")
+    parser.add_argument("--child", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        fmt, store_path, count, output = args.child
+        child(fmt, store_path, int(count), output)
+        return
+
+    counts = sorted(args.reports)
+    formats = args.formats + ["naive-json"]
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = os.path.join(tmp, "reports.sqlite3")
+        started = time.perf_counter()
+        fill_store(store_path, counts[-1])
+        print(f"Saved {counts[-1]} reports in {time.perf_counter() - started:.1f}s "
+              f"({os.path.getsize(store_path) / 2**20:.0f} MB store)\n")
+
+        print(f"{'Format':<14}" + "".join(f"{f'{count} MB':>12}" for count in counts) + f"{'growth':>10}")
+        print("-" * (24 + 12 * len(counts)))
+        growth = {}
+        for fmt in formats:
+            output = os.path.join(tmp, f"export.{fmt}")
+            peaks = [peak_rss_mb(fmt, store_path, count, output) for count in counts]
+            growth[fmt] = peaks[-1] - peaks[0]
+            print(f"{fmt:<14}" + "".join(f"{peak:>12.1f}" for peak in peaks) + f"{growth[fmt]:>+10.1f}")
+        print("\n(peak RSS of the exporting process)")
+
+    grew = [fmt for fmt in args.formats if growth[fmt] > args.max_growth_mb]
+    if grew:
+        print(f"❌ Peak RSS grew by more than {args.max_growth_mb:.0f} MB for {', '.join(grew)}")
+        sys.exit(1)
+    print(f"✅ Streaming exports stay within {args.max_growth_mb:.0f} MB from {counts[0]} to {counts[-1]} reports "
+          f"(naive JSON: {growth['naive-json']:+.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: one-shot mode vs the six-call pipeline
+
+Runs the example ideas through both modes with the cache bypassed and reports,
+per idea, wall time, request count and prompt/completion tokens as reported by
+the API, plus the estimated prompt size of each mode.
+
+Run: python benchmarks/bench_one_shot.py [--ideas 3] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import llm
+from agent.pipeline import run_pipeline
+from agent.rate_limit import estimate_tokens
+from example_usage import EXAMPLE_IDEAS
+from prompts.prompts import ONE_SHOT_PROMPT, ONE_SHOT_SECTIONS
+
+MODES = {"six_call": False, "one_shot": True}
+
+
+def estimated_prompt_tokens(idea, one_shot):
+    if one_shot:
+        return estimate_tokens(ONE_SHOT_PROMPT.format(idea=idea))
+    return sum(estimate_tokens(template.format(idea=idea)) for _, template in ONE_SHOT_SECTIONS)
+
+
+def run_mode(ideas, one_shot):
+    for key in llm.usage_totals:
+        llm.usage_totals[key] = 0
+    latencies, failed_steps = [], 0
+    for idea in ideas:
+        started = time.perf_counter()
+        _, errors = run_pipeline(idea, concurrent=True, one_shot=one_shot, use_cache=False)
+        latencies.append(time.perf_counter() - started)
+        failed_steps += len(errors)
+
+    count = len(ideas)
+    return {
+        "ideas": count,
+        "latency_mean_s": round(statistics.mean(latencies), 3),
+        "latency_max_s": round(max(latencies), 3),
+        "requests_per_idea": round(llm.usage_totals["requests"] / count, 2),
+        "prompt_tokens_per_idea": round(llm.usage_totals["prompt_tokens"] / count),
+        "completion_tokens_per_idea": round(llm.usage_totals["completion_tokens"] / count),
+        "estimated_prompt_tokens_per_idea": round(sum(estimated_prompt_tokens(i, one_shot) for i in ideas) / count),
+        "failed_steps": failed_steps,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare one-shot and six-call modes")
+    parser.add_argument("--ideas", type=int, default=len(EXAMPLE_IDEAS), help="number of example ideas")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    ideas = [EXAMPLE_IDEAS[i % len(EXAMPLE_IDEAS)] for i in range(args.ideas)]
+    results = {mode: run_mode(ideas, one_shot) for mode, one_shot in MODES.items()}
+
+    fields = list(results["six_call"])
+    print(f"\n{'metric':<36}{'six_call':>14}{'one_shot':>14}")
+    print("-" * 64)
+    for field in fields:
+        print(f"{field:<36}{results['six_call'][field]:>14}{results['one_shot'][field]:>14}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results saved to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Prompt compilation benchmark
+
+For every step template, compares the input of one call before compilation (the whole
+template rendered with the idea as one user message) with the compiled messages: a static
+system message that is identical for every idea, so provider-side prompt caching can
+serve it, and the short per-idea user message. Also shows the terse variant for batch runs.
+
+Then runs the example ideas through the pipeline against the mock Groq server with the
+full and the terse prompts, and reports the prompt tokens per step the API counted.
+Exits non-zero if compilation changed a prompt's text, or terse prompts didn't cut input
+tokens or left required fields out of the answers.
+
+Run: python benchmarks/bench_prompts.py [--ideas 6]
+"""
+
+import argparse
+import os
+import sys
+
+from mock_groq_server import MockGroqServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.instrumentation import collecting  # noqa: E402
+from agent.pipeline import run_pipeline  # noqa: E402
+from agent.prompt_compiler import compile_prompt, token_counts  # noqa: E402
+from agent.rate_limit import estimate_tokens  # noqa: E402
+from agent.router import missing_fields  # noqa: E402
+from agent.scheduler import get_scheduler  # noqa: E402
+from example_usage import EXAMPLE_IDEAS  # noqa: E402
+from prompts.prompts import STEP_PROMPTS, TERSE_STEP_PROMPTS  # noqa: E402
+
+
+def words(text):
+    return " ".join(text.split())
+
+
+def static_report(idea):
+    """Print estimated tokens per step for one idea; returns steps whose text changed"""
+    changed = []
+    print(f"\n{'Step':<13}{'inline':>8}{'system':>8}{'user':>6}{'per-idea':>10}{'terse sys':>11}")
+    print("-" * 56)
+    totals = dict.fromkeys(("inline", "system", "user", "terse"), 0)
+    for step, template in STEP_PROMPTS.items():
+        counts = token_counts(template, idea)
+        terse = estimate_tokens(compile_prompt(TERSE_STEP_PROMPTS[step]).system)
+        # The compiled messages must carry exactly the text of the inline prompt
+        compiled = compile_prompt(template)
+        if words(f"{compiled.system} {compiled.user(idea)}") != words(template.format(idea=idea)):
+            changed.append(step)
+        print(f"{step:<13}{counts['inline']:>8}{counts['system']:>8}{counts['user']:>6}"
+              f"{counts['user'] / counts['inline']:>10.0%}{terse:>11}")
+        for key in ("inline", "system", "user"):
+            totals[key] += counts[key]
+        totals["terse"] += terse
+    print("-" * 56)
+    print(f"{'TOTAL':<13}{totals['inline']:>8}{totals['system']:>8}{totals['user']:>6}"
+          f"{totals['user'] / totals['inline']:>10.0%}{totals['terse']:>11}")
+    print("\n(per-idea: share of the input that changes between ideas and can't come from a prefix cache)")
+    return changed
+
+
+def measured_run(ideas, terse):
+    incomplete = 0
+    with collecting() as metrics:
+        for idea in ideas:
+            results, _ = run_pipeline(idea, concurrent=True, one_shot=False, use_cache=False, terse=terse)
+            incomplete += sum(1 for step, text in results.items() if missing_fields(step, text))
+    prompt_tokens = {step: totals["prompt_tokens"] / totals["calls"] for step, totals in metrics.steps.items()}
+    return prompt_tokens, incomplete
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure input tokens of compiled and terse prompts")
+    parser.add_argument("--ideas", type=int, default=len(EXAMPLE_IDEAS), help="example ideas to run")
+    args = parser.parse_args()
+    ideas = [EXAMPLE_IDEAS[i % len(EXAMPLE_IDEAS)] for i in range(args.ideas)]
+
+    print("Estimated input tokens per call (first example idea, no upstream context)")
+    changed = static_report(ideas[0])
+
+    mock = MockGroqServer(latency_ms=20, tokens_per_second=20000).start()
+    os.environ["GROQ_BASE_URL"] = mock.base_url
+    os.environ.setdefault("GROQ_API_KEY", "mock")
+    get_scheduler().set_limits(1_000_000, 1_000_000_000)
+    try:
+        full, _ = measured_run(ideas, terse=False)
+        terse, incomplete = measured_run(ideas, terse=True)
+    finally:
+        mock.stop()
+
+    print(f"\nPrompt tokens per call counted by the mock API ({len(ideas)} ideas, with upstream context)\n")
+    print(f"{'Step':<13}{'full':>8}{'terse':>8}{'saved':>8}")
+    print("-" * 37)
+    for step in STEP_PROMPTS:
+        print(f"{step:<13}{full[step]:>8.0f}{terse[step]:>8.0f}{1 - terse[step] / full[step]:>8.0%}")
+    full_total, terse_total = sum(full.values()), sum(terse.values())
+    print("-" * 37)
+    print(f"{'per idea':<13}{full_total:>8.0f}{terse_total:>8.0f}{1 - terse_total / full_total:>8.0%}")
+
+    failures = []
+    if changed:
+        failures.append(f"compiled prompts differ from the templates for {', '.join(changed)}")
+    if terse_total >= full_total:
+        failures.append("terse prompts didn't cut input tokens")
+    if incomplete:
+        failures.append(f"{incomplete} terse answers missed required fields")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("\n✅ Compiled prompts keep every template's text; terse prompts cut input tokens with complete answers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Idea ranking benchmark
+
+Fills a temporary report store with synthetic reports (feasibility, market and risk
+sections in the analyzers' layout, with random numbers), then times rank_ideas() over
+all of them: loading the stored metrics, scoring, percentile ranks and the Pareto front.
+Exits non-zero if ranking takes longer than --budget-ms.
+
+Run: python benchmarks/bench_ranking.py [--reports 50000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent.ranking import rank_ideas  # noqa: E402
+from agent.report_store import ReportStore  # noqa: E402
+
+
+def make_analysis(rng):
+    competitors = ", ".join(f"Rival{rng.randrange(1000)}" for _ in range(rng.randint(1, 8)))
+    risks = "\n".join(
+        f"- Risk {i}: (Severity: {rng.choice(['High', 'Medium', 'Low'])}) - impact - mitigation"
+        for i in range(rng.randint(2, 8))
+    )
+    return {
+        "feasibility": (
+            f"- Technical Complexity: {rng.choice(['Low', 'Medium', 'High'])} - reason\n"
+            f"- Estimated Time to MVP: {rng.randint(4, 60)} weeks\n"
+            f"- Budget Estimate: ${rng.randint(5, 900)}k\n"
+            f"- Team Size Needed: {rng.randint(1, 8)} developers\n"
+            f"- Feasibility Verdict: {rng.choice(['YES', 'YES', 'NO'])} - reason\n"
+        ),
+        "market": (
+            f"- Market Size (TAM): ${rng.randint(1, 999)}{rng.choice(['M', 'B'])}\n"
+            f"- Top 3 Competitors: {competitors}\n"
+        ),
+        "risks": f"**Technical Risks:**\n{risks}\n",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ranking of saved ideas")
+    parser.add_argument("--reports", type=int, default=50_000, help="stored reports")
+    parser.add_argument("--top", type=int, default=20, help="ranked ideas returned (all are scored)")
+    parser.add_argument("--runs", type=int, default=5, help="timed rankings (best is reported)")
+    parser.add_argument("--budget-ms", type=float, default=500.0, help="fail if ranking is slower")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ReportStore(os.path.join(tmp, "reports.sqlite3"))
+        started = time.perf_counter()
+        for i in range(args.reports):
+            store.save(f"idea {i} {rng.random()}", make_analysis(rng))
+        print(f"Saved {args.reports} reports in {time.perf_counter() - started:.1f}s")
+
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            ranked = rank_ideas(store=store, top=args.top)
+            timings.append(time.perf_counter() - started)
+        best = min(timings) * 1000
+        front = len(rank_ideas(store=store, pareto_only=True))
+        print(f"  ranked {args.reports} ideas: best {best:.0f} ms, worst {max(timings) * 1000:.0f} ms; "
+              f"{front} on the Pareto front; top score {ranked[0]['score']}")
+
+    if best > args.budget_ms:
+        print(f"❌ Ranking over {args.budget_ms:.0f} ms")
+        sys.exit(1)
+    print(f"✅ Ranking under {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
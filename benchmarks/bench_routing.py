@@ -0,0 +1,111 @@
+"""
+Model routing benchmark
+
+Runs the same ideas through the step pipeline under three routes against the mock Groq
+server, where the small model cuts --malformed-rate of its answers short and the large
+model is --slowdown times slower:
+- small: every step on config.MODEL_NAME only
+- large: every step on config.LARGE_MODEL_NAME only
+- routed: config.STEP_MODELS (small first, escalating where the answer is incomplete)
+
+Reports mean idea latency, cost per idea at config.MODEL_PRICES, escalations and the
+share of feasibility/risk answers still missing required fields. Exits non-zero unless
+the routed run keeps feasibility and risks complete at less cost and latency than large.
+
+Run: python benchmarks/bench_routing.py [--ideas 24] [--malformed-rate 0.2]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from mock_groq_server import MockGroqServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import router  # noqa: E402
+from agent.instrumentation import collecting  # noqa: E402
+from agent.pipeline import run_pipeline  # noqa: E402
+from agent.scheduler import get_scheduler  # noqa: E402
+from config import LARGE_MODEL_NAME, MODEL_NAME, STEP_MODELS  # noqa: E402
+from example_usage import EXAMPLE_IDEAS  # noqa: E402
+
+GUARDED_STEPS = ("feasibility", "risks")
+
+
+def run_route(name, route, ideas):
+    router.STEP_MODELS = route
+    latencies, incomplete = [], 0
+    with collecting() as metrics:
+        for idea in ideas:
+            started = time.perf_counter()
+            results, _ = run_pipeline(idea, concurrent=True, one_shot=False, use_cache=False)
+            latencies.append(time.perf_counter() - started)
+            incomplete += sum(1 for step in GUARDED_STEPS
+                              if step not in results or router.missing_fields(step, results[step]))
+    steps = metrics.steps.values()
+    return {
+        "route": name,
+        "latency_mean_s": statistics.mean(latencies),
+        "cost_per_idea": sum(step["cost"] for step in steps) / len(ideas),
+        "calls_per_idea": sum(step["calls"] for step in steps) / len(ideas),
+        "escalations": sum(step["escalated"] for step in steps),
+        "incomplete": incomplete / (len(ideas) * len(GUARDED_STEPS)),
+    }, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare small, large and routed models on the mock server")
+    parser.add_argument("--ideas", type=int, default=24, help="ideas per route")
+    parser.add_argument("--malformed-rate", type=float, default=0.2,
+                        help="share of small-model answers cut short by the mock")
+    parser.add_argument("--slowdown", type=float, default=3.0, help="how much slower the large model is")
+    parser.add_argument("--latency-ms", type=int, default=150, help="mock time to first token (small model)")
+    args = parser.parse_args()
+
+    mock = MockGroqServer(latency_ms=args.latency_ms, malformed_rate=args.malformed_rate,
+                          large_models=LARGE_MODEL_NAME, large_model_slowdown=args.slowdown).start()
+    os.environ["GROQ_BASE_URL"] = mock.base_url
+    os.environ.setdefault("GROQ_API_KEY", "mock")
+    get_scheduler().set_limits(1_000_000, 1_000_000_000)
+
+    ideas = [EXAMPLE_IDEAS[i % len(EXAMPLE_IDEAS)] for i in range(args.ideas)]
+    routes = {
+        "small": {step: [MODEL_NAME] for step in STEP_MODELS},
+        "large": {step: [LARGE_MODEL_NAME] for step in STEP_MODELS},
+        "routed": STEP_MODELS,
+    }
+    try:
+        results = {}
+        for name, route in routes.items():
+            results[name], metrics = run_route(name, route, ideas)  # Table below is the routed run's
+    finally:
+        mock.stop()
+
+    print(f"\n{'route':<8}{'latency s':>11}{'$ / idea':>11}{'calls':>7}{'escalated':>11}{'incomplete':>12}")
+    print("-" * 60)
+    for result in results.values():
+        print(f"{result['route']:<8}{result['latency_mean_s']:>11.2f}{result['cost_per_idea']:>11.6f}"
+              f"{result['calls_per_idea']:>7.2f}{result['escalations']:>11}{result['incomplete']:>12.0%}")
+    print(f"\n(incomplete: {' and '.join(GUARDED_STEPS)} answers missing a required field)\n")
+    print(metrics.routing_table())
+
+    routed, large = results["routed"], results["large"]
+    failures = []
+    if routed["incomplete"]:
+        failures.append(f"routed run left {routed['incomplete']:.0%} of guarded answers incomplete")
+    if routed["cost_per_idea"] >= large["cost_per_idea"]:
+        failures.append("routed run cost as much as the large model")
+    if routed["latency_mean_s"] >= large["latency_mean_s"]:
+        failures.append("routed run was as slow as the large model")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("\n✅ Routing kept feasibility and risks complete for less cost and latency than the large model")
+
+
+if __name__ == "__main__":
+    main()
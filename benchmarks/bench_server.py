@@ -0,0 +1,156 @@
+"""
+HTTP API load test
+
+Starts the mock Groq server in-process and server.py as a subprocess pointed at it (in a
+temporary directory, so reports and cache stay out of the repo), then fires concurrent
+requests at the API:
+- coalesce: hundreds of POST /analyze for a few distinct ideas; the mock should see six
+  calls per distinct idea, not per request
+- stream: concurrent SSE clients, several per idea, each must get tokens and a final "done"
+- overload: more distinct ideas than workers + queue; the excess must get a fast 503
+
+Exits non-zero if a request fails unexpectedly or coalescing/backpressure didn't happen.
+
+Run: python benchmarks/bench_server.py [--requests 400] [--ideas 80]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from mock_groq_server import MockGroqServer
+from run_benchmarks import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_api(port, mock_url, workers, max_queue, directory):
+    env = dict(os.environ, GROQ_BASE_URL=mock_url, GROQ_API_KEY="mock")
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "server.py"), "--port", str(port), "--workers", str(workers),
+         "--max-queue", str(max_queue), "--rpm", "1000000", "--tpm", "1000000000"],
+        cwd=directory, env=env, stdout=subprocess.PIPE, text=True,
+    )
+    process.stdout.readline()  # "listening on ..."
+    return process
+
+
+def report(name, latencies, statuses, extra=""):
+    counts = ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items()))
+    print(f"  {name:<9} {len(latencies):>4} requests  p50 {percentile(latencies, 50) * 1000:7.0f} ms  "
+          f"p99 {percentile(latencies, 99) * 1000:7.0f} ms  [{counts}] {extra}")
+
+
+async def timed(coroutine):
+    started = time.perf_counter()
+    result = await coroutine
+    return time.perf_counter() - started, result
+
+
+async def load(base_url, args, mock):
+    failures = []
+    limits = httpx.Limits(max_connections=2000, max_keepalive_connections=2000)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=600) as client:
+        # Coalescing: every distinct idea is requested requests/ideas times at once
+        ideas = [f"Load test idea {i}: a marketplace for niche service {i}" for i in range(args.ideas)]
+        before = mock.stats["requests"]
+        results = await asyncio.gather(*(
+            timed(client.post("/analyze", json={"idea": ideas[i % args.ideas], "use_cache": False}))
+            for i in range(args.requests)
+        ))
+        statuses = {}
+        for _, response in results:
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        llm_calls = mock.stats["requests"] - before
+        report("coalesce", [elapsed for elapsed, _ in results], statuses,
+               f"{llm_calls} LLM calls for {args.ideas} ideas")
+        if statuses != {200: args.requests}:
+            failures.append("coalesce: not every request succeeded")
+        if llm_calls > args.ideas * 6:
+            failures.append(f"coalesce: {llm_calls} LLM calls, expected at most {args.ideas * 6}")
+        report_id = results[0][1].json()["id"]
+        if (await client.get(f"/reports/{report_id}")).status_code != 200:
+            failures.append(f"GET /reports/{report_id} failed")
+
+        # Streaming: several SSE clients per idea
+        async def stream(idea):
+            tokens, done = 0, False
+            async with client.stream("POST", "/analyze?stream=1", json={"idea": idea, "use_cache": False}) as response:
+                async for line in response.aiter_lines():
+                    tokens += line == "event: token"
+                    done = done or line == "event: done"
+            return response.status_code, tokens, done
+
+        stream_ideas = [f"Streaming idea {i}: a scheduling assistant for clinic {i}" for i in range(args.stream_ideas)]
+        results = await asyncio.gather(*(timed(stream(stream_ideas[i % len(stream_ideas)]))
+                                         for i in range(args.streams)))
+        statuses = {}
+        for _, (status, tokens, done) in results:
+            statuses[status] = statuses.get(status, 0) + 1
+            if status != 200 or not tokens or not done:
+                failures.append("stream: a client got no tokens or no final event")
+        report("stream", [elapsed for elapsed, _ in results], statuses,
+               f"{sum(tokens for _, (_, tokens, _) in results)} token events")
+
+        # Overload: more distinct ideas than the server will queue
+        capacity = args.workers + args.max_queue
+        overload = capacity + args.overflow
+        results = await asyncio.gather(*(
+            timed(client.post("/analyze", json={"idea": f"Overload idea {i}", "use_cache": False}))
+            for i in range(overload)
+        ))
+        statuses = {}
+        for _, response in results:
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        rejected = [elapsed for elapsed, response in results if response.status_code == 503]
+        report("overload", [elapsed for elapsed, _ in results], statuses,
+               f"503s answered in p99 {percentile(rejected, 99) * 1000 if rejected else 0:.0f} ms")
+        # Ideas that finish while the burst is still arriving free their slot, so not exactly `overflow`
+        if not statuses.get(503) or set(statuses) - {200, 503}:
+            failures.append(f"overload: expected 200s and 503s only, got {statuses}")
+
+        health = (await client.get("/health")).json()
+        print(f"\n  server: {json.dumps({k: health[k] for k in ('requests', 'analyses', 'coalesced', 'rejected')})}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the HTTP API against the mock Groq server")
+    parser.add_argument("--requests", type=int, default=400, help="concurrent POST /analyze requests")
+    parser.add_argument("--ideas", type=int, default=80, help="distinct ideas among them")
+    parser.add_argument("--streams", type=int, default=100, help="concurrent SSE clients")
+    parser.add_argument("--stream-ideas", type=int, default=20, help="distinct ideas among them")
+    parser.add_argument("--workers", type=int, default=32, help="server workers")
+    parser.add_argument("--max-queue", type=int, default=128, help="server queue size")
+    parser.add_argument("--overflow", type=int, default=100, help="ideas sent beyond workers + queue")
+    parser.add_argument("--port", type=int, default=8181)
+    parser.add_argument("--latency-ms", type=int, default=200, help="mock time to first token")
+    args = parser.parse_args()
+
+    mock = MockGroqServer(latency_ms=args.latency_ms).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        api = start_api(args.port, mock.base_url, args.workers, args.max_queue, tmp)
+        try:
+            print(f"\nLoad testing http://127.0.0.1:{args.port} against mock Groq at {mock.base_url}\n")
+            failures = asyncio.run(load(f"http://127.0.0.1:{args.port}", args, mock))
+        finally:
+            api.terminate()
+            api.wait()
+            mock.stop()
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ API held the load: requests coalesced, streams completed, overload shed with 503")
+
+
+if __name__ == "__main__":
+    main()
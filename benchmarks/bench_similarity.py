@@ -0,0 +1,81 @@
+"""
+Near-duplicate lookup benchmark
+
+Fills a temporary report store with synthetic ideas, then times ReportStore.similar()
+for paraphrases of stored ideas (should match) and unrelated ideas (should not).
+Exits non-zero if p99 lookup latency goes over --budget-ms.
+
+Run: python benchmarks/bench_similarity.py [--ideas 100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent.report_store import ReportStore  # noqa: E402
+from run_benchmarks import percentile  # noqa: E402
+
+VOCABULARY_SIZE = 5000
+
+
+def make_idea(rng, words):
+    return " ".join(rng.sample(words, rng.randint(12, 24)))
+
+
+def paraphrase(rng, idea, words):
+    """Reorder the idea and swap one or two words, like a light rewording"""
+    tokens = idea.split()
+    rng.shuffle(tokens)
+    for _ in range(rng.randint(1, 2)):
+        tokens[rng.randrange(len(tokens))] = rng.choice(words)
+    return " ".join(tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate lookups")
+    parser.add_argument("--ideas", type=int, default=100_000, help="stored ideas")
+    parser.add_argument("--queries", type=int, default=1000, help="lookups of each kind")
+    parser.add_argument("--budget-ms", type=float, default=5.0, help="fail if p99 lookup is slower")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    words = [f"w{i}x" for i in range(VOCABULARY_SIZE)]
+    ideas = [make_idea(rng, words) for _ in range(args.ideas)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ReportStore(os.path.join(tmp, "reports.sqlite3"))
+        started = time.perf_counter()
+        for idea in ideas:
+            store.save(idea, {"feasibility": "-"})
+        print(f"Indexed {args.ideas} ideas in {time.perf_counter() - started:.1f}s")
+
+        results = {}
+        for kind, queries, expect_match in (
+            ("paraphrase", [paraphrase(rng, rng.choice(ideas), words) for _ in range(args.queries)], True),
+            ("unrelated", [make_idea(rng, words) for _ in range(args.queries)], False),
+        ):
+            latencies, correct = [], 0
+            for query in queries:
+                started = time.perf_counter()
+                matches = store.similar(query)
+                latencies.append(time.perf_counter() - started)
+                correct += bool(matches) == expect_match
+            results[kind] = percentile(latencies, 99) * 1000
+            print(f"  {kind:<11} p50 {percentile(latencies, 50) * 1000:6.2f} ms   "
+                  f"p99 {results[kind]:6.2f} ms   {'recall' if expect_match else 'correct'} "
+                  f"{correct / len(queries):.1%}")
+
+    if max(results.values()) > args.budget_ms:
+        print(f"❌ p99 lookup over {args.budget_ms} ms")
+        sys.exit(1)
+    print(f"✅ p99 lookup under {args.budget_ms} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Single-flight benchmark
+
+For each idea, starts --callers identical feasibility calls at once against the mock Groq
+server with the response cache off: half from threads (the sync analyzer, as the pipeline
+and the server run it) and half as asyncio tasks (llm.acomplete), some with the idea's
+whitespace changed. Runs the workload with config.SINGLE_FLIGHT off and on and reports the
+requests the mock server received, wall time and the coalesced calls in the metrics.
+
+Exits non-zero unless single-flight sent exactly one request per idea, every caller got
+the same answer as the others asking about that idea, and the metrics counted the rest
+as coalesced.
+
+Run: python benchmarks/bench_single_flight.py [--ideas 6] [--callers 16]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mock_groq_server import MockGroqServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import llm  # noqa: E402
+from agent.idea_analyzer import analyze_idea  # noqa: E402
+from agent.instrumentation import collecting  # noqa: E402
+from agent.scheduler import get_scheduler  # noqa: E402
+from example_usage import EXAMPLE_IDEAS  # noqa: E402
+from prompts.prompts import IDEA_ANALYSIS_PROMPT  # noqa: E402
+
+
+def spellings(idea, count):
+    """The idea as `count` callers might send it: extra spaces and line breaks included"""
+    variants = [idea, f"  {idea}  ", idea.replace(" ", "  "), idea.replace(" ", "\n", 1)]
+    return [variants[i % len(variants)] for i in range(count)]
+
+
+async def workload(ideas, callers, executor):
+    loop = asyncio.get_running_loop()
+    calls = []
+    for idea in ideas:
+        for i, text in enumerate(spellings(idea, callers)):
+            if i % 2:
+                calls.append(llm.acomplete("feasibility", IDEA_ANALYSIS_PROMPT, text, use_cache=False))
+            else:
+                calls.append(loop.run_in_executor(executor, lambda text=text: analyze_idea(text, use_cache=False)))
+    answers = await asyncio.gather(*calls)
+    # Group the answers back by idea (callers for one idea are contiguous)
+    return [answers[i:i + callers] for i in range(0, len(answers), callers)]
+
+
+def run(mock, ideas, callers, single_flight):
+    llm.SINGLE_FLIGHT = single_flight
+    before = mock.stats["requests"]
+    with collecting() as metrics, ThreadPoolExecutor(max_workers=len(ideas) * callers) as executor:
+        started = time.perf_counter()
+        grouped = asyncio.run(workload(ideas, callers, executor))
+        wall = time.perf_counter() - started
+    step = metrics.steps["feasibility"]
+    return {
+        "requests": mock.stats["requests"] - before,
+        "wall_s": wall,
+        "calls": step["calls"],
+        "coalesced": step["coalesced"],
+        "tokens": step["prompt_tokens"] + step["completion_tokens"],
+        "consistent": all(len(set(answers)) == 1 for answers in grouped),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure request coalescing of identical analyzer calls")
+    parser.add_argument("--ideas", type=int, default=len(EXAMPLE_IDEAS), help="distinct ideas")
+    parser.add_argument("--callers", type=int, default=16, help="concurrent callers per idea")
+    args = parser.parse_args()
+    ideas = [f"{EXAMPLE_IDEAS[i % len(EXAMPLE_IDEAS)]} (variant {i})" for i in range(args.ideas)]
+
+    # Slow enough that every caller arrives while the first request is still in flight
+    mock = MockGroqServer(latency_ms=300, tokens_per_second=5000).start()
+    os.environ["GROQ_BASE_URL"] = mock.base_url
+    os.environ.setdefault("GROQ_API_KEY", "mock")
+    get_scheduler().set_limits(1_000_000, 1_000_000_000)
+    try:
+        off = run(mock, ideas, args.callers, single_flight=False)
+        on = run(mock, ideas, args.callers, single_flight=True)
+    finally:
+        mock.stop()
+
+    total = args.ideas * args.callers
+    print(f"\n{total} feasibility calls: {args.ideas} ideas x {args.callers} concurrent callers "
+          f"(half threads, half asyncio tasks)\n")
+    print(f"{'Single-flight':<15}{'Requests':>10}{'Coalesced':>11}{'API tokens':>12}{'Wall s':>8}")
+    print("-" * 56)
+    for name, result in (("off", off), ("on", on)):
+        print(f"{name:<15}{result['requests']:>10}{result['coalesced']:>11}{result['tokens']:>12}"
+              f"{result['wall_s']:>8.2f}")
+
+    failures = []
+    if on["requests"] != args.ideas:
+        failures.append(f"single-flight sent {on['requests']} requests for {args.ideas} ideas")
+    if on["coalesced"] != total - args.ideas or on["calls"] != total:
+        failures.append(f"metrics counted {on['coalesced']} of {on['calls']} calls as coalesced, "
+                        f"expected {total - args.ideas} of {total}")
+    if not on["consistent"]:
+        failures.append("callers asking about the same idea got different answers")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"\n✅ One request per idea for {total} concurrent calls "
+          f"({off['requests'] / on['requests']:.0f}x fewer requests, every caller got the shared answer)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Cold-start benchmark for the command line
+
+Runs each command in a fresh interpreter with `python -X importtime` and sums the import
+time of the modules a bare interpreter (`python -c pass`) doesn't load, so whatever site
+and .pth files import in this environment isn't counted. Lists the slowest modules and
+fails (exit code 1) if a command's median goes over its budget or it imports the LLM
+stack when it shouldn't. Report commands run without an API key, as a user browsing old
+reports would. The budget leaves headroom for a loaded machine: these commands take
+about 20 ms or less here, so only an import creeping back in fails it.
+
+Run: python benchmarks/bench_startup.py [--runs 7] [--budget-ms 100]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that only the analysis path may load
+LLM_STACK = ("groq", "httpx", "dotenv", "agent.llm", "agent.idea_analyzer")
+
+# (name, argv after the interpreter); none of these may load the LLM stack
+COMMANDS = [
+    ("cli reports list", [os.path.join(ROOT, "cli.py"), "reports", "list", "--limit", "1"]),
+    ("cli --help", [os.path.join(ROOT, "cli.py"), "--help"]),
+    ("import main", ["-c", "import main"]),
+    ("import utils", ["-c", "import utils"]),
+]
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def measure(argv, cwd):
+    """Run one cold start and return (total import microseconds, {module: self microseconds})"""
+    env = {key: value for key, value in os.environ.items() if key != "GROQ_API_KEY"}
+    env["PYTHONPATH"] = ROOT
+    result = subprocess.run([sys.executable, "-X", "importtime", *argv], cwd=cwd, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} failed:\n{result.stderr[-2000:]}")
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(1))
+    return sum(modules.values()), modules
+
+
+def own_modules(samples, baseline):
+    """Median import microseconds of the modules beyond the baseline, and those modules"""
+    modules = {module: us for module, us in samples[-1][1].items() if module not in baseline}
+    totals = [sum(us for module, us in found.items() if module not in baseline) for _, found in samples]
+    return statistics.median(totals), modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure command line startup time")
+    parser.add_argument("--runs", type=int, default=7, help="cold starts per command (median is reported)")
+    parser.add_argument("--budget-ms", type=float, default=100.0,
+                        help="fail if a command's imports beyond the bare interpreter take longer")
+    parser.add_argument("--top", type=int, default=5, help="slowest modules to list per command")
+    args = parser.parse_args()
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as cwd:
+        bare = [measure(["-c", "pass"], cwd) for _ in range(args.runs)]
+        baseline = set().union(*(found for _, found in bare))
+        print(f"   {'python -c pass':<20} {statistics.median(total for total, _ in bare) / 1000:>8.1f} ms imports  "
+              f"({len(baseline)} modules, the baseline)")
+        for name, argv in COMMANDS:
+            total_us, modules = own_modules([measure(argv, cwd) for _ in range(args.runs)], baseline)
+            total_ms = total_us / 1000
+            loaded = [module for module in LLM_STACK if module in modules]
+
+            status = "✅"
+            if total_ms > args.budget_ms:
+                status = "❌"
+                failures += 1
+            if loaded:
+                status = "❌"
+                failures += 1
+            print(f"{status} {name:<20} {total_ms:>8.1f} ms imports  (+{len(modules)} modules)")
+            if loaded:
+                print(f"   loads the LLM stack: {', '.join(loaded)}")
+            for module, self_us in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+                print(f"   {self_us / 1000:>7.1f} ms  {module}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
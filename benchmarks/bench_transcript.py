@@ -0,0 +1,142 @@
+"""
+Record/replay transcript benchmark
+
+1. record: analyzes --ideas ideas against the mock Groq server with TRANSCRIPT_MODE=record
+   (every other idea streamed), timing each idea
+2. replay: stops the mock server, drops GROQ_API_KEY and replays the same ideas from the
+   transcript at the recorded speed
+3. load: replays --load synthetic ideas as fast as possible (TRANSCRIPT_SPEED=0) through
+   batch.py's run_batch and through concurrent steps, each call answered from a recording
+   of the same step (TRANSCRIPT_FALLBACK)
+
+Exits non-zero if a replayed report differs from the recorded one, the replayed per-idea
+latency is more than --tolerance off the recorded one, or a load-test step fails.
+Load throughput is bounded by the agent's own per-call work (one process, one GIL).
+
+Run: python benchmarks/bench_transcript.py [--ideas 12] [--load 2000] [--parallel 32]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mock_groq_server import MockGroqServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import llm, transcript  # noqa: E402
+from agent.batch_analyzer import run_batch  # noqa: E402
+from agent.pipeline import run_pipeline  # noqa: E402
+from agent.scheduler import get_scheduler  # noqa: E402
+from example_usage import EXAMPLE_IDEAS  # noqa: E402
+
+
+def analyze(idea, stream):
+    started = time.perf_counter()
+    results, errors = run_pipeline(idea, concurrent=True, use_cache=False,
+                                   on_token=(lambda key, text: None) if stream else None)
+    return results, errors, time.perf_counter() - started
+
+
+def run(ideas, parallel):
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        started = time.perf_counter()
+        outcomes = list(executor.map(lambda i: analyze(ideas[i], i % 2 == 0), range(len(ideas))))
+    return outcomes, time.perf_counter() - started
+
+
+def run_batch_load(ideas, concurrency, tmp):
+    """Replay ideas through run_batch; returns (ideas with failed steps, wall seconds)"""
+    input_path, output_path = os.path.join(tmp, "ideas.jsonl"), os.path.join(tmp, "results.jsonl")
+    with open(input_path, "w") as f:
+        f.writelines(json.dumps(idea) + "\n" for idea in ideas)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_batch(input_path, output_path, concurrency=concurrency, use_cache=False, save_reports=False)
+    wall = time.perf_counter() - started
+    with open(output_path) as f:
+        return sum(bool(json.loads(line)["errors"]) for line in f), wall
+
+
+def mean_latency(outcomes):
+    return sum(latency for _, _, latency in outcomes) / len(outcomes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record analyses to a transcript and replay them offline")
+    parser.add_argument("--ideas", type=int, default=12, help="ideas recorded and replayed")
+    parser.add_argument("--load", type=int, default=2000, help="synthetic ideas in the load test")
+    parser.add_argument("--parallel", type=int, default=32, help="ideas analyzed at the same time")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative difference of recorded and replayed latency")
+    args = parser.parse_args()
+    ideas = [f"{EXAMPLE_IDEAS[i % len(EXAMPLE_IDEAS)]} (variant {i})" for i in range(args.ideas)]
+    get_scheduler().set_limits(1_000_000, 1_000_000_000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["TRANSCRIPT_PATH"] = os.path.join(tmp, "transcript.sqlite3")
+        mock = MockGroqServer(latency_ms=150, jitter_ms=0, tokens_per_second=1500).start()
+        os.environ.update(GROQ_BASE_URL=mock.base_url, GROQ_API_KEY="mock", TRANSCRIPT_MODE="record")
+        try:
+            llm.get_client()  # Importing the SDK isn't part of the API's latency
+            recorded, _ = run(ideas, min(args.parallel, args.ideas))
+        finally:
+            mock.stop()
+            llm.close()
+        transcript.get_transcript().close()
+        size_kb = os.path.getsize(os.environ["TRANSCRIPT_PATH"]) / 1024
+
+        # No server and no key from here on
+        for name in ("GROQ_BASE_URL", "GROQ_API_KEY"):
+            os.environ.pop(name)
+        os.environ["TRANSCRIPT_MODE"] = "replay"
+        replayed, _ = run(ideas, min(args.parallel, args.ideas))
+
+        os.environ["TRANSCRIPT_SPEED"] = "0"
+        llm.close()
+        transcript.TRANSCRIPT_FALLBACK = True
+        synthetic = [f"Synthetic idea {i}: {EXAMPLE_IDEAS[i % len(EXAMPLE_IDEAS)]}" for i in range(args.load)]
+        batch_failed, batch_wall = run_batch_load(synthetic, args.parallel, tmp)
+        load, load_wall = run(synthetic, args.parallel)
+        stats = transcript.get_transcript().stats
+        transcript.get_transcript().close()
+
+    print(f"\n{transcript.get_transcript().stats['recorded']} calls recorded for {args.ideas} ideas "
+          f"({size_kb:.0f} KB transcript)\n")
+    print(f"{'Run':<22}{'Ideas':>7}{'Latency s':>11}{'Ideas/s':>10}")
+    print("-" * 50)
+    print(f"{'record (mock server)':<22}{args.ideas:>7}{mean_latency(recorded):>11.3f}{'':>10}")
+    print(f"{'replay (speed 1)':<22}{args.ideas:>7}{mean_latency(replayed):>11.3f}{'':>10}")
+    print(f"{'load: batch':<22}{args.load:>7}{'':>11}{args.load / batch_wall:>10.0f}")
+    print(f"{'load: concurrent':<22}{args.load:>7}{mean_latency(load):>11.3f}{args.load / load_wall:>10.0f}")
+    print(f"\n(latency: mean per idea; {stats['replayed']} answers replayed, "
+          f"{stats['fallbacks']} of them from another idea's recording)")
+
+    failures = []
+    if any(errors for _, errors, _ in recorded):
+        failures.append("steps failed while recording")
+    if [results for results, _, _ in replayed] != [results for results, _, _ in recorded]:
+        failures.append("replayed reports differ from the recorded ones")
+    drift = abs(mean_latency(replayed) - mean_latency(recorded)) / mean_latency(recorded)
+    if drift > args.tolerance:
+        failures.append(f"replayed latency is {drift:.0%} off the recorded latency")
+    failed = batch_failed + sum(bool(errors) for _, errors, _ in load)
+    if failed:
+        failures.append(f"{failed} load-test ideas had failed steps")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"\n✅ Replay reproduced every report within {drift:.0%} of the recorded latency without an API "
+          f"key; offline load ran {args.load / batch_wall:.0f} (batch) and {args.load / load_wall:.0f} "
+          f"(concurrent) ideas/s")
+
+
+if __name__ == "__main__":
+    main()
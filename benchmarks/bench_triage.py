@@ -0,0 +1,115 @@
+"""
+Feasibility gate benchmark
+
+Analyzes --ideas ideas against the mock Groq server with the response cache off, where a
+fixed --no-rate share of the ideas gets a NO feasibility verdict, once per gate mode:
+- off: all six steps for every idea (FEASIBILITY_GATE = None)
+- first: feasibility first, the other five only for ideas that pass
+- speculative: market and risks stream alongside feasibility and are cut off on NO
+
+Reports the requests and completion tokens the mock server generated, per-idea latency
+(all ideas and the feasible ones) and how many ideas were triaged. Exits non-zero if a
+gated run triaged a different set of ideas than the ones judged NO, a passing idea lost a
+section, or gating didn't cut the completion tokens.
+
+Run: python benchmarks/bench_triage.py [--ideas 40] [--no-rate 0.7] [--parallel 8]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mock_groq_server import MockGroqServer, rejected
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.pipeline import STEPS, run_pipeline, split_skipped  # noqa: E402
+from agent.scheduler import get_scheduler  # noqa: E402
+from example_usage import EXAMPLE_IDEAS  # noqa: E402
+
+GATES = {"off": False, "first": "first", "speculative": "speculative"}
+
+
+def analyze(idea, gate):
+    started = time.perf_counter()
+    # Streamed, so a cancelled step's response is closed mid-answer
+    results, errors = run_pipeline(idea, concurrent=True, gate=gate, use_cache=False,
+                                   on_token=lambda key, text: None)
+    failures, skipped = split_skipped(errors)
+    return {"latency_s": time.perf_counter() - started, "complete": len(results) == len(STEPS),
+            "triaged": bool(skipped), "failures": len(failures)}
+
+
+def run(mock, ideas, expected, gate, parallel):
+    before = dict(mock.stats)
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        started = time.perf_counter()
+        outcomes = list(executor.map(lambda idea: analyze(idea, gate), ideas))
+        wall = time.perf_counter() - started
+    return {
+        "requests": mock.stats["requests"] - before["requests"],
+        "tokens": mock.stats["completion_tokens"] - before["completion_tokens"],
+        "wall_s": wall,
+        "latency_s": sum(o["latency_s"] for o in outcomes) / len(outcomes),
+        # Mean latency of the ideas that pass, which get the full report
+        "pass_latency_s": (sum(o["latency_s"] for o, no in zip(outcomes, expected) if not no)
+                           / max(1, expected.count(False))),
+        "outcomes": outcomes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the requests and tokens the feasibility gate saves")
+    parser.add_argument("--ideas", type=int, default=40, help="ideas analyzed per gate mode")
+    parser.add_argument("--no-rate", type=float, default=0.7, help="share of ideas judged not feasible")
+    parser.add_argument("--parallel", type=int, default=8, help="ideas analyzed at the same time")
+    args = parser.parse_args()
+    ideas = [f"{EXAMPLE_IDEAS[i % len(EXAMPLE_IDEAS)]} (variant {i})" for i in range(args.ideas)]
+    expected = [rejected(f"Startup Idea:\n{idea}", args.no_rate) for idea in ideas]
+
+    mock = MockGroqServer(latency_ms=150, tokens_per_second=1500, no_verdict_rate=args.no_rate).start()
+    os.environ["GROQ_BASE_URL"] = mock.base_url
+    os.environ.setdefault("GROQ_API_KEY", "mock")
+    get_scheduler().set_limits(1_000_000, 1_000_000_000)
+    try:
+        results = {name: run(mock, ideas, expected, gate, args.parallel) for name, gate in GATES.items()}
+    finally:
+        mock.stop()
+
+    print(f"\n{args.ideas} ideas, {sum(expected)} judged not feasible, {args.parallel} at a time\n")
+    print(f"{'Gate':<13}{'Requests':>10}{'Tokens':>9}{'Tokens/idea':>13}{'Latency s':>11}{'Pass s':>8}"
+          f"{'Triaged':>9}{'Wall s':>8}")
+    print("-" * 81)
+    for name, result in results.items():
+        triaged = sum(o["triaged"] for o in result["outcomes"])
+        print(f"{name:<13}{result['requests']:>10}{result['tokens']:>9}{result['tokens'] / args.ideas:>13.0f}"
+              f"{result['latency_s']:>11.2f}{result['pass_latency_s']:>8.2f}{triaged:>9}{result['wall_s']:>8.2f}")
+    print("\n(tokens: completion tokens the mock server generated, including streams cut off mid-answer;\n"
+          " pass s: mean latency of the ideas judged feasible)")
+
+    failures = []
+    if any(o["triaged"] for o in results["off"]["outcomes"]):
+        failures.append("ideas were triaged with the gate off")
+    for name in ("first", "speculative"):
+        outcomes = results[name]["outcomes"]
+        if [o["triaged"] for o in outcomes] != expected:
+            failures.append(f"{name}: triaged ideas don't match the ones judged not feasible")
+        if not all(o["complete"] for o, no in zip(outcomes, expected) if not no):
+            failures.append(f"{name}: a feasible idea is missing sections")
+        if any(o["failures"] for o in outcomes):
+            failures.append(f"{name}: steps failed")
+        if sum(expected) and results[name]["tokens"] >= results["off"]["tokens"]:
+            failures.append(f"{name}: gating didn't reduce completion tokens")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"\n✅ The gate cut completion tokens by "
+          f"{1 - results['first']['tokens'] / results['off']['tokens']:.0%} (first) and "
+          f"{1 - results['speculative']['tokens'] / results['off']['tokens']:.0%} (speculative)")
+
+
+if __name__ == "__main__":
+    main()
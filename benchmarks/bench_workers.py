@@ -0,0 +1,108 @@
+"""
+Multi-process worker benchmark
+
+Starts the mock Groq server in-process, fills a sqlite work queue in a temporary directory
+and runs worker.py processes against it:
+- scaling: the same ideas with 1 process vs --processes processes (no rate limit)
+- shared limit: --processes workers under one --rpm budget while one worker is killed
+  with SIGKILL mid-run; its leased ideas must be reclaimed and every idea finished, and
+  the LLM calls of all workers together must stay within the one budget
+
+Run: python benchmarks/bench_workers.py [--ideas 96] [--processes 4]
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from mock_groq_server import MockGroqServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent.work_queue import SqliteQueue  # noqa: E402
+
+
+def run_workers(directory, mock_url, processes, ideas, extra_args, kill_after_done=None):
+    """Queue `ideas` and run `processes` workers until the queue is drained; returns (wall seconds, counts)"""
+    queue = SqliteQueue(os.path.join(directory, "queue.sqlite3"))
+    queue.enqueue((f"idea-{i}", f"Benchmark idea {i}: bookkeeping for small bakery chain {i}") for i in range(ideas))
+    env = dict(os.environ, GROQ_BASE_URL=mock_url, GROQ_API_KEY="mock")
+    command = [sys.executable, os.path.join(ROOT, "worker.py"), "--queue", "queue.sqlite3", "--no-cache", *extra_args]
+    started = time.perf_counter()
+    workers = [subprocess.Popen(command, cwd=directory, env=env, stdout=subprocess.DEVNULL)
+               for _ in range(processes)]
+    if kill_after_done is not None:
+        # Kill mid-run, once workers are analyzing, so the victim holds half-finished ideas
+        while queue.counts()["done"] < kill_after_done:
+            time.sleep(0.05)
+        workers[0].send_signal(signal.SIGKILL)
+        print(f"  💥 killed worker pid {workers[0].pid} after {kill_after_done} ideas were done")
+    for process in workers:
+        process.wait()
+    return time.perf_counter() - started, queue.counts()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark queue workers across processes")
+    parser.add_argument("--ideas", type=int, default=96, help="ideas in the queue")
+    parser.add_argument("--processes", type=int, default=4, help="worker processes")
+    parser.add_argument("--concurrency", type=int, default=4, help="ideas per worker process")
+    parser.add_argument("--rpm", type=int, default=360,
+                        help="shared requests-per-minute budget (below the run's LLM calls, so it binds)")
+    parser.add_argument("--lease", type=float, default=3.0, help="lease seconds in the crash test")
+    parser.add_argument("--latency-ms", type=int, default=100, help="mock time to first token")
+    args = parser.parse_args()
+
+    mock = MockGroqServer(latency_ms=args.latency_ms, tokens_per_second=4000).start()
+    calls = []
+    count = mock._count
+
+    def record(key, n=1):
+        if key == "requests":
+            calls.append(time.monotonic())
+        count(key, n)
+
+    mock._count = record
+    failures = []
+    try:
+        print(f"\nWorkers against mock Groq at {mock.base_url}\n")
+        unlimited = ["--concurrency", str(args.concurrency), "--rpm", "1000000", "--tpm", "1000000000"]
+        rates = {}
+        for processes in (1, args.processes):
+            with tempfile.TemporaryDirectory() as tmp:
+                wall, counts = run_workers(tmp, mock.base_url, processes, args.ideas, unlimited)
+            rates[processes] = args.ideas / wall * 60
+            print(f"  scaling   {processes} process(es): {wall:6.1f}s  {rates[processes]:7.1f} ideas/min  {counts}")
+        print(f"  speedup   {rates[args.processes] / rates[1]:.1f}x with {args.processes} processes")
+
+        limited = ["--concurrency", str(args.concurrency), "--rpm", str(args.rpm), "--tpm", "1000000000",
+                   "--lease", str(args.lease)]
+        calls.clear()
+        with tempfile.TemporaryDirectory() as tmp:
+            wall, counts = run_workers(tmp, mock.base_url, args.processes, args.ideas, limited,
+                                       kill_after_done=args.processes)
+        # A full bucket allows one burst of `rpm` calls, then `rpm` per minute
+        allowed = args.rpm + args.rpm * wall / 60
+        print(f"  limited   {args.processes} processes:  {wall:6.1f}s  {len(calls)} LLM calls "
+              f"(budget allows {allowed:.0f})  {counts}")
+        if counts["done"] != args.ideas:
+            failures.append(f"only {counts['done']} of {args.ideas} ideas finished after the crash")
+        if len(calls) > allowed:
+            failures.append(f"{len(calls)} LLM calls exceed the shared budget of {allowed:.0f}")
+    finally:
+        mock.stop()
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Crashed worker's ideas reclaimed; all workers stayed within one shared budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Local stand-in for the Groq chat completions API, for offline benchmarks and load tests
+
+Serves POST .../chat/completions (plain JSON and SSE streaming) with configurable
+latency, token rate, error rate and 429 injection. Responses echo the output format
+requested in the prompt, so one-shot markers and structured sections parse as usual.
+
+Run: python benchmarks/mock_groq_server.py --port 8000 --latency-ms 300 --tokens-per-second 800
+Then point the agent at it: GROQ_BASE_URL=http://127.0.0.1:8000 GROQ_API_KEY=mock python main.py
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_OPTIONS = {
+    "latency_ms": 200,          # Time to first token
+    "jitter_ms": 50,            # Uniform +/- jitter on latency_ms
+    "tokens_per_second": 800,   # Completion generation speed
+    "error_rate": 0.0,          # Fraction of requests answered with a 500
+    "rate_limit_rate": 0.0,     # Fraction of requests answered with a 429
+    "retry_after": 1.0,         # Seconds advertised on injected 429s
+    "min_completion_tokens": 0, # Pad completions up to this many tokens
+    "malformed_rate": 0.0,      # Fraction of answers cut short (missing format fields)...
+    "large_models": "",         # ...except from these comma-separated models,
+    "large_model_slowdown": 3.0,  # which are this many times slower
+    "no_verdict_rate": 0.0,     # Fraction of ideas judged not feasible (the same ideas every run)
+}
+
+_FORMAT_BLOCK = re.compile(r"Format your response as:\s*(.*?)\s*Startup Idea:", re.DOTALL)
+_ONE_SHOT_BLOCK = re.compile(r"(<<<[A-Z_]+>>>.*?)\s*Startup Idea:", re.DOTALL)
+
+
+def count_tokens(text):
+    return len(text) // 4 + 1
+
+
+# Sample values for the placeholders the structured parsers read; other [placeholders]
+# just lose their brackets
+_FILLERS = {
+    "[YES/NO]": "YES",
+    "[Level]": "Medium",
+    "[X weeks]": "12 weeks",
+    "$[X] TAM (or X potential users)": "$4 billion TAM",
+    "$[X]": "$60,000",
+    "[X developers, X designers, X founders]": "2 developers, 1 designer, 1 founder",
+    "[Names and brief comparison]": "Acme, Globex, Initech - broader but slower to set up",
+    "(Severity: High/Medium/Low)": "(Severity: Medium)",
+}
+_PLACEHOLDER = re.compile(r"\[([^\]\n]*)\]")
+
+
+def rejected(prompt, rate):
+    """Whether the idea in a prompt gets a NO verdict; decided by the idea text, not by chance"""
+    idea = prompt.rpartition("Startup Idea:")[2].strip()
+    return zlib.crc32(idea.encode("utf-8")) % 1000 < rate * 1000
+
+
+def fake_completion(prompt, min_tokens=0, malformed=False, verdict="YES"):
+    """Answer with the output format the prompt asked for, filled with sample values"""
+    match = _ONE_SHOT_BLOCK.search(prompt) or _FORMAT_BLOCK.search(prompt)
+    content = match.group(1) if match else "Mock analysis."
+    if "<<<FEASIBILITY>>>" in content:
+        content += "\n<<<END>>>"
+    content = content.replace("[YES/NO]", verdict)
+    for placeholder, value in _FILLERS.items():
+        content = content.replace(placeholder, value)
+    content = _PLACEHOLDER.sub(r"\1", content)
+    if malformed:
+        # Like a small model wandering off the format: only the first third of the answer
+        lines = content.splitlines()
+        content = "\n".join(lines[:max(1, len(lines) // 3)])
+    while count_tokens(content) < min_tokens:
+        content += "\n- Additional mock detail for load testing."
+    return content
+
+
+class MockGroqServer:
+    """Threaded mock server; use start()/stop() or run as a script"""
+
+    def __init__(self, host="127.0.0.1", port=0, **options):
+        self.options = dict(DEFAULT_OPTIONS, **options)
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0, "completion_tokens": 0}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status, body, headers=None):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+                server._count("requests")
+                options = server.options
+
+                roll = random.random()
+                if roll < options["rate_limit_rate"]:
+                    server._count("rate_limited")
+                    self._send_json(
+                        429,
+                        {"error": {"message": "Rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}},
+                        {"retry-after": str(options["retry_after"])},
+                    )
+                    return
+                if roll < options["rate_limit_rate"] + options["error_rate"]:
+                    server._count("errors")
+                    self._send_json(500, {"error": {"message": "Injected server error"}})
+                    return
+
+                large = request.get("model") in options["large_models"].split(",")
+                slowdown = options["large_model_slowdown"] if large else 1.0
+                jitter = random.uniform(-options["jitter_ms"], options["jitter_ms"])
+                time.sleep(max(0.0, options["latency_ms"] + jitter) * slowdown / 1000)
+
+                prompt = "\n".join(m.get("content", "") for m in request.get("messages", []))
+                malformed = not large and random.random() < options["malformed_rate"]
+                verdict = "NO" if rejected(prompt, options["no_verdict_rate"]) else "YES"
+                content = fake_completion(prompt, options["min_completion_tokens"], malformed, verdict)
+                usage = {
+                    "prompt_tokens": count_tokens(prompt),
+                    "completion_tokens": count_tokens(content),
+                }
+                usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+                max_tokens = request.get("max_tokens")
+                if max_tokens and usage["completion_tokens"] > max_tokens:
+                    content = content[: max_tokens * 4]
+
+                if request.get("stream"):
+                    self._stream(request, content, usage, slowdown)
+                else:
+                    time.sleep(usage["completion_tokens"] * slowdown / options["tokens_per_second"])
+                    server._count("completion_tokens", usage["completion_tokens"])
+                    self._send_json(200, self._completion(request, content, usage), self._ratelimit_headers())
+
+            def _completion(self, request, content, usage):
+                return {
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "mock"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": usage,
+                }
+
+            def _ratelimit_headers(self):
+                return {
+                    "x-ratelimit-remaining-requests": "100000",
+                    "x-ratelimit-remaining-tokens": "10000000",
+                    "x-ratelimit-reset-requests": "0.1s",
+                    "x-ratelimit-reset-tokens": "0.1s",
+                }
+
+            def _stream(self, request, content, usage, slowdown=1.0):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                for name, value in self._ratelimit_headers().items():
+                    self.send_header(name, value)
+                self.end_headers()
+                chunk_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+                delay = slowdown / server.options["tokens_per_second"]
+                pieces = [content[i:i + 4] for i in range(0, len(content), 4)]
+                for i, piece in enumerate(pieces):
+                    last = i == len(pieces) - 1
+                    chunk = {
+                        "id": chunk_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": request.get("model", "mock"),
+                        "choices": [{
+                            "index": 0,
+                            "delta": {"content": piece},
+                            "finish_reason": "stop" if last else None,
+                        }],
+                    }
+                    if last:
+                        chunk["x_groq"] = {"id": chunk_id, "usage": usage}
+                    try:
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                    except (BrokenPipeError, ConnectionResetError):
+                        # The client closed the stream (a cancelled call); stop generating
+                        self.close_connection = True
+                        return
+                    server._count("completion_tokens")
+                    time.sleep(delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock Groq API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    for name, value in DEFAULT_OPTIONS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = vars(parser.parse_args())
+    host, port = args.pop("host"), args.pop("port")
+
+    server = MockGroqServer(host, port, **args)
+    print(f"Mock Groq API listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
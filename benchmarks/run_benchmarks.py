@@ -0,0 +1,194 @@
+"""
+Offline benchmark suite for the Startup Validator Agent
+
+Starts benchmarks/mock_groq_server.py in-process and drives the real pipeline against it:
+- pipeline_sequential / pipeline_concurrent: main.run_agent's step pipeline on one idea
+- examples: every idea in example_usage.EXAMPLE_IDEAS
+- batch_c<N>: agent/batch_analyzer.py over synthetic ideas at each concurrency level
+
+Reports p50/p95/p99 latency per step, end-to-end throughput in ideas per minute and
+peak RSS, and saves everything as JSON. Pass --compare with an earlier result file
+to flag regressions (exit code 1).
+
+Run: python benchmarks/run_benchmarks.py [--quick] [--compare benchmarks/results/old.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from mock_groq_server import DEFAULT_OPTIONS, MockGroqServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+REGRESSION_THRESHOLD = 0.10  # 10% slower / less throughput counts as a regression
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """p50/p95/p99 in milliseconds for a list of durations in seconds"""
+    return {
+        f"p{pct}_ms": round(percentile(samples, pct) * 1000, 1) if samples else None
+        for pct in (50, 95, 99)
+    }
+
+
+def peak_rss_mb():
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_workload(name, timings, fn, ideas):
+    """Run fn() once and return its timing report"""
+    for samples in timings.values():
+        samples.clear()
+    started = time.perf_counter()
+    idea_latencies = fn()
+    elapsed = time.perf_counter() - started
+    report = {
+        "ideas": ideas,
+        "wall_s": round(elapsed, 3),
+        "ideas_per_minute": round(ideas / elapsed * 60, 1),
+        "idea_latency": summarize(idea_latencies or []),
+        "steps": {key: summarize(samples) for key, samples in timings.items()},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print(f"  {name:<22} {report['wall_s']:>8.2f}s  {report['ideas_per_minute']:>9.1f} ideas/min"
+          f"  peak RSS {report['peak_rss_mb']} MB")
+    return report
+
+
+def compare(current, baseline_path):
+    """Print regressions against an earlier result file and return how many were found"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["workloads"]
+    regressions = 0
+    for name, report in current.items():
+        old = baseline.get(name)
+        if not old:
+            continue
+        if report["ideas_per_minute"] < old["ideas_per_minute"] * (1 - REGRESSION_THRESHOLD):
+            regressions += 1
+            print(f"❌ {name}: throughput {old['ideas_per_minute']} -> {report['ideas_per_minute']} ideas/min")
+        for step, stats in report["steps"].items():
+            before, after = old["steps"].get(step, {}).get("p95_ms"), stats["p95_ms"]
+            if before and after and after > before * (1 + REGRESSION_THRESHOLD):
+                regressions += 1
+                print(f"❌ {name}/{step}: p95 {before} -> {after} ms")
+    if not regressions:
+        print(f"✅ No regressions against {baseline_path}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads for a fast check")
+    parser.add_argument("--batch-ideas", type=int, default=60, help="synthetic ideas per batch workload")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16],
+                        help="batch concurrency levels")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/bench_<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier result file to check for regressions")
+    for name, value in DEFAULT_OPTIONS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value,
+                            help="mock server option")
+    args = parser.parse_args()
+    mock_options = {name: getattr(args, name) for name in DEFAULT_OPTIONS}
+    repeats = 2 if args.quick else 5
+    batch_ideas = 12 if args.quick else args.batch_ideas
+
+    server = MockGroqServer(**mock_options).start()
+    # config reads these at import time, so the agent is imported only after they are set
+    os.environ["GROQ_BASE_URL"] = server.base_url
+    os.environ.setdefault("GROQ_API_KEY", "mock")
+
+    from agent import instrumentation, pipeline
+    from agent.batch_analyzer import run_batch
+    from agent.scheduler import get_scheduler
+    from example_usage import EXAMPLE_IDEAS
+
+    # Measure the pipeline, not the quota: the mock injects its own 429s when asked to
+    get_scheduler().set_limits(1_000_000, 1_000_000_000)
+    timings = {key: [] for key, _, _ in pipeline.STEPS}
+    instrumentation.add_hook(lambda record: timings.setdefault(record["step"], []).append(record["wall_s"]))
+
+    def pipeline_run(concurrent):
+        def run():
+            latencies = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                pipeline.run_pipeline(EXAMPLE_IDEAS[0], concurrent=concurrent, use_cache=False)
+                latencies.append(time.perf_counter() - started)
+            return latencies
+        return run
+
+    def examples_run():
+        latencies = []
+        for idea in EXAMPLE_IDEAS:
+            started = time.perf_counter()
+            pipeline.run_pipeline(idea, concurrent=True, use_cache=False)
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    def batch_run(concurrency, input_path):
+        def run():
+            with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+                run_batch(input_path, os.path.join(tmp, "out.jsonl"), concurrency=concurrency, use_cache=False,
+                          save_reports=False)
+        return run
+
+    print(f"\nBenchmarking against mock Groq server at {server.base_url}\n")
+    workloads = {}
+    try:
+        workloads["pipeline_sequential"] = run_workload("pipeline_sequential", timings, pipeline_run(False), repeats)
+        workloads["pipeline_concurrent"] = run_workload("pipeline_concurrent", timings, pipeline_run(True), repeats)
+        workloads["examples"] = run_workload("examples", timings, examples_run, len(EXAMPLE_IDEAS))
+
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+            for i in range(batch_ideas):
+                f.write(json.dumps({"id": f"bench-{i}", "idea": f"{EXAMPLE_IDEAS[i % len(EXAMPLE_IDEAS)]} (variant {i})"}) + "\n")
+            input_path = f.name
+        for concurrency in args.concurrency:
+            name = f"batch_c{concurrency}"
+            workloads[name] = run_workload(name, timings, batch_run(concurrency, input_path), batch_ideas)
+        os.unlink(input_path)
+    finally:
+        server.stop()
+
+    result = {
+        "timestamp": datetime.now().isoformat(),
+        "mock_server": mock_options,
+        "mock_stats": server.stats,
+        "workloads": workloads,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"\n✅ Results saved to: {output}")
+
+    if args.compare and compare(workloads, args.compare):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Unified command line for the Startup Validator Agent
+
+Run:
+    python cli.py analyze [--sequential] [--no-cache] [--stream] [--one-shot] [--no-dedupe] [--no-save]
+    python cli.py batch ideas.jsonl results.jsonl [--concurrency N] ...
+    python cli.py serve [--port 8080] [--workers 8]
+    python cli.py queue add|status|retry-failed|export ... [--queue URL]
+    python cli.py worker [--queue URL] [--concurrency N]
+    python cli.py reports list|search|show|summary|timeline-csv|compare|rank|archive|import|compress|export ...
+    python cli.py reanalyze <report id> | --all [--dry-run]
+
+Each command imports only what it needs: `reports` never loads the Groq SDK,
+dotenv or the analyzers, and needs no API key (`reports rank` needs numpy).
+"""
+
+import argparse
+
+import batch
+import server
+import worker
+from config import BATCH_CONCURRENCY, WORK_QUEUE_URL
+
+
+def cmd_analyze(args):
+    from main import run_agent
+
+    run_agent(
+        concurrent=False if args.sequential else None,
+        use_cache=not args.no_cache,
+        stream=args.stream,
+        one_shot=True if args.one_shot else None,
+        dedupe=not args.no_dedupe,
+        save=not args.no_save,
+    )
+
+
+def cmd_reports(args):
+    import utils
+
+    if args.action == "list":
+        utils.list_saved_reports(limit=args.limit, include_archived=args.all)
+    elif args.action == "search":
+        utils.search_reports(args.query, limit=args.limit)
+    elif args.action == "show":
+        report = utils.load_analysis_report(args.report_id)
+        if report is not None:
+            print(f"\nIdea: {report['idea']}\nSaved: {report['timestamp']}")
+            for key, text in report["analysis"].items():
+                print(f"\n{'='*80}\n  {key.upper()}\n{'='*80}\n\n{text}")
+    elif args.action in ("summary", "timeline-csv"):
+        report = utils.load_analysis_report(args.report_id)
+        if report is not None and args.action == "summary":
+            print(utils.generate_executive_summary(report["analysis"]))
+        elif report is not None:
+            print(utils.export_timeline_csv(report["analysis"].get("timeline", "")), end="")
+    elif args.action == "compare":
+        first, second = utils.load_analysis_report(args.first), utils.load_analysis_report(args.second)
+        if first is not None and second is not None:
+            utils.compare_ideas(first, second)
+    elif args.action == "rank":
+        utils.rank_saved_ideas(top=args.top, pareto_only=args.pareto, include_archived=args.all)
+    elif args.action == "archive":
+        utils.archive_old_reports(days=args.days)
+    elif args.action == "import":
+        utils.import_legacy_reports(args.directory)
+    elif args.action == "compress":
+        utils.compress_saved_reports(samples=args.samples)
+    elif args.action == "export":
+        utils.export_saved_reports(args.output, fmt=args.format, since=args.since, until=args.until,
+                                   include_archived=args.all)
+
+
+def cmd_queue(args):
+    import json
+
+    from agent.work_queue import open_queue
+
+    queue = open_queue(args.queue)
+    if args.action == "add":
+        from agent.worker import enqueue_file
+
+        print(f"✅ Queued {enqueue_file(queue, args.input)} new ideas")
+    elif args.action == "status":
+        counts = queue.counts()
+        print("  ".join(f"{status}: {count}" for status, count in counts.items()))
+    elif args.action == "retry-failed":
+        print(f"✅ Re-queued {queue.retry_failed()} failed ideas")
+    elif args.action == "export":
+        exported = 0
+        with open(args.output, "w", encoding="utf-8") as out:
+            for record in queue.results():
+                out.write(json.dumps(record) + "\n")
+                exported += 1
+        print(f"✅ Exported {exported} results to {args.output}")
+
+
+def cmd_reanalyze(args):
+    import utils
+    from agent.incremental import reanalyze, reanalyze_all, stale_steps
+
+    if args.all:
+        reanalyze_all(concurrency=args.concurrency, dry_run=args.dry_run, use_cache=not args.no_cache)
+        return
+    report = utils.load_analysis_report(args.report_id)
+    if report is None:
+        return
+    if args.dry_run:
+        print(f"Stale steps: {', '.join(stale_steps(report)) or 'none'}")
+        return
+    report_id, stale, errors = reanalyze(report, use_cache=not args.no_cache)
+    if report_id is None:
+        print("✅ Report is up to date, nothing to re-run")
+        return
+    print(f"{'⚠️ ' if errors else '✅'} Re-ran {', '.join(stale)}; saved as report: {report_id}")
+    for key, error in errors.items():
+        print(f"❌ {key}: {error}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Startup Validator Agent")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    analyze = commands.add_parser("analyze", help="analyze one idea interactively")
+    analyze.add_argument("--sequential", action="store_true", help="run the six steps one after another")
+    analyze.add_argument("--no-cache", action="store_true", help="bypass the response cache")
+    analyze.add_argument("--stream", action="store_true", help="print tokens as they arrive")
+    analyze.add_argument("--one-shot", action="store_true", help="one combined request instead of six")
+    analyze.add_argument("--no-dedupe", action="store_true", help="don't offer to reuse similar saved reports")
+    analyze.add_argument("--no-save", action="store_true", help="don't save the analysis to the report store")
+    analyze.set_defaults(handler=cmd_analyze)
+
+    batch_parser = commands.add_parser("batch", help="validate a file of ideas")
+    batch.add_arguments(batch_parser)
+    batch_parser.set_defaults(handler=batch.run)
+
+    serve = commands.add_parser("serve", help="serve the agent as an HTTP API")
+    server.add_arguments(serve)
+    serve.set_defaults(handler=server.run)
+
+    queue = commands.add_parser("queue", help="fill and inspect the shared work queue for workers")
+    queue_actions = queue.add_subparsers(dest="action", required=True)
+    queue_add = queue_actions.add_parser("add", help="queue the ideas of a JSONL or CSV file")
+    queue_add.add_argument("input")
+    queue_actions.add_parser("status", help="pending / leased / done / failed counts")
+    queue_actions.add_parser("retry-failed", help="put failed ideas back in the queue")
+    queue_export = queue_actions.add_parser("export", help="write finished results as JSONL (batch.py format)")
+    queue_export.add_argument("output")
+    for action in queue_actions.choices.values():
+        action.add_argument("--queue", default=WORK_QUEUE_URL, help="sqlite file or redis:// URL")
+    queue.set_defaults(handler=cmd_queue)
+
+    worker_parser = commands.add_parser("worker", help="analyze ideas from the shared work queue")
+    worker.add_arguments(worker_parser)
+    worker_parser.set_defaults(handler=worker.run)
+
+    reports = commands.add_parser("reports", help="browse saved reports (no API key needed)")
+    actions = reports.add_subparsers(dest="action", required=True)
+    listing = actions.add_parser("list", help="newest reports first")
+    listing.add_argument("--limit", type=int, default=50)
+    listing.add_argument("--all", action="store_true", help="include archived reports")
+    search = actions.add_parser("search", help="full-text search over saved reports")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=20)
+    show = actions.add_parser("show", help="print one report")
+    show.add_argument("report_id")
+    summary = actions.add_parser("summary", help="one-page executive summary of a report")
+    summary.add_argument("report_id")
+    timeline_csv = actions.add_parser("timeline-csv", help="a report's timeline as CSV")
+    timeline_csv.add_argument("report_id")
+    compare = actions.add_parser("compare", help="compare two reports metric by metric")
+    compare.add_argument("first")
+    compare.add_argument("second")
+    rank = actions.add_parser("rank", help="rank saved ideas by weighted score (needs numpy)")
+    rank.add_argument("--top", type=int, default=20)
+    rank.add_argument("--pareto", action="store_true", help="only ideas no other idea beats on every dimension")
+    rank.add_argument("--all", action="store_true", help="include archived reports")
+    archive = actions.add_parser("archive", help="archive reports older than --days")
+    archive.add_argument("--days", type=int, default=30)
+    legacy = actions.add_parser("import", help="copy analysis_*.json files into the store (safe to re-run)")
+    legacy.add_argument("directory", nargs="?", default=".")
+    compress = actions.add_parser("compress", help="store reports zstd-compressed with a trained dictionary (needs zstandard)")
+    compress.add_argument("--samples", type=int, default=2000, help="reports to train the dictionary on")
+    export = actions.add_parser("export", help="stream reports to JSONL, Parquet/Arrow (needs pyarrow) or timeline CSV")
+    export.add_argument("output", help='output file ("-" for stdout with jsonl / timeline-csv)')
+    export.add_argument("--format", choices=["jsonl", "parquet", "arrow", "timeline-csv"], default="jsonl")
+    export.add_argument("--since", help="only reports saved at or after this ISO date")
+    export.add_argument("--until", help="only reports saved before this ISO date")
+    export.add_argument("--all", action="store_true", help="include archived reports")
+    reports.set_defaults(handler=cmd_reports)
+
+    rerun = commands.add_parser("reanalyze", help="re-run only the stale steps of saved reports")
+    target = rerun.add_mutually_exclusive_group(required=True)
+    target.add_argument("report_id", nargs="?", help="report to bring up to date")
+    target.add_argument("--all", action="store_true", help="the latest report of every saved idea")
+    rerun.add_argument("--dry-run", action="store_true", help="only list the stale steps")
+    rerun.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="reports re-analyzed at the same time")
+    rerun.add_argument("--no-cache", action="store_true", help="bypass the response cache")
+    rerun.set_defaults(handler=cmd_reanalyze)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,183 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv(dotenv_path=".env", override=True)
+_env_loaded = False
+
+
+def load_env():
+    """Read .env into the environment once; python-dotenv is only imported here"""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv(dotenv_path=".env", override=True)
+        _env_loaded = True
+
+
+def __getattr__(name):
+    # Settings that come from the environment resolve on first access, so commands that
+    # never call Groq (e.g. `python cli.py reports list`) skip dotenv and the API key check
+    if name == "GROQ_API_KEY":
+        load_env()
+        key = os.getenv("GROQ_API_KEY")
+        if not key and os.getenv("TRANSCRIPT_MODE") == "replay":
+            return "replay"  # Replayed runs never reach the API
+        if not key:
+            raise ValueError("GROQ_API_KEY environment variable not set. Please check your .env file.")
+        return key
+    if name == "GROQ_BASE_URL":
+        # Override to point the agent at a Groq-compatible server (e.g. benchmarks/mock_groq_server.py)
+        load_env()
+        return os.getenv("GROQ_BASE_URL") or None
+    if name == "TRACE_EXPORT_PATH":
+        # Append one JSON span per LLM call here (see agent/instrumentation.py)
+        load_env()
+        return os.getenv("TRACE_EXPORT_PATH") or None
+    if name == "TRANSCRIPT_MODE":
+        # "record" logs every Groq request and answer to TRANSCRIPT_PATH; "replay" answers from
+        # it instead of the API (see agent/transcript.py)
+        load_env()
+        return os.getenv("TRANSCRIPT_MODE") or None
+    if name == "TRANSCRIPT_PATH":
+        load_env()
+        return os.getenv("TRANSCRIPT_PATH") or ".cache/transcript.sqlite3"
+    if name == "TRANSCRIPT_SPEED":
+        # Replay pace: 1 keeps the recorded timing, 10 is ten times faster, 0 answers at once
+        load_env()
+        return float(os.getenv("TRANSCRIPT_SPEED") or 1.0)
+    raise AttributeError(f"module 'config' has no attribute {name!r}")
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if not GROQ_API_KEY:
-    raise ValueError("GROQ_API_KEY environment variable not set. Please check your .env file.")
-    
 MODEL_NAME = "llama-3.1-8b-instant"
+LARGE_MODEL_NAME = "llama-3.3-70b-versatile"
+
+# Per-step model routing (see agent/router.py): a step runs on the first model of its route
+# and moves to the next one only if the answer is missing a required field. Feasibility and
+# risks drive the verdict and ranking, so they escalate; the others stay on the fast model
+STEP_MODELS = {
+    "feasibility": [MODEL_NAME, LARGE_MODEL_NAME],
+    "market": [MODEL_NAME],
+    "risks": [MODEL_NAME, LARGE_MODEL_NAME],
+    "features": [MODEL_NAME],
+    "mvp": [MODEL_NAME],
+    "timeline": [MODEL_NAME],
+}
+
+# US dollars per million (prompt, completion) tokens, for the cost columns of the metrics
+MODEL_PRICES = {
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+}
+
+# Concurrent execution: run all six steps at once instead of one after another
+CONCURRENT_STEPS = True
+
+# Per-step policy for concurrent execution
+# - timeout: seconds to wait for the step before giving up on it
+# - cancel_others_on_failure: cancel every unfinished step if this one fails
+STEP_POLICIES = {
+    "feasibility": {"timeout": 60, "cancel_others_on_failure": False},
+    "market": {"timeout": 60, "cancel_others_on_failure": False},
+    "risks": {"timeout": 60, "cancel_others_on_failure": False},
+    "features": {"timeout": 60, "cancel_others_on_failure": False},
+    "mvp": {"timeout": 90, "cancel_others_on_failure": False},
+    "timeline": {"timeout": 90, "cancel_others_on_failure": False},
+}
+
+# Step graph: the earlier steps whose output each step builds on. A step starts as soon as
+# its inputs are done (in concurrent mode) and gets their summaries as extra context, so
+# the longest chain is feasibility/market -> features -> mvp -> timeline
+STEP_INPUTS = {
+    "feasibility": [],
+    "market": [],
+    "risks": [],
+    "features": ["feasibility", "market"],
+    "mvp": ["features"],
+    "timeline": ["mvp"],
+}
+STEP_CONTEXT_CHARS = 1200           # Each upstream section is cut to this many characters
+
+# Feasibility gate (see agent/pipeline.py): when the feasibility verdict is a clear NO, the
+# other five steps are skipped and the report is saved as triaged. "first" runs feasibility
+# before the others; "speculative" runs market and risks alongside it and cancels them on NO;
+# None always runs all six
+FEASIBILITY_GATE = None
+
+# Shared LLM client connection pool (see agent/llm.py)
+LLM_HTTP2 = True                    # Falls back to HTTP/1.1 if the h2 package is missing
+LLM_MAX_CONNECTIONS = 20
+LLM_MAX_KEEPALIVE_CONNECTIONS = 20
+LLM_KEEPALIVE_EXPIRY = 60           # Seconds an idle connection stays in the pool
+LLM_TIMEOUT = 60                    # Seconds per request
+
+# Response cache for analyzer calls (see agent/cache.py)
+CACHE_ENABLED = True
+CACHE_PATH = os.path.join(".cache", "responses.sqlite3")
+CACHE_MEMORY_ENTRIES = 256          # In-memory LRU tier size
+CACHE_TTL = 7 * 24 * 3600           # Seconds before an on-disk entry expires
+CACHE_MAX_BYTES = 200 * 1024 * 1024 # On-disk tier size limit (least recently used evicted first)
+# Identical analyzer calls (same model, prompt and idea) made while one is already in flight
+# wait for its answer instead of sending their own request (see agent/single_flight.py)
+SINGLE_FLIGHT = True
+
+# Saved analysis reports (see agent/report_store.py / utils.py)
+REPORT_STORE_PATH = os.path.join("reports", "reports.sqlite3")
+EXPORT_BATCH_SIZE = 1000            # Reports per Parquet row group / Arrow batch in `reports export`
+# Store analyses zstd-compressed against a dictionary trained on saved reports ("zstd", needs
+# the zstandard package) or as plain JSON (None); `cli.py reports compress` trains it
+REPORT_COMPRESSION = None
+REPORT_COMPRESSION_LEVEL = 6
+REPORT_DICT_SIZE = 64 * 1024        # Bytes; the report prompts' shared text fits easily
+
+# Near-duplicate detection (see agent/similarity.py): ideas whose word sets overlap at least
+# this much (estimated Jaccard) are offered for reuse before a new analysis starts
+SIMILARITY_THRESHOLD = 0.6
+SIMILARITY_BANDS = 16               # LSH bands x rows = MinHash signature length
+SIMILARITY_ROWS = 4                 # More rows per band = fewer, closer candidates
+
+# Ranking of saved ideas (see agent/ranking.py): weight of each 0-100 dimension score in
+# the overall score. Founder fit from ADVANCED_CONFIG.md can't be read off a report, so it
+# is left out; weights are normalized to sum to 1
+RANKING_WEIGHTS = {
+    "feasibility": 0.25,      # Verdict, complexity, time and budget to MVP
+    "market_size": 0.30,      # TAM
+    "competition": 0.15,      # Fewer named competitors scores higher
+    "risk_profile": 0.20,     # Fewer / less severe risks scores higher
+}
+
+# Batch analysis (see batch.py / agent/batch_analyzer.py)
+BATCH_CONCURRENCY = 8               # Ideas analyzed at the same time
+BATCH_TERSE_PROMPTS = False         # Send the shorter prompts.TERSE_STEP_PROMPTS in batch runs
+BATCH_TRIAGE = False                # Gate batch and worker runs on the feasibility verdict
+
+# Shared work queue for worker processes (see worker.py / agent/worker.py): a sqlite file
+# for workers on one host, or a redis:// URL for workers on several hosts
+WORK_QUEUE_URL = os.path.join("reports", "queue.sqlite3")
+QUEUE_LEASE_SECONDS = 120           # A dead worker's ideas go back to the queue after this long
+QUEUE_POLL_INTERVAL = 2.0           # Seconds between checks while the queue is empty
+QUEUE_MAX_BACKOFF = 60.0            # Longest wait between retries while the queue backend is failing
+QUEUE_MAX_ATTEMPTS = 3              # Leases per idea before it is marked failed
+
+# HTTP API (see server.py / agent/server.py)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8080
+SERVER_WORKERS = 8                  # Ideas analyzed at the same time
+SERVER_MAX_QUEUE = 256              # Ideas waiting for a worker before new ones get 503
+SERVER_RETRY_AFTER = 5              # Seconds suggested to clients turned away with 503
+SERVER_MAX_BODY_BYTES = 1024 * 1024
+
+# Request scheduler (see agent/scheduler.py) - every Groq call goes through it
+RATE_LIMIT_REQUESTS_PER_MINUTE = 30 # Groq request quota
+RATE_LIMIT_TOKENS_PER_MINUTE = 20000  # Groq token quota
+ESTIMATED_COMPLETION_TOKENS = 800   # Completion size assumed when reserving token budget
+RETRY_MAX_ATTEMPTS = 5              # Attempts per call on 429 / 5xx / connection errors
+RETRY_BASE_DELAY = 1.0              # Seconds; backoff is jittered and doubles each attempt
+RETRY_MAX_DELAY = 30.0
+
+# One-shot mode: one combined request per idea instead of six (see agent/one_shot.py)
+ONE_SHOT = False
+ONE_SHOT_MAX_TOKENS = 6000          # Room for all six sections in one completion
+
+# Instrumentation (see agent/instrumentation.py); TRACE_EXPORT_PATH is read from the environment
+METRICS_PORT = None                 # Serve Prometheus metrics on this port in batch runs
+
+# Record/replay transcripts (see agent/transcript.py); TRANSCRIPT_MODE, TRANSCRIPT_PATH and
+# TRANSCRIPT_SPEED are read from the environment
+TRANSCRIPT_FALLBACK = False         # Replay an unrecorded request with an answer recorded for the same step
@@ -5,12 +5,16 @@ This script demonstrates how to use the agent with different startup ideas.
 Run: python example_usage.py
 """
 
-from agent.idea_analyzer import analyze_idea
-from agent.market_analyzer import analyze_market
-from agent.risk_analyzer import analyze_risk
-from agent.feature_generator import generate_features
-from agent.mvp_planner import plan_mvp
-from agent.timeline_planner import generate_timeline
+from agent.pipeline import STEP_LABELS, run_pipeline
+
+STEP_TITLES = {
+    "feasibility": "STEP 1: FEASIBILITY ANALYSIS",
+    "market": "STEP 2: MARKET ANALYSIS",
+    "risks": "STEP 3: RISK IDENTIFICATION",
+    "features": "STEP 4: IDEA IMPROVEMENT & MVP FEATURES",
+    "mvp": "STEP 5: MVP ROADMAP",
+    "timeline": "STEP 6: EXECUTION TIMELINE",
+}
 
 # Example startup ideas to analyze
 EXAMPLE_IDEAS = [
@@ -37,8 +41,18 @@ EXAMPLE_IDEAS = [
     """,
 ]
 
-def run_example_analysis(idea, example_num=1):
-    """Run a complete analysis for a given idea"""
+def run_example_analysis(idea, example_num=1, concurrent=None):
+    """
+    Run a complete analysis for a given idea
+    
+    Args:
+        idea (str): The startup idea description
+        example_num (int): Example number shown in the header
+        concurrent (bool): Run all six steps at once (defaults to config.CONCURRENT_STEPS)
+    
+    Returns:
+        dict: Analysis text for every step that succeeded
+    """
     
     print(f"\n{'='*80}")
     print(f"  EXAMPLE {example_num}: STARTUP IDEA ANALYSIS")
@@ -46,50 +60,16 @@ def run_example_analysis(idea, example_num=1):
     print(f"\nIdea: {idea.strip()}\n")
     print("Running autonomous 6-step analysis...\n")
     
-    analyses = {
-        "feasibility": analyze_idea(idea),
-        "market": analyze_market(idea),
-        "risks": analyze_risk(idea),
-        "features": generate_features(idea),
-        "mvp": plan_mvp(idea),
-        "timeline": generate_timeline(idea),
-    }
-    
-    # Print Feasibility
-    print(f"\n{'─'*80}")
-    print("STEP 1: FEASIBILITY ANALYSIS")
-    print(f"{'─'*80}")
-    print(analyses["feasibility"])
-    
-    # Print Market
-    print(f"\n{'─'*80}")
-    print("STEP 2: MARKET ANALYSIS")
-    print(f"{'─'*80}")
-    print(analyses["market"])
-    
-    # Print Risks
-    print(f"\n{'─'*80}")
-    print("STEP 3: RISK IDENTIFICATION")
-    print(f"{'─'*80}")
-    print(analyses["risks"])
-    
-    # Print Features
-    print(f"\n{'─'*80}")
-    print("STEP 4: IDEA IMPROVEMENT & MVP FEATURES")
-    print(f"{'─'*80}")
-    print(analyses["features"])
-    
-    # Print MVP Roadmap
-    print(f"\n{'─'*80}")
-    print("STEP 5: MVP ROADMAP")
-    print(f"{'─'*80}")
-    print(analyses["mvp"])
+    analyses, errors = run_pipeline(idea, concurrent=concurrent)
     
-    # Print Timeline
-    print(f"\n{'─'*80}")
-    print("STEP 6: EXECUTION TIMELINE")
-    print(f"{'─'*80}")
-    print(analyses["timeline"])
+    for key, title in STEP_TITLES.items():
+        print(f"\n{'─'*80}")
+        print(title)
+        print(f"{'─'*80}")
+        if key in analyses:
+            print(analyses[key])
+        else:
+            print(f"❌ Error in {STEP_LABELS[key]}: {errors[key]}")
     
     return analyses
 
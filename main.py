@@ -1,11 +1,15 @@
-from agent.idea_analyzer import analyze_idea
-from agent.market_analyzer import analyze_market
-from agent.risk_analyzer import analyze_risk
-from agent.feature_generator import generate_features
-from agent.mvp_planner import plan_mvp
-from agent.timeline_planner import generate_timeline
+import config
 import sys
 
+STEP_TITLES = {
+    "feasibility": "STEP 1: FEASIBILITY ANALYSIS",
+    "market": "STEP 2: MARKET ANALYSIS",
+    "risks": "STEP 3: RISK IDENTIFICATION",
+    "features": "STEP 4: IDEA IMPROVEMENT & MVP FEATURE DEFINITION",
+    "mvp": "STEP 5: MVP ROADMAP (PHASED DEVELOPMENT)",
+    "timeline": "STEP 6: EXECUTION TIMELINE (12 WEEKS)",
+}
+
 def print_section(title):
     """Print a formatted section header"""
     print(f"\n{'='*80}")
@@ -16,8 +20,60 @@ def print_subsection(title):
     """Print a formatted subsection header"""
     print(f"\n--- {title} ---\n")
 
-def run_agent():
-    """Main agent execution loop"""
+def offer_similar_report(idea):
+    """
+    Show near-duplicates of the idea that were already analyzed and let the user reuse one
+    
+    Returns:
+        dict: The report to reuse, or None to run a fresh analysis
+    """
+    from agent.report_store import get_store
+    from agent.similarity import diff_ideas
+    
+    matches = get_store().similar(idea)
+    if not matches:
+        return None
+    
+    print("\n🔁 Similar ideas were already analyzed:")
+    for i, (score, report) in enumerate(matches, 1):
+        print(f"  {i}. {score:.0%} similar ({report['timestamp'][:10]}): {report['idea'][:70]}")
+    
+    while True:
+        choice = input("\nReuse a report [1-{0}], diff with one [d1-d{0}], or press Enter to analyze anyway: "
+                       .format(len(matches))).strip().lower()
+        if not choice:
+            return None
+        index = choice[1:] if choice.startswith("d") else choice
+        if not index.isdigit() or not 1 <= int(index) <= len(matches):
+            continue
+        report = matches[int(index) - 1][1]
+        if choice.startswith("d"):
+            print(f"\n{diff_ideas(report['idea'], idea)}")
+        else:
+            return report
+
+def run_agent(concurrent=None, use_cache=True, stream=False, one_shot=None, dedupe=True, save=True):
+    """
+    Main agent execution loop
+    
+    Args:
+        concurrent (bool): Run all six steps at once (defaults to config.CONCURRENT_STEPS)
+        use_cache (bool): Set False to bypass the response cache
+        stream (bool): Print tokens as they arrive instead of whole sections
+        one_shot (bool): Request all six sections in one call (defaults to config.ONE_SHOT)
+        dedupe (bool): Offer to reuse the report of a near-duplicate idea instead of analyzing
+        save (bool): Save the analysis to the report store
+    
+    Returns:
+        dict: Full analysis text for every step that succeeded
+    """
+    # The pipeline and report store load here, so `import main` stays cheap
+    from agent.instrumentation import collecting
+    from agent.pipeline import STEP_LABELS, OrderedStreamPrinter, StepSkipped, iter_steps, split_skipped
+    from utils import save_analysis_report
+    
+    config.GROQ_API_KEY  # Fail on a missing key before asking for the idea
+    
     print("\n" + "="*80)
     print("  AUTONOMOUS STARTUP VALIDATOR AGENT")
     print("="*80)
@@ -36,6 +92,15 @@ def run_agent():
         print("❌ No idea provided. Exiting.")
         sys.exit(1)
     
+    reused = offer_similar_report(idea) if dedupe else None
+    if reused is not None:
+        for key, text in reused["analysis"].items():
+            print_section(STEP_TITLES[key])
+            print(text)
+        print_section("REUSED SAVED ANALYSIS")
+        print(f"✅ Showing report {reused['id']} from {reused['timestamp'][:19]}")
+        return reused["analysis"]
+    
     print("\n" + "="*80)
     print("  ANALYZING YOUR STARTUP IDEA...")
     print("="*80)
@@ -43,63 +108,55 @@ def run_agent():
     print("Running autonomous analysis across all 6 dimensions...")
     print("(This may take 30-60 seconds)\n")
     
-    # STEP 1: FEASIBILITY ANALYSIS
-    print_section("STEP 1: FEASIBILITY ANALYSIS")
-    try:
-        feasibility = analyze_idea(idea)
-        print(feasibility)
-    except Exception as e:
-        print(f"❌ Error in feasibility analysis: {e}")
-        return
-    
-    # STEP 2: MARKET ANALYSIS
-    print_section("STEP 2: MARKET ANALYSIS")
-    try:
-        market = analyze_market(idea)
-        print(market)
-    except Exception as e:
-        print(f"❌ Error in market analysis: {e}")
-        return
-    
-    # STEP 3: RISK IDENTIFICATION
-    print_section("STEP 3: RISK IDENTIFICATION")
-    try:
-        risks = analyze_risk(idea)
-        print(risks)
-    except Exception as e:
-        print(f"❌ Error in risk analysis: {e}")
-        return
-    
-    # STEP 4: IDEA IMPROVEMENT & MVP FEATURES
-    print_section("STEP 4: IDEA IMPROVEMENT & MVP FEATURE DEFINITION")
-    try:
-        features = generate_features(idea)
-        print(features)
-    except Exception as e:
-        print(f"❌ Error in feature generation: {e}")
-        return
-    
-    # STEP 5: MVP PLANNING
-    print_section("STEP 5: MVP ROADMAP (PHASED DEVELOPMENT)")
-    try:
-        mvp = plan_mvp(idea)
-        print(mvp)
-    except Exception as e:
-        print(f"❌ Error in MVP planning: {e}")
-        return
-    
-    # STEP 6: EXECUTION TIMELINE
-    print_section("STEP 6: EXECUTION TIMELINE (12 WEEKS)")
-    try:
-        timeline = generate_timeline(idea)
-        print(timeline)
-    except Exception as e:
-        print(f"❌ Error in timeline generation: {e}")
-        return
+    results = {}
+    errors = {}
+    
+    with collecting() as metrics:
+        if stream:
+            printer = OrderedStreamPrinter(STEP_TITLES, print_section)
+            printer.start()
+            for key, result, error in iter_steps(idea, concurrent=concurrent, use_cache=use_cache,
+                                                 on_token=printer.token, one_shot=one_shot):
+                if error is None:
+                    results[key] = result
+                    printer.finish(key)
+                else:
+                    errors[key] = error
+                    if isinstance(error, StepSkipped):
+                        printer.finish(key, f"🚫 {STEP_LABELS[key].capitalize()} {error}")
+                    else:
+                        printer.finish(key, f"❌ Error in {STEP_LABELS[key]}: {error}")
+        else:
+            for key, result, error in iter_steps(idea, concurrent=concurrent, use_cache=use_cache,
+                                                 one_shot=one_shot):
+                print_section(STEP_TITLES[key])
+                if error is None:
+                    results[key] = result
+                    print(result)
+                elif isinstance(error, StepSkipped):
+                    errors[key] = error
+                    print(f"🚫 {STEP_LABELS[key].capitalize()} {error}")
+                else:
+                    errors[key] = error
+                    print(f"❌ Error in {STEP_LABELS[key]}: {error}")
+    
+    print_subsection("Per-step latency and token usage")
+    print(metrics.summary_table())
+    print_subsection("Model routing: latency and cost per model")
+    print(metrics.routing_table())
+    
+    errors, skipped = split_skipped(errors)
+    if save and results:
+        save_analysis_report(idea, results, triaged=bool(skipped))
     
     # COMPLETION
     print_section("ANALYSIS COMPLETE")
-    print("✅ Full 6-step autonomous analysis complete.")
+    if skipped:
+        print(f"🚫 Triaged as not feasible: skipped {', '.join(skipped)}")
+    if errors:
+        print(f"⚠️  Analysis finished with {len(errors)} failed step(s): {', '.join(errors)}")
+    elif not skipped:
+        print("✅ Full 6-step autonomous analysis complete.")
     print("\nNext steps:")
     print("  1. Review all recommendations carefully")
     print("  2. Validate market assumptions with real users")
@@ -107,6 +164,15 @@ def run_agent():
     print("  4. Begin Phase 1 of MVP development")
     print("  5. Measure and iterate based on user feedback")
     print("\n" + "="*80 + "\n")
+    
+    return results
 
 if __name__ == "__main__":
-    run_agent()
+    run_agent(
+        concurrent=False if "--sequential" in sys.argv else None,
+        use_cache="--no-cache" not in sys.argv,
+        stream="--stream" in sys.argv,
+        one_shot=True if "--one-shot" in sys.argv else None,
+        dedupe="--no-dedupe" not in sys.argv,
+        save="--no-save" not in sys.argv,
+    )
@@ -231,3 +231,72 @@ Format your response as:
 Startup Idea:
 {idea}
 """
+
+
+# Prompt template of each step, in STEP 1-6 order
+STEP_PROMPTS = {
+    "feasibility": IDEA_ANALYSIS_PROMPT,
+    "market": MARKET_ANALYSIS_PROMPT,
+    "risks": RISK_ANALYSIS_PROMPT,
+    "features": FEATURE_PROMPT,
+    "mvp": MVP_PROMPT,
+    "timeline": TIMELINE_PROMPT,
+}
+
+
+# ----------------------------------------------------------------------------
+# ONE-SHOT MODE: all six steps in a single request
+# ----------------------------------------------------------------------------
+# Built from the six templates above so edits to a step's format carry over. The
+# persona and the idea are sent once and only each step's title and output format
+# are kept, under a <<<KEY>>> marker the response must repeat so it can be split up.
+
+ONE_SHOT_SECTIONS = list(STEP_PROMPTS.items())
+
+
+def _step_instructions(template):
+    """A step's STEP title and output format, without the persona line, guidance and idea block"""
+    lines = template.strip().split("\n")
+    title = next(line for line in lines if line.startswith("STEP "))
+    output_format = template.split("Format your response as:", 1)[1]
+    output_format = output_format.rsplit("Startup Idea:", 1)[0].strip()
+    return f"{title}\n{output_format}"
+
+
+ONE_SHOT_PROMPT = """
+You are an experienced startup co-founder, investor, market researcher, risk analyst, product strategist and execution expert.
+
+Analyze the startup idea below in six steps. Answer every step, in order.
+Start each step with its marker line exactly as shown (for example <<<FEASIBILITY>>>),
+follow that step's format exactly, be specific and realistic for an early-stage team,
+and finish the whole response with <<<END>>>.
+
+""" + "\n\n".join(
+    f"<<<{key.upper()}>>>\n{_step_instructions(template)}" for key, template in ONE_SHOT_SECTIONS
+) + """
+
+Startup Idea:
+{idea}
+"""
+
+
+# Appended to a step's prompt when the steps it depends on (config.STEP_INPUTS) are done
+STEP_CONTEXT_PROMPT = """
+Earlier analysis of this idea (build on it and stay consistent with it; don't repeat it):
+{context}
+"""
+
+
+# ----------------------------------------------------------------------------
+# TERSE VARIANTS: shorter step prompts for batch runs (config.BATCH_TERSE_PROMPTS)
+# ----------------------------------------------------------------------------
+# Only the persona line, the STEP title and the output format are kept; the guidance in
+# between is dropped. The format is what the structured parsers rely on, so it stays whole.
+
+def _terse(template):
+    persona = template.strip().split("\n", 1)[0]
+    title, output_format = _step_instructions(template).split("\n", 1)
+    return f"\n{persona}\n\n{title}\n\nFormat your response as:\n{output_format}\n\nStartup Idea:\n{{idea}}\n"
+
+
+TERSE_STEP_PROMPTS = {key: _terse(template) for key, template in STEP_PROMPTS.items()}
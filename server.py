@@ -0,0 +1,54 @@
+"""
+HTTP API entry point for the Startup Validator Agent
+
+Run: python server.py [--port 8080] [--workers 8]
+Then: curl -X POST localhost:8080/analyze -d '{"idea": "..."}'
+See agent/server.py for the endpoints.
+"""
+
+import argparse
+
+from config import SERVER_HOST, SERVER_MAX_QUEUE, SERVER_PORT, SERVER_WORKERS
+
+def add_arguments(parser):
+    """Server options, shared with `cli.py serve`"""
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS,
+                        help="ideas analyzed at the same time")
+    parser.add_argument("--max-queue", type=int, default=SERVER_MAX_QUEUE,
+                        help="ideas waiting for a worker before new ones get 503")
+    parser.add_argument("--rpm", type=int,
+                        help="requests-per-minute budget (default: config.RATE_LIMIT_REQUESTS_PER_MINUTE)")
+    parser.add_argument("--tpm", type=int,
+                        help="tokens-per-minute budget (default: config.RATE_LIMIT_TOKENS_PER_MINUTE)")
+
+def run(args):
+    """Serve the API from parsed arguments until interrupted"""
+    import asyncio
+
+    import config
+    from agent.scheduler import get_scheduler
+    from agent.server import serve
+
+    config.GROQ_API_KEY  # Fail at startup, not on the first request, if the key is missing
+    if args.rpm or args.tpm:
+        scheduler = get_scheduler()
+        scheduler.set_limits(args.rpm or scheduler.limiter.requests.capacity,
+                             args.tpm or scheduler.limiter.tokens.capacity)
+
+    def ready(server):
+        print(f"🚀 Startup Validator API listening on http://{server.host}:{server.port}", flush=True)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_queue, on_ready=ready))
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped")
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Startup Validator Agent over HTTP")
+    add_arguments(parser)
+    run(parser.parse_args())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""Shared fixtures; the tests import the agent from the repository root, like the benchmarks"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """A fresh report store in tmp_path, returned by every get_store() call"""
+    from agent import report_store
+
+    store = report_store.ReportStore(str(tmp_path / "reports.sqlite3"))
+    monkeypatch.setattr(report_store, "_store", store)
+    return store
@@ -0,0 +1,38 @@
+"""Importing old analysis_*.json files into the report store"""
+
+import json
+
+from utils import import_legacy_reports
+
+
+def write_report(path, idea, timestamp=None):
+    report = {"idea": idea, "analysis": {"feasibility": "- Feasibility Verdict: YES - fine"}}
+    if timestamp:
+        report["timestamp"] = timestamp
+    path.write_text(json.dumps(report))
+
+
+def test_import_keeps_files_and_can_be_rerun(store, tmp_path, capsys):
+    (tmp_path / "archived").mkdir()
+    write_report(tmp_path / "analysis_1.json", "idea one", "2024-01-02T03:04:05")
+    write_report(tmp_path / "analysis_2.json", "idea two")  # No timestamp: the file's mtime is used
+    write_report(tmp_path / "archived" / "analysis_3.json", "idea three", "2023-05-06T07:08:09")
+    files = sorted(tmp_path.rglob("analysis_*.json"))
+
+    assert import_legacy_reports(str(tmp_path)) == 3
+    assert import_legacy_reports(str(tmp_path)) == 0
+    assert sorted(tmp_path.rglob("analysis_*.json")) == files
+    assert store.count() == 2 and store.count(include_archived=True) == 3
+    assert store.latest_for_idea("idea one")["timestamp"].startswith("2024-01-02T03:04:05")
+    assert "Imported 0 legacy reports (3 already in the store)" in capsys.readouterr().out
+
+
+def test_import_skips_malformed_files(store, tmp_path, capsys):
+    (tmp_path / "analysis_bad.json").write_text("{not json")
+    (tmp_path / "analysis_other.json").write_text(json.dumps({"something": "else"}))
+    write_report(tmp_path / "analysis_good.json", "good idea", "2024-01-02T03:04:05")
+
+    assert import_legacy_reports(str(tmp_path)) == 1
+    out = capsys.readouterr().out
+    assert out.count("⚠️  Skipped") == 2
+    assert store.count() == 1
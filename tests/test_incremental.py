@@ -0,0 +1,94 @@
+"""Re-analysis of saved reports when the feasibility gate skips steps"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from agent import pipeline
+from agent.incremental import reanalyze, stale_steps, step_fingerprints
+from agent.pipeline import StepSkipped
+from prompts.prompts import STEP_PROMPTS
+
+IDEA = "Rent tracking for small landlords"
+YES = "- Feasibility Verdict: YES - easy to build"
+NO = "- Feasibility Verdict: NO - the market is too small"
+
+
+def saved_report(store, analysis, triaged=False, idea=IDEA):
+    """Save a report whose steps are all up to date, and return it as loaded from the store"""
+    fingerprints = step_fingerprints(idea)
+    meta = {"fingerprints": {key: fingerprints[key] for key in analysis}}
+    if triaged:
+        meta["triaged"] = True
+    return store.get(store.save(idea, analysis, meta=meta))
+
+
+@pytest.fixture
+def pipeline_run(monkeypatch):
+    """Fake pipeline: feasibility answers `verdict`, and a NO skips every other step it was asked for"""
+    run = SimpleNamespace(verdict=YES, calls=[])
+
+    def run_pipeline(idea, steps=None, known=None, gate=None, **options):
+        run.calls.append({"steps": list(steps), "known": dict(known), "gate": gate})
+        verdict = run.verdict
+        results, errors = {}, {}
+        for key in steps:
+            if key == "feasibility":
+                results[key] = verdict
+            elif verdict == NO:
+                errors[key] = StepSkipped(key)
+            else:
+                results[key] = f"new {key}"
+        return results, errors
+
+    monkeypatch.setattr(pipeline, "run_pipeline", run_pipeline)
+    return run
+
+
+def test_skipped_steps_are_dropped_with_their_fingerprints(store, pipeline_run):
+    report = saved_report(store, {key: f"old {key}" for key in STEP_PROMPTS})
+    pipeline_run.verdict = NO
+
+    report_id, stale, errors = reanalyze(report, idea=IDEA + " in Berlin")
+
+    assert stale == list(STEP_PROMPTS) and errors == {}
+    new = store.get(report_id)
+    assert new["analysis"] == {"feasibility": NO}
+    assert list(new["meta"]["fingerprints"]) == ["feasibility"]
+    assert new["meta"]["triaged"] is True
+    assert stale_steps(new) == []  # Triaged and feasibility up to date: nothing to re-run
+
+
+def test_triaged_report_is_gated_when_feasibility_is_stale(store, pipeline_run):
+    report = saved_report(store, {"feasibility": NO}, triaged=True)
+    report["meta"]["fingerprints"]["feasibility"] = "older prompt"
+    pipeline_run.verdict = YES
+
+    report_id, stale, _ = reanalyze(report)
+
+    assert stale == list(STEP_PROMPTS)
+    assert pipeline_run.calls[-1]["gate"] == "first" and pipeline_run.calls[-1]["known"] == {}
+    new = store.get(report_id)
+    assert set(new["analysis"]) == set(STEP_PROMPTS)
+    assert set(new["meta"]["fingerprints"]) == set(STEP_PROMPTS)
+    assert "triaged" not in new["meta"]
+
+
+def test_up_to_date_triaged_report_is_not_rerun(store, pipeline_run):
+    report = saved_report(store, {"feasibility": NO}, triaged=True)
+    assert reanalyze(report) == (None, [], {})
+    assert pipeline_run.calls == []
+
+
+def test_failed_step_keeps_its_text_but_stays_stale(store, pipeline_run, monkeypatch):
+    report = saved_report(store, {key: f"old {key}" for key in STEP_PROMPTS})
+    report["meta"]["fingerprints"]["risks"] = "older prompt"
+    monkeypatch.setattr(pipeline, "run_pipeline",
+                        lambda idea, steps=None, **options: ({}, {"risks": TimeoutError("risks")}))
+
+    report_id, stale, errors = reanalyze(report)
+
+    new = store.get(report_id)
+    assert stale == ["risks"] and list(errors) == ["risks"]
+    assert new["analysis"]["risks"] == "old risks"
+    assert stale_steps(new) == ["risks"]
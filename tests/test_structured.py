@@ -0,0 +1,137 @@
+"""Typed parsing of step answers: text, JSON and truncated output, and the metrics saved from them"""
+
+import json
+import math
+from array import array
+
+from agent.structured import (METRIC_COLUMNS, StreamingParser, numeric_metrics, parse_feasibility,
+                              parse_market, parse_mvp, parse_risks)
+
+FEASIBILITY_TEXT = """- Technical Complexity: Medium - a few third-party APIs
+- Estimated Time to MVP: 8-12 weeks
+- Budget Estimate: $20k-$50k for contractors
+- Team Size Needed: 2 developers, 1 designer
+- Critical Dependencies: Stripe API, Maps API
+- Feasibility Verdict: NO - the market is too small
+"""
+
+MARKET_TEXT = """- Target Users: Small landlords
+- Market Size: $5B TAM
+- Top 3 Competitors: Buildium, AppFolio, TenantCloud
+"""
+
+RISKS_TEXT = """**TECHNICAL RISKS**
+- Payment outages (Severity: High) - Rent is late - Second processor
+**MARKET RISKS**
+- Low adoption (Severity: Low) - Slow growth - Partner with agencies
+"""
+
+MVP_TEXT = """**PHASE 1: Core ledger (Weeks 1-3)**
+- Build: Accounts, Rent tracking
+- Key Deliverable: Working ledger
+**PHASE 4: LAUNCH & VALIDATION (Weeks 10+)**
+- Build: Onboarding
+"""
+
+
+def test_feasibility_text():
+    result = parse_feasibility(FEASIBILITY_TEXT)
+    assert (result.complexity, result.complexity_note) == ("Medium", "a few third-party APIs")
+    assert (result.weeks_to_mvp, result.budget, result.team_size) == (12, 50_000.0, 3)
+    assert result.dependencies == ["Stripe API", "Maps API"]
+    assert (result.verdict, result.verdict_reason) == (False, "the market is too small")
+
+
+def test_feasibility_json_typed_like_the_text_path():
+    answer = json.dumps({"complexity": "medium - some APIs", "weeks_to_mvp": "8-12 weeks", "budget": "$20k",
+                         "team_size": "2 developers, 1 designer", "dependencies": "Stripe API, Maps API",
+                         "verdict": "NO", "unknown": 1})
+    result = parse_feasibility(answer)
+    assert (result.complexity, result.weeks_to_mvp, result.budget, result.team_size) == ("Medium", 12, 20_000.0, 3)
+    assert result.dependencies == ["Stripe API", "Maps API"]
+    assert result.verdict is False
+
+
+def test_feasibility_json_drops_values_that_dont_convert():
+    result = parse_feasibility(json.dumps({"verdict": "maybe", "budget": {}, "weeks_to_mvp": True,
+                                           "complexity": 3, "dependencies": ["a", None, ""]}))
+    assert result.verdict is None and result.budget is None and result.weeks_to_mvp is None
+    assert result.complexity == "3" and result.dependencies == ["a"]
+
+
+def test_market_and_lists_from_json():
+    market = parse_market('```json\n{"tam": "5B", "competitors": ["Buildium", "AppFolio"]}\n```')
+    assert (market.tam, market.competitors) == (5e9, ["Buildium", "AppFolio"])
+    risks = parse_risks(json.dumps({"risks": [{"name": "Outage", "severity": "HIGH"}, "not an object"]}))
+    assert [(risk.name, risk.severity) for risk in risks] == [("Outage", "High")]
+    phases = parse_mvp(json.dumps({"phases": [{"number": "2", "start_week": 4, "build": "API, UI"}]}))
+    assert [(phase.number, phase.start_week, phase.build) for phase in phases] == [(2, 4, ["API", "UI"])]
+
+
+def test_risks_and_mvp_text():
+    risks = parse_risks(RISKS_TEXT)
+    assert [(risk.category, risk.severity, risk.mitigation) for risk in risks] == [
+        ("Technical", "High", "Second processor"), ("Market", "Low", "Partner with agencies")]
+    phases = parse_mvp(MVP_TEXT)
+    assert [(phase.number, phase.start_week, phase.end_week) for phase in phases] == [(1, 1, 3), (4, 10, None)]
+    assert phases[0].build == ["Accounts", "Rent tracking"]
+
+
+def test_truncated_text_and_json():
+    cut = FEASIBILITY_TEXT[:FEASIBILITY_TEXT.index("Team Size")]
+    assert parse_feasibility(cut).budget == 50_000.0
+    assert parse_feasibility(cut).verdict is None
+    partial = parse_feasibility('{"complexity": "Low", "weeks_to_mvp": 6, "verdict": "YE')
+    assert (partial.complexity, partial.weeks_to_mvp) == ("Low", 6)
+    assert parse_risks('{"risks": [{"name": "Outage", "sever') != []
+    assert parse_mvp("") == [] and parse_risks("{") == []
+
+
+def test_streaming_parser_never_reports_a_half_streamed_value():
+    parser = StreamingParser("feasibility")
+    answer = '{"budget": "$20,000", "verdict": "NO"}'
+    results = [parser.feed(char) for char in answer]
+    seen = [result for result in results if result is not None]
+    assert all(result.budget in (None, 20_000.0) and result.verdict in (None, False) for result in seen)
+    assert parser.finish().verdict is False
+
+    parser = StreamingParser("feasibility")
+    assert parser.feed("- Budget Estimate: $20") is None  # No whole line yet
+    assert parser.feed(",000\n").budget == 20_000.0
+    assert parser.feed("- Feasibility Verdict: YES") is None
+    assert parser.finish().verdict is True
+
+
+def test_numeric_metrics_text_and_json_agree():
+    text = {"feasibility": FEASIBILITY_TEXT, "market": MARKET_TEXT, "risks": RISKS_TEXT}
+    answer = {
+        "feasibility": json.dumps({"complexity": "Medium", "weeks_to_mvp": 12, "budget": 50000, "team_size": 3,
+                                   "verdict": False}),
+        "market": json.dumps({"tam": "$5B", "competitors": ["Buildium", "AppFolio", "TenantCloud"]}),
+        "risks": json.dumps({"risks": [{"severity": "High"}, {"severity": "low"}]}),
+    }
+    expected = {"verdict": 0, "complexity": 2, "weeks_to_mvp": 12, "budget": 50_000.0, "team_size": 3,
+                "tam": 5e9, "competitors": 3, "high_risks": 1, "medium_risks": 0, "low_risks": 1}
+    assert numeric_metrics(text) == expected
+    assert numeric_metrics(answer) == expected
+
+
+def test_numeric_metrics_missing_and_zero():
+    metrics = numeric_metrics({"market": json.dumps({"competitors": []})})
+    assert metrics["competitors"] == 0
+    assert metrics["verdict"] is None and metrics["high_risks"] is None
+    assert numeric_metrics({"feasibility": ""}) == dict.fromkeys(METRIC_COLUMNS)
+
+
+def test_save_stores_metrics_from_untyped_json(store):
+    analysis = {
+        "feasibility": json.dumps({"verdict": "NO", "budget": "$20k", "weeks_to_mvp": "about 6 weeks"}),
+        "market": json.dumps({"tam": "$5B", "competitors": "Buildium, AppFolio"}),
+    }
+    report_id = store.save("Rent tracking for small landlords", analysis)
+    ids, packed = store.latest_metrics()
+    values = dict(zip(METRIC_COLUMNS, array("d", packed)))
+    assert ids == [report_id]
+    assert (values["verdict"], values["budget"], values["weeks_to_mvp"]) == (0.0, 20_000.0, 6.0)
+    assert (values["tam"], values["competitors"]) == (5e9, 2.0)
+    assert math.isnan(values["team_size"]) and math.isnan(values["high_risks"])
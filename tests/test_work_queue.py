@@ -0,0 +1,93 @@
+"""Leases, expiry and requeueing of the shared work queue, on sqlite and (if installed) a fake Redis"""
+
+import pytest
+
+from agent.work_queue import RedisQueue, SqliteQueue
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def queue(request, tmp_path, monkeypatch):
+    if request.param == "sqlite":
+        return SqliteQueue(str(tmp_path / "queue.sqlite3"), max_attempts=2)
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # The queue's Lua scripts
+    import redis
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis.Redis, "from_url",
+                        lambda url, **options: fakeredis.FakeRedis(server=server, **options))
+    return RedisQueue("redis://fake", max_attempts=2)
+
+
+def test_enqueue_skips_known_ids(queue):
+    assert queue.enqueue([("a", "idea a"), ("b", "idea b")]) == 2
+    assert queue.enqueue([("a", "idea a"), ("c", "idea c")]) == 1
+    assert queue.counts() == {"pending": 3, "leased": 0, "done": 0, "failed": 0}
+
+
+def test_lease_in_queue_order(queue):
+    queue.enqueue([("a", "idea a"), ("b", "idea b")])
+    first, second = queue.lease("w1", 60), queue.lease("w2", 60)
+    assert (first.job_id, first.idea, first.attempt) == ("a", "idea a", 1)
+    assert second.job_id == "b"
+    assert queue.lease("w3", 60) is None
+    assert queue.counts()["leased"] == 2
+
+
+def test_expired_lease_is_taken_over(queue):
+    queue.enqueue([("a", "idea a")])
+    lost = queue.lease("w1", -1)  # Expired as soon as it is granted
+    taken = queue.lease("w2", 60)
+    assert (taken.job_id, taken.attempt) == ("a", 2)
+    assert not queue.renew(lost, "w1", 60)
+    assert queue.renew(taken, "w2", 60)
+
+
+def test_renewed_lease_is_kept(queue):
+    queue.enqueue([("a", "idea a")])
+    lease = queue.lease("w1", 60)
+    assert queue.renew(lease, "w1", 60)
+    assert queue.lease("w2", 60) is None
+
+
+def test_complete_keeps_the_first_result(queue):
+    queue.enqueue([("a", "idea a")])
+    lost = queue.lease("w1", -1)
+    taken = queue.lease("w2", 60)
+    queue.complete(taken, "w2", {"id": "a", "by": "w2"})
+    queue.complete(lost, "w1", {"id": "a", "by": "w1"})  # Late result after the takeover
+    assert list(queue.results()) == [{"id": "a", "by": "w2"}]
+    assert queue.counts() == {"pending": 0, "leased": 0, "done": 1, "failed": 0}
+
+
+def test_lease_expiring_on_every_attempt_fails_the_job(queue):
+    queue.enqueue([("a", "idea a")])
+    queue.lease("w1", -1)
+    queue.lease("w2", -1)  # max_attempts=2
+    assert queue.lease("w3", 60) is None
+    assert queue.counts()["failed"] == 1
+    assert list(queue.results()) == [{"errors": {"worker": "lease expired on every attempt"}}]
+
+
+def test_release_requeues_without_using_an_attempt(queue):
+    queue.enqueue([("a", "idea a")])
+    queue.release(queue.lease("w1", 60), "w1")
+    assert queue.counts()["pending"] == 1
+    assert queue.lease("w2", 60).attempt == 1
+
+
+def test_release_by_another_worker_is_ignored(queue):
+    queue.enqueue([("a", "idea a")])
+    lease = queue.lease("w1", 60)
+    queue.release(lease, "w2")
+    assert queue.counts()["leased"] == 1
+
+
+def test_retry_failed_requeues_with_fresh_attempts(queue):
+    queue.enqueue([("a", "idea a"), ("b", "idea b")])
+    queue.complete(queue.lease("w1", 60), "w1", {"id": "a", "errors": {"market": "timeout"}}, failed=True)
+    queue.complete(queue.lease("w1", 60), "w1", {"id": "b", "errors": {}})
+    assert queue.retry_failed() == 1
+    assert queue.counts() == {"pending": 1, "leased": 0, "done": 1, "failed": 0}
+    lease = queue.lease("w1", 60)
+    assert (lease.job_id, lease.attempt) == ("a", 1)
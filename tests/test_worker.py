@@ -0,0 +1,34 @@
+"""Queue workers: reports saved to the given store, queue errors retried instead of ending a worker"""
+
+import sqlite3
+
+from agent import worker
+from agent.report_store import ReportStore
+from agent.work_queue import SqliteQueue
+
+
+def fake_pipeline(idea, **options):
+    return {"feasibility": "- Feasibility Verdict: YES - fine"}, {}
+
+
+def test_worker_keeps_going_after_queue_errors(tmp_path, monkeypatch, capsys):
+    queue = SqliteQueue(str(tmp_path / "queue.sqlite3"))
+    queue.enqueue([("a", "idea a"), ("b", "idea b")])
+    lease, failures = queue.lease, [sqlite3.OperationalError("database is locked")] * 2
+
+    def flaky_lease(owner, seconds):
+        if failures:
+            raise failures.pop()
+        return lease(owner, seconds)
+
+    monkeypatch.setattr(queue, "lease", flaky_lease)
+    monkeypatch.setattr(worker, "run_pipeline", fake_pipeline)
+    monkeypatch.setattr(worker, "QUEUE_POLL_INTERVAL", 0.01)
+    store_path = str(tmp_path / "shared.sqlite3")
+
+    counts = worker.run_worker(queue, concurrency=1, store_path=store_path)
+
+    assert counts == {"analyzed": 2, "failed": 0, "triaged": 0}
+    assert queue.counts()["done"] == 2
+    assert ReportStore(store_path).count() == 2
+    assert capsys.readouterr().out.count("Queue error (OperationalError: database is locked)") == 2
@@ -1,46 +1,81 @@
 """
 Utility functions for the Startup Validator Agent
-Includes: report saving, analysis comparison, JSON export
+Includes: report saving, analysis comparison, JSON / Parquet / CSV export
 """
 
 import json
 from datetime import datetime
 import os
 
-def save_analysis_report(idea, analysis_results):
+from agent.incremental import step_fingerprints
+from agent.report_store import get_store
+
+def save_analysis_report(idea, analysis_results, triaged=False):
     """
-    Save analysis results to a JSON file with timestamp
+    Save analysis results to the indexed report store
     
     Args:
         idea (str): The startup idea description
         analysis_results (dict): Dictionary containing all analysis steps
+        triaged (bool): The feasibility gate skipped the other steps (verdict NO)
     
     Returns:
-        str: Path to saved file
+        str: Report id ("<idea hash>-<timestamp>")
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"analysis_{timestamp}.json"
-    
-    report = {
-        "timestamp": datetime.now().isoformat(),
-        "idea": idea,
-        "analysis": analysis_results
-    }
-    
-    with open(filename, 'w') as f:
-        json.dump(report, f, indent=2)
-    
-    print(f"\n✅ Analysis saved to: {filename}")
-    return filename
+    fingerprints = step_fingerprints(idea)
+    meta = {"fingerprints": {key: fingerprints[key] for key in analysis_results if key in fingerprints}}
+    if triaged:
+        meta["triaged"] = True
+    report_id = get_store().save(idea, analysis_results, meta=meta)
+    print(f"\n✅ Analysis saved as report: {report_id}")
+    return report_id
 
-def load_analysis_report(filename):
-    """Load a previously saved analysis report"""
-    if not os.path.exists(filename):
-        print(f"❌ File not found: {filename}")
-        return None
+def load_analysis_report(report_id):
+    """Load a previously saved analysis report by id (or from a legacy analysis_*.json file)"""
+    if report_id.endswith('.json') and os.path.exists(report_id):
+        with open(report_id, 'r') as f:
+            return json.load(f)
     
-    with open(filename, 'r') as f:
-        return json.load(f)
+    report = get_store().get(report_id)
+    if report is None:
+        print(f"❌ Report not found: {report_id}")
+    return report
+
+def search_reports(query, limit=20):
+    """Full-text search over saved ideas and analysis sections"""
+    reports = get_store().search(query, limit=limit)
+    if not reports:
+        print(f"No reports match: {query}")
+    for report in reports:
+        print(f"{report['id']}  {report['timestamp'][:19]}  {report['idea'][:60]}")
+    return reports
+
+# (label, how to read it from a parsed Analysis, which direction is better)
+COMPARISON_METRICS = [
+    ("Feasibility verdict", lambda a: a.feasibility and a.feasibility.verdict, "higher"),
+    ("Complexity (1=Low 3=High)", lambda a: a.feasibility and _COMPLEXITY.get(a.feasibility.complexity), "lower"),
+    ("Weeks to MVP", lambda a: a.feasibility and a.feasibility.weeks_to_mvp, "lower"),
+    ("Budget ($)", lambda a: a.feasibility and a.feasibility.budget, "lower"),
+    ("Team size", lambda a: a.feasibility and a.feasibility.team_size, "lower"),
+    ("Market size ($ TAM)", lambda a: a.market and a.market.tam, "higher"),
+    ("Competitors named", lambda a: a.market and len(a.market.competitors), "lower"),
+    ("High-severity risks", lambda a: sum(r.severity == "High" for r in a.risks), "lower"),
+    ("Total risks", lambda a: len(a.risks), "lower"),
+    ("MVP features", lambda a: a.features and len(a.features.features), None),
+    ("MVP phases", lambda a: len(a.mvp), None),
+]
+_COMPLEXITY = {"Low": 1, "Medium": 2, "High": 3}
+
+def _format_metric(value):
+    if value is None:
+        return "-"
+    if isinstance(value, bool):
+        return "YES" if value else "NO"
+    if isinstance(value, float) and value >= 1e6:
+        return f"{value / 1e9:.1f}B" if value >= 1e9 else f"{value / 1e6:.1f}M"
+    if isinstance(value, float):
+        return f"{value:,.0f}"
+    return str(value)
 
 def compare_ideas(idea1_report, idea2_report):
     """
@@ -51,24 +86,39 @@ def compare_ideas(idea1_report, idea2_report):
         idea2_report (dict): Second analysis report
     
     Returns:
-        dict: Comparison metrics
+        dict: Comparison metrics - per metric the two values and which idea is better (1, 2 or None)
     """
+    from agent.structured import parse_analysis
+    
+    first = parse_analysis(idea1_report.get("analysis", {}))
+    second = parse_analysis(idea2_report.get("analysis", {}))
     comparison = {
         "idea_1": idea1_report.get("idea"),
         "idea_2": idea2_report.get("idea"),
-        "comparison": {}
+        "comparison": {},
+        "wins": {1: 0, 2: 0},
     }
     
+    for label, read, direction in COMPARISON_METRICS:
+        value_1, value_2 = read(first), read(second)
+        better = None
+        if direction and value_1 is not None and value_2 is not None and value_1 != value_2:
+            better = 1 if (value_1 > value_2) == (direction == "higher") else 2
+            comparison["wins"][better] += 1
+        comparison["comparison"][label] = {"idea_1": value_1, "idea_2": value_2, "better": better}
+    
     print("\n" + "="*80)
     print("  STARTUP IDEAS COMPARISON")
     print("="*80)
     print(f"\nIDEA 1: {idea1_report.get('idea')}")
-    print(f"IDEA 2: {idea2_report.get('idea')}")
-    print("\nUse this comparison to identify which idea has better:")
-    print("  - Feasibility (technical, timeline, budget)")
-    print("  - Market opportunity (size, demand, competition)")
-    print("  - Risk profile (technical risks, market risks)")
-    print("  - MVP clarity (feature simplicity, execution complexity)")
+    print(f"IDEA 2: {idea2_report.get('idea')}\n")
+    print(f"{'Metric':<24}{'Idea 1':>14}{'Idea 2':>14}   Better")
+    print("-" * 60)
+    for label, row in comparison["comparison"].items():
+        better = f"Idea {row['better']}" if row["better"] else ""
+        print(f"{label:<24}{_format_metric(row['idea_1']):>14}{_format_metric(row['idea_2']):>14}   {better}")
+    print("-" * 60)
+    print(f"Idea 1 is better on {comparison['wins'][1]} metrics, idea 2 on {comparison['wins'][2]}")
     
     return comparison
 
@@ -76,90 +126,222 @@ def generate_executive_summary(analysis_results):
     """
     Generate a one-page executive summary from full analysis
     
+    Args:
+        analysis_results (dict): Step texts of a report (or a parsed Analysis)
+    
     Returns:
         str: Formatted summary
     """
+    from agent.structured import FeaturePlan, Feasibility, Market, parse_analysis
+    
+    analysis = parse_analysis(analysis_results)
+    feasibility = analysis.feasibility or Feasibility()
+    market = analysis.market or Market()
+    plan = analysis.features or FeaturePlan()
+    high_risks = [risk for risk in analysis.risks if risk.severity == "High"]
+    
+    if feasibility.verdict is False:
+        recommendation = "❌ NO-GO - " + (feasibility.verdict_reason or "judged not feasible")
+    elif feasibility.verdict is None:
+        recommendation = "⚠️ INCOMPLETE - the feasibility analysis gave no clear verdict"
+    elif len(high_risks) <= 2:
+        recommendation = "✅ GO - " + (feasibility.verdict_reason or "feasible with manageable risks")
+    else:
+        recommendation = f"⚠️ PROCEED WITH CAUTION - {len(high_risks)} high-severity risks to resolve first"
+    
+    if feasibility.verdict is False or feasibility.complexity == "High":
+        feasibility_rating = "⚠️ Medium" if feasibility.verdict else "❌ Low"
+    else:
+        feasibility_rating = "✅ High" if feasibility.verdict else "⚠️ Medium"
+    tam = market.tam or 0
+    market_rating = "✅ Large" if tam >= 1e9 else "⚠️ Medium" if tam >= 1e8 else "❌ Small / unknown"
+    risk_rating = "✅ Low" if len(high_risks) <= 1 else "⚠️ Medium" if len(high_risks) <= 3 else "❌ High"
+    
+    strengths = [text for text in (
+        market.value_proposition,
+        market.demand and f"Demand: {market.demand}",
+        plan.features and f"Core feature: {plan.features[0].name} - {plan.features[0].why}",
+        market.tam and f"Market size: {market.market_size}",
+    ) if text][:3]
+    ranked_risks = sorted(analysis.risks, key=lambda r: _SEVERITY_ORDER.get(r.severity, 3))[:3]
+    
+    first_milestone = analysis.mvp[0].success_criteria if analysis.mvp else ""
+    next_steps = [
+        f"Validate with users: {plan.hypothesis}" if plan.hypothesis else "Validate key assumptions with users",
+        f"Build MVP with focus on {plan.features[0].name}" if plan.features else "Build the smallest testable MVP",
+        f"Measure: {first_milestone}" if first_milestone else "Measure engagement to validate market fit",
+    ]
+    
+    def numbered(items, empty):
+        return "\n".join(f"{i}. {item}" for i, item in enumerate(items, 1)) if items else empty
+    
     summary = f"""
 ╔════════════════════════════════════════════════════════════════════════════╗
 ║                     EXECUTIVE SUMMARY                                      ║
 ╚════════════════════════════════════════════════════════════════════════════╝
 
 RECOMMENDATION:
-[Based on overall feasibility, market opportunity, and risks]
+{recommendation}
 
 KEY METRICS:
-- Feasibility: [✅ High / ⚠️ Medium / ❌ Low]
-- Market Opportunity: [✅ Large / ⚠️ Medium / ❌ Small]
-- Risk Profile: [✅ Low / ⚠️ Medium / ❌ High]
-- Time to MVP: [X weeks]
-- Estimated Budget: $[X]
-- Team Required: [X people]
+- Feasibility: {feasibility_rating}
+- Market Opportunity: {market_rating} ({market.market_size or "size not given"})
+- Risk Profile: {risk_rating} ({len(high_risks)} high / {len(analysis.risks)} total)
+- Time to MVP: {f"{feasibility.weeks_to_mvp} weeks" if feasibility.weeks_to_mvp else "unknown"}
+- Estimated Budget: {f"${feasibility.budget:,.0f}" if feasibility.budget else "unknown"}
+- Team Required: {f"{feasibility.team_size} people" if feasibility.team_size else "unknown"}
 
 TOP 3 STRENGTHS:
-1. [Strength]
-2. [Strength]
-3. [Strength]
+{numbered(strengths, "Not enough detail in the analysis")}
 
 TOP 3 RISKS:
-1. [Risk with mitigation]
-2. [Risk with mitigation]
-3. [Risk with mitigation]
+{numbered([f"{r.name} ({r.severity}) - {r.mitigation or 'no mitigation given'}" for r in ranked_risks], "No risks identified")}
 
 NEXT STEPS:
-1. Validate [key assumption] with users
-2. Build MVP with focus on [core feature]
-3. Measure [key metric] to validate market fit
+{numbered(next_steps, "")}
 
 ═══════════════════════════════════════════════════════════════════════════════
 """
     return summary
 
+_SEVERITY_ORDER = {"High": 0, "Medium": 1, "Low": 2}
+
 def export_timeline_csv(timeline_data):
-    """Export execution timeline to CSV format for project management tools"""
-    csv_content = "Week,Phase,Task,Owner,Dependencies,Status\n"
-    # Parse timeline_data and format as CSV
-    # This is a template - customize based on actual timeline format
-    return csv_content
+    """
+    Export execution timeline to CSV format for project management tools
+    
+    Args:
+        timeline_data (str | Timeline): Timeline step text, or an already parsed Timeline
+    
+    Returns:
+        str: CSV with one row per task and one per milestone
+    """
+    import csv
+    import io
+
+    from agent.export import TIMELINE_COLUMNS, timeline_rows
+    
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(TIMELINE_COLUMNS)
+    writer.writerows(timeline_rows(timeline_data))
+    return out.getvalue()
 
-def list_saved_reports():
-    """List all saved analysis reports in current directory"""
-    reports = [f for f in os.listdir('.') if f.startswith('analysis_') and f.endswith('.json')]
+def export_saved_reports(output, fmt="jsonl", since=None, until=None, include_archived=False):
+    """
+    Stream saved reports to a JSONL, Parquet, Arrow or timeline CSV file (see agent/export.py)
+    
+    Returns:
+        int: Number of reports exported
+    """
+    from agent.export import export_reports
+    
+    exported = export_reports(output, fmt, start=since, end=until, include_archived=include_archived)
+    if output != "-":
+        print(f"✅ Exported {exported} reports to {output} ({fmt})")
+    return exported
+
+def list_saved_reports(limit=50, include_archived=False):
+    """List the most recent saved analysis reports"""
+    store = get_store()
+    reports = store.recent(limit=limit, include_archived=include_archived)
     
     if not reports:
         print("No saved reports found.")
         return []
     
-    print("\nSaved Analysis Reports:")
+    print(f"\nSaved Analysis Reports ({len(reports)} of {store.count(include_archived)}):")
     print("-" * 60)
     for i, report in enumerate(reports, 1):
-        print(f"{i}. {report}")
+        archived = " [archived]" if report["archived"] else ""
+        print(f"{i}. {report['id']}  {report['timestamp'][:19]}  {report['idea'][:40]}{archived}")
     
-    return reports
+    return [report["id"] for report in reports]
+
+def rank_saved_ideas(top=20, pareto_only=False, include_archived=False):
+    """Rank saved ideas by weighted score (see agent/ranking.py; needs numpy)"""
+    from agent.ranking import rank_ideas
+    
+    ranked = rank_ideas(top=top, pareto_only=pareto_only, include_archived=include_archived)
+    if not ranked:
+        print("No saved reports found.")
+        return []
+    
+    print(f"\nIdea Ranking ({'Pareto front, ' if pareto_only else ''}top {len(ranked)}):")
+    print("-" * 100)
+    print(f"{'#':>3}  {'Score':>5}  {'Pctl':>5}  {'Feas':>5}  {'Mkt':>5}  {'Comp':>5}  {'Risk':>5}  Idea")
+    for i, row in enumerate(ranked, 1):
+        front = " ★" if row["pareto"] else ""
+        print(f"{i:>3}  {row['score']:5.1f}  {row['percentile']:5.1f}  {row['feasibility']:5.1f}  "
+              f"{row['market_size']:5.1f}  {row['competition']:5.1f}  {row['risk_profile']:5.1f}  "
+              f"{row['idea'][:40]}{front}  ({row['id']})")
+    
+    return ranked
 
 def archive_old_reports(days=30):
     """
     Archive analysis reports older than specified days
-    Creates 'archived/' folder if it doesn't exist
+    Archived reports stay in the store but are hidden from listings and range queries
     """
-    from pathlib import Path
-    import shutil
+    moved_count = get_store().archive_older_than(days)
+    print(f"✅ Archived {moved_count} reports older than {days} days")
+    return moved_count
+
+def compress_saved_reports(samples=2000):
+    """
+    Train a zstd dictionary on saved reports and rewrite every report compressed with it
+    (see ReportStore.train_dictionary; needs zstandard). Reports stay readable one by one.
+    
+    Returns:
+        tuple: (reports rewritten, bytes before, bytes after)
+    """
+    from config import REPORT_COMPRESSION
     
-    archive_dir = Path('archived')
-    archive_dir.mkdir(exist_ok=True)
+    store = get_store()
+    store.compression = "zstd"
+    dict_id = store.train_dictionary(samples=samples)
+    rewritten, before, after = store.recompress()
+    print(f"✅ Compressed {rewritten} reports with dictionary {dict_id}: "
+          f"{before / 2**20:.1f} MB -> {after / 2**20:.1f} MB ({after / max(before, 1):.0%})")
+    if REPORT_COMPRESSION != "zstd":
+        print('   Set REPORT_COMPRESSION = "zstd" in config.py to compress new reports too')
+    return rewritten, before, after
+
+def import_legacy_reports(directory='.'):
+    """
+    Copy old analysis_*.json files (including archived/) into the report store
     
-    now = datetime.now()
-    moved_count = 0
+    The files are left in place. A report already in the store (same idea and timestamp)
+    is skipped, so the import can be re-run safely.
     
-    for filename in os.listdir('.'):
-        if filename.startswith('analysis_') and filename.endswith('.json'):
-            filepath = Path(filename)
-            file_time = datetime.fromtimestamp(filepath.stat().st_mtime)
-            
-            if (now - file_time).days > days:
-                shutil.move(str(filepath), str(archive_dir / filename))
-                moved_count += 1
+    Returns:
+        int: Number of reports imported
+    """
+    from pathlib import Path
     
-    print(f"✅ Archived {moved_count} reports older than {days} days")
+    store = get_store()
+    imported = skipped = 0
+    for folder, archived in ((Path(directory), False), (Path(directory) / 'archived', True)):
+        if not folder.is_dir():
+            continue
+        for filepath in sorted(folder.glob('analysis_*.json')):
+            try:
+                with open(filepath, 'r') as f:
+                    report = json.load(f)
+                idea, analysis = report["idea"], report["analysis"]
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"⚠️  Skipped {filepath}: not a saved analysis ({type(e).__name__}: {e})")
+                continue
+            # Files without a timestamp get their modification time, which stays the same on a re-run
+            created_at = report.get("timestamp") or filepath.stat().st_mtime
+            if store.contains(idea, created_at):
+                skipped += 1
+                continue
+            store.save(idea, analysis, created_at=created_at, archived=archived)
+            imported += 1
+    print(f"✅ Imported {imported} legacy reports ({skipped} already in the store); "
+          f"the JSON files were left in place")
+    return imported
 
 if __name__ == "__main__":
     # Example usage
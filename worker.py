@@ -0,0 +1,58 @@
+"""
+Queue worker entry point for the Startup Validator Agent
+
+Fill the queue once, then start as many workers as you like, on this host or others:
+    python cli.py queue add ideas.jsonl
+    python worker.py --concurrency 8 &
+    python worker.py --concurrency 8 &
+    python cli.py queue status
+    python cli.py queue export results.jsonl
+
+Use a redis:// URL for --queue (or config.WORK_QUEUE_URL) to share the queue between hosts.
+Each worker saves reports to --store; on several hosts, gather them with `queue export`
+unless that path is on storage every host reaches.
+"""
+
+import argparse
+
+from config import BATCH_CONCURRENCY, QUEUE_LEASE_SECONDS, REPORT_STORE_PATH, WORK_QUEUE_URL
+
+def add_arguments(parser):
+    """Worker options, shared with `cli.py worker`"""
+    parser.add_argument("--queue", default=WORK_QUEUE_URL, help="sqlite file or redis:// URL of the work queue")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY,
+                        help="ideas this worker analyzes at the same time")
+    parser.add_argument("--rpm", type=int,
+                        help="requests-per-minute budget shared by all workers (default: config.RATE_LIMIT_REQUESTS_PER_MINUTE)")
+    parser.add_argument("--tpm", type=int,
+                        help="tokens-per-minute budget shared by all workers (default: config.RATE_LIMIT_TOKENS_PER_MINUTE)")
+    parser.add_argument("--lease", type=float, default=QUEUE_LEASE_SECONDS,
+                        help="seconds before a silent worker's ideas go back to the queue")
+    parser.add_argument("--wait", action="store_true", help="keep waiting for new ideas when the queue is empty")
+    parser.add_argument("--one-shot", action="store_true", help="one combined request per idea instead of six")
+    parser.add_argument("--terse", action="store_true",
+                        help="send the shorter step prompts (default: config.BATCH_TERSE_PROMPTS)")
+    parser.add_argument("--triage", action="store_true",
+                        help="skip the other steps of ideas whose feasibility verdict is NO (default: config.BATCH_TRIAGE)")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the response cache")
+    parser.add_argument("--no-save", action="store_true", help="don't save results to the report store")
+    parser.add_argument("--store", default=REPORT_STORE_PATH,
+                        help="report store to save to; share it between hosts only on storage they all reach")
+
+def run(args):
+    """Run a worker from parsed arguments"""
+    from agent.work_queue import open_queue
+    from agent.worker import run_worker
+
+    run_worker(open_queue(args.queue), concurrency=args.concurrency, lease_seconds=args.lease,
+               requests_per_minute=args.rpm, tokens_per_minute=args.tpm, one_shot=args.one_shot or None,
+               use_cache=not args.no_cache, save_reports=not args.no_save, wait=args.wait,
+               terse=args.terse or None, triage=args.triage or None, store_path=args.store)
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze ideas from the shared work queue")
+    add_arguments(parser)
+    run(parser.parse_args())
+
+if __name__ == "__main__":
+    main()